@@ -16,9 +16,14 @@ import sys
 import os
 import warnings
 import math
+import time
+import json
+import hashlib
 import numpy as np
 import warnings
+from scipy import sparse
 from scipy.spatial import KDTree
+from scipy.special import xlogy, gammaln
 from pandas import unique
 import networkx as nx
 import heapq
@@ -30,9 +35,89 @@ try:
 except ImportError:
     from scipy.misc import logsumexp
 
-__all__ = ["SelfOrganizingMap", "GrowingNeuralGas", "_Network",
+__all__ = ["SelfOrganizingMap", "HierarchicalSOM", "GrowingNeuralGas",
+           "_Network",
            "learn_linear", "learn_geometric", "learn_harmonic",
-           "neighbor_gauss", "neighbor_lorentz", "lprob_train"]
+           "neighbor_gauss", "neighbor_lorentz", "lprob_train",
+           "load_network"]
+
+# Version of the on-disk format used by `_Network.save_network`.
+_NETWORK_FORMAT_VERSION = 1
+
+
+def _pack_metrics(obj, name, arrs):
+    """
+    Internal function used to split (nested) training metrics into a
+    JSON-serializable structure and a set of arrays. Arrays are replaced
+    by references to the entries they are stored under in `arrs`.
+
+    """
+
+    if isinstance(obj, dict):
+        return {k: _pack_metrics(v, '{0}__{1}'.format(name, k), arrs)
+                for k, v in iteritems(obj)}
+    elif isinstance(obj, (list, tuple)):
+        return [_pack_metrics(v, '{0}__{1}'.format(name, i), arrs)
+                for i, v in enumerate(obj)]
+    elif isinstance(obj, np.ndarray):
+        arrs[name] = obj
+        return {'__array__': name}
+    elif isinstance(obj, np.generic):
+        return obj.item()
+    else:
+        return obj
+
+
+def _unpack_metrics(obj, load):
+    """
+    Internal function used to re-construct training metrics packed using
+    :meth:`_pack_metrics`.
+
+    """
+
+    if isinstance(obj, dict):
+        if set(obj.keys()) == {'__array__'}:
+            return load(obj['__array__'])
+        return {k: _unpack_metrics(v, load) for k, v in iteritems(obj)}
+    elif isinstance(obj, list):
+        return [_unpack_metrics(v, load) for v in obj]
+    else:
+        return obj
+
+
+def _anneal_times(niter, nbatch, monitor=None):
+    """
+    Internal generator used to produce the fractional times (from `[0., 1.]`)
+    that set the learning schedule over `niter` iterations of `nbatch`
+    objects. Once `monitor` signals convergence, the remainder of the
+    schedule is compressed into `monitor.stop_patience` iterations so that
+    training always ends with the schedule fully annealed.
+
+    """
+
+    times = np.linspace(0., 1., niter * nbatch)
+    i = 0
+    while i < len(times):
+        yield times[i]
+        i += 1
+        if monitor is not None and monitor.stop and i % nbatch == 0:
+            Nfinal = monitor.stop_patience * nbatch
+            if len(times) - i > Nfinal:
+                times = np.append(times[:i], np.linspace(times[i-1], 1.,
+                                                         Nfinal + 1)[1:])
+
+
+def _readonly(arr, copy=True):
+    """
+    Internal function used to mark (a copy of) an array as read-only so
+    that cached results cannot be modified in place by callers.
+
+    """
+
+    arr = np.array(arr, copy=True) if copy else arr
+    arr.flags.writeable = False
+
+    return arr
 
 
 def learn_linear(t, start=0.5, end=0.1, *args, **kwargs):
@@ -118,6 +203,194 @@ def neighbor_lorentz(t, pos, positions, nside, start=0.7, end=0.02,
     return sigma**2 / (sqdist + sigma**2), sigma
 
 
+def _lprob_nodes(data, data_err, data_mask, nodes, free_scale=False,
+                 dim_prior=True, *args, **kwargs):
+    """
+    Internal function used to compute the log-likelihoods between a batch of
+    noisy data and a set of noiseless (fully observed) nodes all at once.
+    Equivalent to calling :meth:`~frankenz.pdf.logprob` on each object
+    with `ignore_model_err=True`.
+
+    Parameters
+    ----------
+    data : `~numpy.ndarray` of shape (Ndata, Nfilt)
+        Observed data values.
+
+    data_err : `~numpy.ndarray` of shape (Ndata, Nfilt)
+        Associated (Normal) errors on the observed values.
+
+    data_mask : `~numpy.ndarray` of shape (Ndata, Nfilt)
+        Binary mask (0/1) indicating whether the data was observed.
+
+    nodes : `~numpy.ndarray` of shape (Nnode, Nfilt)
+        Node values.
+
+    free_scale : bool, optional
+        Whether to include a free scale factor (scaling the node to the data)
+        in the fit. Default is `False`.
+
+    dim_prior : bool, optional
+        Whether to apply a dimensional-based correction (prior) to the
+        log-likelihood. Default is `True`.
+
+    Returns
+    -------
+    lnlike : `~numpy.ndarray` of shape (Ndata, Nnode)
+        Log-likelihood values.
+
+    chi2 : `~numpy.ndarray` of shape (Ndata, Nnode)
+        Chi-square values used to compute the log-likelihood.
+
+    """
+
+    # Clean data (safety checks).
+    data, data_err = np.array(data, dtype='float'), np.array(data_err,
+                                                            dtype='float')
+    data_mask = np.array(data_mask, dtype='bool')
+    clean = np.isfinite(data) & np.isfinite(data_err) & (data_err > 0.)
+    data[~clean], data_err[~clean], data_mask[~clean] = 0., 1., False
+
+    # Compute chi2 from the expanded quadratic form.
+    ivar = data_mask / np.square(data_err)
+    Ndim = np.sum(data_mask, axis=1)
+    inter_vals = np.dot(ivar * data, nodes.T)  # "interaction" term
+    shape_vals = np.dot(ivar, np.square(nodes).T)  # "shape" term
+    data_vals = np.sum(ivar * np.square(data), axis=1)[:, None]
+    if free_scale:
+        chi2 = data_vals - np.square(inter_vals) / shape_vals
+        a = 0.5 * (Ndim - 1)  # dof
+    else:
+        chi2 = data_vals - 2. * inter_vals + shape_vals
+        a = 0.5 * Ndim  # dof
+    chi2 = np.clip(chi2, 0., None)  # guard against round-off
+
+    # Compute log-likelihood.
+    if dim_prior:
+        a = a[:, None]
+        lnl = xlogy(a - 1., chi2) - (chi2 / 2.) - gammaln(a) - (np.log(2.) * a)
+    else:
+        lnl = -0.5 * chi2
+        lnl += -0.5 * (Ndim * np.log(2. * np.pi) +
+                       np.sum(np.log(np.square(data_err)), axis=1))[:, None]
+
+    return lnl, chi2
+
+
+class _TrainMonitor(object):
+    """
+    Internal class used to record training metrics for a network and
+    decide when training has converged. Metrics are accumulated object by
+    object and recorded into preallocated arrays once per iteration.
+
+    Parameters
+    ----------
+    niter : int
+        The maximum number of iterations.
+
+    nnode : int
+        The (initial) number of nodes in the network.
+
+    stop_tol : float, optional
+        If provided, training is flagged as converged (via `stop`) once
+        the relative decrease in the mean quantization error between two
+        successive windows of `stop_patience` iterations falls below
+        `stop_tol`. Default is `None` (no early stopping).
+
+    stop_patience : int, optional
+        The number of iterations in each window used to check for
+        convergence. Default is `10`.
+
+    """
+
+    def __init__(self, niter, nnode, stop_tol=None, stop_patience=10):
+
+        # Initialize values.
+        self.niter = niter
+        self.stop_tol, self.stop_patience = stop_tol, stop_patience
+        self.qerror = np.zeros(niter)
+        self.topo_error = np.zeros(niter)
+        self.util = np.zeros(niter)
+        self.nnodes = np.zeros(niter, dtype='int')
+        self.time = np.zeros(niter)
+        self.bmu_counts = np.zeros(nnode, dtype='int')
+        self.it, self.stop, self.it_stop = 0, False, None
+        self._chi2, self._topo, self._nobj = 0., 0., 0
+        self._t0 = time.time()
+
+    def add(self, chi2, topo, bmu):
+        """
+        Add the results for one or more objects to the current iteration.
+
+        Parameters
+        ----------
+        chi2 : float or `~numpy.ndarray` of shape (Nobj)
+            Chi-square values of the best-matching unit(s).
+
+        topo : bool or `~numpy.ndarray` of shape (Nobj)
+            Whether the best and second-best matching units were
+            **not** adjacent in the network.
+
+        bmu : int or `~numpy.ndarray` of shape (Nobj)
+            Labels of the best-matching unit(s).
+
+        """
+
+        bmu = np.atleast_1d(bmu)
+        Nmax = np.max(bmu) + 1
+        if Nmax > len(self.bmu_counts):
+            self.bmu_counts = np.append(self.bmu_counts,
+                                        np.zeros(Nmax - len(self.bmu_counts),
+                                                 dtype='int'))
+        np.add.at(self.bmu_counts, bmu, 1)
+        self._chi2 += np.sum(chi2)
+        self._topo += np.sum(topo)
+        self._nobj += len(bmu)
+
+    def step(self, labels):
+        """
+        Record the metrics for the current iteration and check whether
+        training should be stopped.
+
+        Parameters
+        ----------
+        labels : `~numpy.ndarray` of shape (Nnode)
+            Labels of the nodes currently in the network.
+
+        """
+
+        if self.it >= self.niter:
+            return
+        i, t = self.it, time.time()
+        labels = np.asarray(labels, dtype='int')
+        labels = labels[labels < len(self.bmu_counts)]
+        self.qerror[i] = self._chi2 / max(self._nobj, 1)
+        self.topo_error[i] = self._topo / max(self._nobj, 1)
+        self.nnodes[i] = len(labels)
+        self.util[i] = np.mean(self.bmu_counts[labels] > 0)
+        self.time[i] = t - self._t0
+        self._chi2, self._topo, self._nobj = 0., 0., 0
+        self._t0 = t
+        self.it += 1
+
+        # Check for convergence.
+        p = self.stop_patience
+        if self.stop_tol is not None and self.it >= 2 * p:
+            prev = np.mean(self.qerror[i-2*p+1:i-p+1])
+            cur = np.mean(self.qerror[i-p+1:i+1])
+            if prev - cur < self.stop_tol * prev and not self.stop:
+                self.stop, self.it_stop = True, self.it
+
+    def results(self):
+        """Return a dictionary containing the recorded metrics."""
+
+        n = self.it
+        return {'qerror': self.qerror[:n], 'topo_error': self.topo_error[:n],
+                'util': self.util[:n], 'nnodes': self.nnodes[:n],
+                'time': self.time[:n], 'bmu_counts': self.bmu_counts,
+                'niter': n, 'converged': self.stop,
+                'niter_converged': self.it_stop}
+
+
 class _Network(object):
     """
     Fits data and generates predictions using a network of nodes (models)
@@ -168,6 +441,11 @@ class _Network(object):
         self.nodes_Nmatch = None
         self.nodes_only = None
         self.NNODE, self.NPROJ = None, None
+        self.train_metrics = None
+
+        self.nodes_pdfs = None
+        self.nodes_pdfs_gof = None
+        self.nodes_pdfs_key = None
 
         self.neighbors = None
         self.Nneighbors = None
@@ -302,6 +580,11 @@ class _Network(object):
         self.nodes_scales_err = [[] for i in range(Nnodes)]
         self.nodes_Nmatch = np.zeros(Nnodes, dtype='int')
 
+        # Invalidate any cached node PDFs.
+        self.nodes_pdfs = None
+        self.nodes_pdfs_gof = None
+        self.nodes_pdfs_key = None
+
         y = self.nodes
         ye = np.zeros_like(y)
         ym = np.ones_like(y, dtype='bool')
@@ -311,8 +594,10 @@ class _Network(object):
                                             self.models_mask)):
 
             # Fit network.
-            node_results = lpnet_func(x, xe, xm, y, ye, ym,
-                                      *lpnet_args, **lpnet_kwargs)
+            node_results = self._fit_nodes(x, xe, xm, y, ye, ym,
+                                           lpnet_func=lpnet_func,
+                                           lpnet_args=lpnet_args,
+                                           lpnet_kwargs=lpnet_kwargs)
             node_lnprob = node_results[2]
 
             # Add to BMU.
@@ -355,6 +640,65 @@ class _Network(object):
 
             yield n_idxs, n_lnprobs, n_scales, n_scales_err
 
+    def _fit_nodes(self, x, xe, xm, y, ye, ym, node_idxs=None,
+                   lpnet_func=None, lpnet_args=None, lpnet_kwargs=None):
+        """
+        Internal method used to compute fits between an object and the nodes
+        of the network. Sub-classes can override this to avoid evaluating
+        every node.
+
+        Parameters
+        ----------
+        x : `~numpy.ndarray` of shape (Nfilt)
+            Observed data values.
+
+        xe : `~numpy.ndarray` of shape (Nfilt)
+            Associated errors on the data values.
+
+        xm : `~numpy.ndarray` of shape (Nfilt)
+            Binary mask (0/1) indicating whether the data value was observed.
+
+        y : `~numpy.ndarray` of shape (Nsel, Nfilt)
+            Values of the selected nodes.
+
+        ye : `~numpy.ndarray` of shape (Nsel, Nfilt)
+            Associated errors on the node values.
+
+        ym : `~numpy.ndarray` of shape (Nsel, Nfilt)
+            Binary mask (0/1) indicating whether the node value was observed.
+
+        node_idxs : `~numpy.ndarray` of shape (Nsel), optional
+            Sorted indices of the selected nodes. If not provided, all nodes
+            are assumed to be selected.
+
+        lpnet_func : str or func, optional
+            Log-posterior function to be used. Must return ln(prior),
+            ln(like), ln(post), Ndim, chi2, and (optionally) scale and
+            std(scale). If not provided, `~frankenz.pdf.logprob` will be used.
+
+        lpnet_args : args, optional
+            Arguments to be passed to `lpnet_func`.
+
+        lpnet_kwargs : kwargs, optional
+            Keyword arguments to be passed to `lpnet_func`.
+
+        Returns
+        -------
+        results : tuple
+            Output of `lpnet_func` for each of the selected nodes.
+
+        """
+
+        # Initialize values.
+        if lpnet_func is None:
+            lpnet_func = logprob
+        if lpnet_args is None:
+            lpnet_args = []
+        if lpnet_kwargs is None:
+            lpnet_kwargs = dict()
+
+        return lpnet_func(x, xe, xm, y, ye, ym, *lpnet_args, **lpnet_kwargs)
+
     def get_node(self, idx=None, pos=None, discrete=False):
         """
         Returns quantities associated with the given node.
@@ -508,11 +852,15 @@ class _Network(object):
 
     def get_pdfs(self, model_labels, model_label_errs, label_dict=None,
                  label_grid=None, kde_args=None, kde_kwargs=None,
-                 return_gof=False, discrete=False, verbose=True):
+                 return_gof=False, discrete=False, use_cache=True,
+                 verbose=True):
         """
         Compute photometric 1-D predictions to the target distribution
         using the models (and possibly associated weights) to each node in
-        the network.
+        the network. Results are cached internally (read-only) under
+        `nodes_pdfs` and re-used by subsequent calls with the same labels,
+        grid, and KDE settings until the network is re-populated. A copy of
+        the cached results is returned so that callers can safely modify it.
 
         Parameters
         ----------
@@ -547,16 +895,20 @@ class _Network(object):
             rather than all nodes an object might be associated with.
             Default is `False`.
 
+        use_cache : bool, optional
+            Whether to return the cached node PDFs (if they were computed
+            using the same inputs). Default is `True`.
+
         verbose : bool, optional
             Whether to print progress to `~sys.stderr`. Default is `True`.
 
         Returns
         -------
-        pdfs : `~numpy.ndarray` of shape (Nobj, Ngrid)
-            Collection of 1-D PDFs for each object.
+        pdfs : `~numpy.ndarray` of shape (Nnode, Ngrid)
+            Collection of 1-D PDFs for each node.
 
-        (lmap, levid) : 2-tuple of `~numpy.ndarray` with shape (Nobj), optional
-            Set of ln(MAP) and ln(evidence) values for each object.
+        (lmap, levid) : 2-tuple of `~numpy.ndarray` with shape (Nnode), optional
+            Set of ln(MAP) and ln(evidence) values for each node.
 
         """
 
@@ -573,11 +925,25 @@ class _Network(object):
             Nx = label_dict.Ngrid
         else:
             Nx = len(label_grid)
+
+        # Check whether we can re-use our cached node PDFs.
+        key = self._get_pdfs_key(model_labels, model_label_errs,
+                                 label_dict=label_dict, label_grid=label_grid,
+                                 kde_args=kde_args, kde_kwargs=kde_kwargs,
+                                 discrete=discrete)
+        if use_cache and self.nodes_pdfs is not None:
+            if key == self.nodes_pdfs_key:
+                pdfs = self.nodes_pdfs.copy()
+                if return_gof:
+                    lmap, levid = self.nodes_pdfs_gof
+                    return pdfs, (lmap.copy(), levid.copy())
+                else:
+                    return pdfs
+
         Nnodes = self.NNODE
         pdfs = np.zeros((Nnodes, Nx))
-        if return_gof:
-            lmap = np.zeros(Nnodes)
-            levid = np.zeros(Nnodes)
+        lmap = np.zeros(Nnodes)
+        levid = np.zeros(Nnodes)
 
         # Compute PDFs.
         for i, res in enumerate(self._get_pdfs(model_labels, model_label_errs,
@@ -588,8 +954,7 @@ class _Network(object):
                                                kde_kwargs=kde_kwargs)):
             pdf, gof = res
             pdfs[i] = pdf
-            if return_gof:
-                lmap[i], levid[i] = gof  # save gof metrics
+            lmap[i], levid[i] = gof  # save gof metrics
             if verbose:
                 sys.stderr.write('\rGenerating node PDF {0}/{1}'
                                  .format(i+1, Nnodes))
@@ -598,11 +963,47 @@ class _Network(object):
             sys.stderr.write('\n')
             sys.stderr.flush()
 
+        # Cache (read-only copies of) results.
+        self.nodes_pdfs = _readonly(pdfs)
+        self.nodes_pdfs_gof = (_readonly(lmap), _readonly(levid))
+        self.nodes_pdfs_key = key
+
         if return_gof:
             return pdfs, (lmap, levid)
         else:
             return pdfs
 
+    def _get_pdfs_key(self, model_labels, model_label_errs, label_dict=None,
+                      label_grid=None, kde_args=None, kde_kwargs=None,
+                      discrete=False):
+        """
+        Internal method used to compute the key identifying a set of
+        node PDFs computed using :meth:`get_pdfs`.
+
+        """
+
+        h = hashlib.sha1()
+
+        # Hash labels and grids.
+        arrs = [model_labels, model_label_errs]
+        if label_dict is not None:
+            arrs += [label_dict.grid, label_dict.sigma_grid,
+                     label_dict.sigma_width]
+        else:
+            arrs += [label_grid]
+        for arr in arrs:
+            arr = np.ascontiguousarray(arr)
+            h.update(str((arr.dtype.str, arr.shape)).encode('utf-8'))
+            h.update(arr.tobytes())
+
+        # Hash KDE settings.
+        if kde_kwargs is None:
+            kde_kwargs = dict()
+        h.update(repr((list(kde_args or []), sorted(kde_kwargs.items()),
+                       bool(discrete))).encode('utf-8'))
+
+        return h.hexdigest()
+
     def _get_pdfs(self, model_labels, model_label_errs, label_dict=None,
                   label_grid=None, kde_args=None, kde_kwargs=None,
                   discrete=False):
@@ -880,8 +1281,11 @@ class _Network(object):
         for i, (x, xe, xm) in enumerate(zip(data, data_err, data_mask)):
 
             # Fit network.
-            node_results = lpnet_func(x, xe, xm, y, ye, ym,
-                                      *lpnet_args, **lpnet_kwargs)
+            node_results = self._fit_nodes(x, xe, xm, y, ye, ym,
+                                           node_idxs=match_sel,
+                                           lpnet_func=lpnet_func,
+                                           lpnet_args=lpnet_args,
+                                           lpnet_kwargs=lpnet_kwargs)
             node_lnprob = node_results[2]
 
             # Apply thresholding.
@@ -1025,6 +1429,19 @@ class _Network(object):
         else:
             node_pdfs = None
 
+        # If possible, stack the node PDFs for all objects at once using a
+        # single sparse (Ndata, Nnodes) x (Nnodes, Ngrid) matrix product.
+        if node_pdfs is not None and np.all(self.Nneighbors > 0):
+            pdfs, (lmap, levid) = self._predict_nodes(node_pdfs, logwt=logwt)
+            if verbose:
+                sys.stderr.write('Generating PDF {0}/{1}\n'
+                                 .format(Ndata, Ndata))
+                sys.stderr.flush()
+            if return_gof:
+                return pdfs, (lmap, levid)
+            else:
+                return pdfs
+
         # Compute PDFs.
         for i, res in enumerate(self._predict(model_labels, model_label_errs,
                                               node_pdfs=node_pdfs,
@@ -1049,6 +1466,54 @@ class _Network(object):
         else:
             return pdfs
 
+    def _predict_nodes(self, node_pdfs, logwt=None):
+        """
+        Internal method used to compute photometric 1-D predictions for all
+        objects at once by stacking the effective PDFs at each node.
+
+        Parameters
+        ----------
+        node_pdfs : `~numpy.ndarray` of shape (Nnodes, Ngrid)
+            The effective PDFs at each node.
+
+        logwt : list of arrays matching saved results, optional
+            A new set of log-weights used to compute the marginalized 1-D
+            PDFs in place of the log-posterior.
+
+        Returns
+        -------
+        pdfs : `~numpy.ndarray` of shape (Ndata, Ngrid)
+            Collection of 1-D PDFs for each object.
+
+        (lmap, levid) : 2-tuple of `~numpy.ndarray` with shape (Ndata)
+            Set of ln(MAP) and ln(evidence) values for each object.
+
+        """
+
+        if logwt is None:
+            logwt = self.fit_lnprob
+        Ndata, Nnodes = self.NDATA, len(node_pdfs)
+
+        # Flatten our (ragged) set of neighbors and weights.
+        Nidx = np.array([len(lwt) for lwt in logwt], dtype='int')
+        indptr = np.append(0, np.cumsum(Nidx))
+        idxs = np.concatenate(self.neighbors).astype('int')
+        lwt = np.concatenate(logwt).astype('float')
+
+        # Compute ln(MAP), ln(evidence), and normalized weights per object.
+        lmap = np.maximum.reduceat(lwt, indptr[:-1])
+        wt = np.exp(lwt - np.repeat(lmap, Nidx))
+        wsum = np.add.reduceat(wt, indptr[:-1])
+        levid = lmap + np.log(wsum)
+        wt /= np.repeat(wsum, Nidx)
+
+        # Stack node PDFs based on their relative weights.
+        wmat = sparse.csr_matrix((wt, idxs, indptr), shape=(Ndata, Nnodes))
+        pdfs = np.asarray(wmat.dot(node_pdfs))
+        pdfs /= pdfs.sum(axis=1)[:, None]
+
+        return pdfs, (lmap, levid)
+
     def _predict(self, model_labels, model_label_errs, node_pdfs=None,
                  label_dict=None, label_grid=None, logwt=None, kde_args=None,
                  kde_kwargs=None):
@@ -1411,8 +1876,11 @@ class _Network(object):
         for i, (x, xe, xm) in enumerate(zip(data, data_err, data_mask)):
 
             # Fit network.
-            node_results = lpnet_func(x, xe, xm, y, ye, ym,
-                                      *lpnet_args, **lpnet_kwargs)
+            node_results = self._fit_nodes(x, xe, xm, y, ye, ym,
+                                           node_idxs=match_sel,
+                                           lpnet_func=lpnet_func,
+                                           lpnet_args=lpnet_args,
+                                           lpnet_kwargs=lpnet_kwargs)
             node_lnprob = node_results[2]
 
             # Apply thresholding.
@@ -1486,6 +1954,210 @@ class _Network(object):
 
             yield pdf, (lmap, levid)
 
+    def save_network(self, path, save_models=True):
+        """
+        Save the trained (and populated) network to disk. Results are stored
+        in the directory `path` as a set of `.npy` arrays (which can be
+        memory-mapped when loaded) along with a `meta.json` file containing
+        the network metadata. Networks can be re-loaded using
+        :meth:`load_network`.
+
+        Parameters
+        ----------
+        path : str
+            The directory where the network will be saved. Will be created
+            if it does not already exist.
+
+        save_models : bool, optional
+            Whether to also save the models (and associated errors and masks)
+            used to populate the network. If `False`, these must be provided
+            when re-loading the network. Default is `True`.
+
+        """
+
+        from . import __version__
+
+        if self.nodes is None:
+            raise ValueError("Network has not been trained!")
+        if not os.path.exists(path):
+            os.makedirs(path)
+
+        # Collect metadata.
+        meta = {'format_version': _NETWORK_FORMAT_VERSION,
+                'frankenz_version': __version__,
+                'class': self.__class__.__name__,
+                'NMODEL': int(self.NMODEL), 'NDIM': int(self.NDIM),
+                'NNODE': int(self.NNODE), 'NPROJ': self.NPROJ,
+                'populated': self.nodes_idxs is not None,
+                'models_saved': bool(save_models)}
+        for attr in ['NSIDE', 'NITER', 'NBATCH', 'NSIDE_FINE', 'NBRANCH']:
+            if getattr(self, attr, None) is not None:
+                meta[attr] = int(getattr(self, attr))
+
+        # Collect arrays.
+        arrs = {'nodes': self.nodes}
+        if self.nodes_pos is not None:
+            arrs['nodes_pos'] = self.nodes_pos
+        if getattr(self, 'coarse_nodes', None) is not None:
+            arrs['coarse_nodes'] = self.coarse_nodes
+        if save_models:
+            arrs['models'] = self.models
+            arrs['models_err'] = self.models_err
+            arrs['models_mask'] = self.models_mask
+
+        # Collect the (ragged) membership tables by flattening them.
+        if self.nodes_idxs is not None:
+            lpnet_func = getattr(self, 'lpnet_func', None)
+            if lpnet_func is logprob:
+                meta['lpnet_func'] = 'logprob'
+            else:
+                meta['lpnet_func'] = getattr(lpnet_func, '__name__', None)
+                warnings.warn("Custom `lpnet_func` cannot be saved and "
+                              "will need to be provided when re-loading "
+                              "the network.")
+            try:
+                meta['lpnet_args'] = json.loads(json.dumps(
+                    list(self.lpnet_args)))
+                meta['lpnet_kwargs'] = json.loads(json.dumps(
+                    dict(self.lpnet_kwargs)))
+            except (TypeError, ValueError):
+                meta['lpnet_args'], meta['lpnet_kwargs'] = None, None
+                warnings.warn("The arguments passed to `lpnet_func` cannot "
+                              "be saved and will need to be provided when "
+                              "re-loading the network.")
+            arrs['nodes_Nmatch'] = self.nodes_Nmatch
+            arrs['nodes_ptr'] = np.append(0, np.cumsum([len(idxs) for idxs
+                                                        in self.nodes_idxs]))
+            arrs['nodes_bmus_ptr'] = np.append(0, np.cumsum([len(idxs)
+                                                             for idxs in
+                                                             self.nodes_bmus]))
+            for name, dtype in [('nodes_idxs', 'int'),
+                                ('nodes_logwts', 'float'),
+                                ('nodes_scales', 'float'),
+                                ('nodes_scales_err', 'float'),
+                                ('nodes_bmus', 'int')]:
+                vals = getattr(self, name)
+                if len(vals) > 0:
+                    arrs[name] = np.concatenate([np.asarray(v, dtype=dtype)
+                                                 for v in vals])
+                else:
+                    arrs[name] = np.array([], dtype=dtype)
+            arrs['models_lmap'] = self.models_lmap
+            arrs['models_levid'] = self.models_levid
+
+        # Collect any cached node PDFs.
+        if self.nodes_pdfs is not None:
+            meta['nodes_pdfs_key'] = self.nodes_pdfs_key
+            arrs['nodes_pdfs'] = self.nodes_pdfs
+            arrs['nodes_pdfs_lmap'], arrs['nodes_pdfs_levid'] = \
+                self.nodes_pdfs_gof
+
+        # Collect training metrics.
+        if self.train_metrics is not None:
+            meta['train_metrics'] = _pack_metrics(self.train_metrics,
+                                                  'train_metrics', arrs)
+
+        # Collect the graph structure (if it exists).
+        graph = getattr(self, 'graph', None)
+        if graph is not None and graph.number_of_nodes() > 0:
+            gnodes = list(graph.nodes())
+            arrs['graph_ids'] = np.array(gnodes, dtype='int')
+            arrs['graph_error'] = np.array([graph.nodes[n].get('error', 0.)
+                                            for n in gnodes], dtype='float')
+            arrs['graph_pos'] = np.array([graph.nodes[n]['pos']
+                                          for n in gnodes], dtype='float')
+            edges = list(graph.edges(data='age', default=0))
+            arrs['graph_edges'] = np.array([e[:2] for e in edges],
+                                           dtype='int').reshape(-1, 2)
+            arrs['graph_ages'] = np.array([e[2] for e in edges], dtype='int')
+
+        # Write results.
+        meta['arrays'] = sorted(arrs.keys())
+        for name, arr in iteritems(arrs):
+            np.save(os.path.join(path, name + '.npy'), np.asarray(arr))
+        with open(os.path.join(path, 'meta.json'), 'w') as f:
+            json.dump(meta, f, indent=1, sort_keys=True)
+
+    def _load_network(self, path, meta, mmap_mode='c', lpnet_func=None,
+                      lpnet_args=None, lpnet_kwargs=None):
+        """
+        Internal method used to load a saved network into memory.
+
+        """
+
+        def load(name):
+            return np.load(os.path.join(path, name + '.npy'),
+                           mmap_mode=mmap_mode)
+
+        names = set(meta['arrays'])
+        self.nodes = load('nodes')
+        self.NNODE, self.NPROJ = meta['NNODE'], meta['NPROJ']
+        for attr in ['NSIDE', 'NITER', 'NBATCH', 'NSIDE_FINE', 'NBRANCH']:
+            if attr in meta:
+                setattr(self, attr, meta[attr])
+        if 'nodes_pos' in names:
+            self.nodes_pos = load('nodes_pos')
+        if 'coarse_nodes' in names:
+            self.coarse_nodes = load('coarse_nodes')
+
+        # Re-construct the membership tables as views into the flattened
+        # arrays.
+        if meta['populated']:
+            if lpnet_func is None:
+                if meta['lpnet_func'] != 'logprob':
+                    raise ValueError("The network was populated using a "
+                                     "custom `lpnet_func` which must be "
+                                     "provided.")
+                lpnet_func = logprob
+            if lpnet_args is None:
+                lpnet_args = meta['lpnet_args']
+            if lpnet_kwargs is None:
+                lpnet_kwargs = meta['lpnet_kwargs']
+            if lpnet_args is None or lpnet_kwargs is None:
+                raise ValueError("The arguments passed to `lpnet_func` were "
+                                 "not saved and must be provided.")
+            self.lpnet_func = lpnet_func
+            self.lpnet_args = lpnet_args
+            self.lpnet_kwargs = lpnet_kwargs
+            self.nodes_Nmatch = np.array(load('nodes_Nmatch'))
+            ptr, bptr = load('nodes_ptr'), load('nodes_bmus_ptr')
+            for name in ['nodes_idxs', 'nodes_logwts', 'nodes_scales',
+                         'nodes_scales_err']:
+                vals = load(name)
+                setattr(self, name, [vals[ptr[i]:ptr[i+1]]
+                                     for i in range(self.NNODE)])
+            vals = load('nodes_bmus')
+            self.nodes_bmus = [vals[bptr[i]:bptr[i+1]]
+                               for i in range(self.NNODE)]
+            self.models_lmap = load('models_lmap')
+            self.models_levid = load('models_levid')
+
+        # Load cached node PDFs.
+        if 'nodes_pdfs' in names:
+            self.nodes_pdfs = _readonly(load('nodes_pdfs'), copy=False)
+            self.nodes_pdfs_gof = (_readonly(load('nodes_pdfs_lmap'),
+                                             copy=False),
+                                   _readonly(load('nodes_pdfs_levid'),
+                                             copy=False))
+            self.nodes_pdfs_key = meta['nodes_pdfs_key']
+
+        # Load training metrics.
+        if 'train_metrics' in meta:
+            self.train_metrics = _unpack_metrics(meta['train_metrics'], load)
+
+        # Re-construct the graph.
+        if 'graph_ids' in names:
+            graph = nx.Graph()
+            gpos = load('graph_pos')
+            for count, (n, err) in enumerate(zip(load('graph_ids'),
+                                                 load('graph_error'))):
+                graph.add_node(int(n), pos=np.array(gpos[count]),
+                               error=float(err), count=count)
+            for (e1, e2), age in zip(load('graph_edges'),
+                                     load('graph_ages')):
+                graph.add_edge(int(e1), int(e2), age=int(age))
+            self.graph = graph
+
 
 class SelfOrganizingMap(_Network):
     """
@@ -1521,9 +2193,11 @@ class SelfOrganizingMap(_Network):
                       wt_thresh=1e-3, cdf_thresh=2e-4, rstate=None,
                       lprob_args=None, lprob_kwargs=None, track_scale=False,
                       learn_args=None, learn_kwargs=None, neighbor_args=None,
-                      neighbor_kwargs=None, verbose=True):
+                      neighbor_kwargs=None, stop_tol=None, stop_patience=10,
+                      verbose=True):
         """
-        Train the SOM using the provided set of models.
+        Train the SOM using the provided set of models. Training metrics
+        for each iteration are stored in `train_metrics`.
 
         Parameters
         ----------
@@ -1612,6 +2286,21 @@ class SelfOrganizingMap(_Network):
         neighbor_kwargs : kwargs, optional
             Keyword arguments to be passed to `neighbor_func`.
 
+        stop_tol : float, optional
+            If provided, training is stopped early once the relative
+            decrease in the mean quantization error (BMU chi2) between two
+            successive windows of `stop_patience` iterations falls below
+            `stop_tol`. Rather than stopping immediately, the remainder of
+            the learning rate and neighborhood schedules is then compressed
+            into `stop_patience` final iterations so that the map is always
+            fully annealed. Default is `None` (always run `niter`
+            iterations).
+
+        stop_patience : int, optional
+            The number of iterations in each window used to check for
+            convergence (and used to finish annealing) when `stop_tol` is
+            provided. Default is `10`.
+
         verbose : bool, optional
             Whether to print progress to `~sys.stderr`. Default is `True`.
 
@@ -1650,6 +2339,8 @@ class SelfOrganizingMap(_Network):
             models_err = np.sqrt(models_err**2 + err_kernel**2)
 
         # Train the SOM.
+        monitor = _TrainMonitor(niter, nside**nproj, stop_tol=stop_tol,
+                                stop_patience=stop_patience)
         train = self._train_network
         for i, res in enumerate(train(models, models_err, models_mask,
                                       lprob_func=lprob_func,
@@ -1667,7 +2358,8 @@ class SelfOrganizingMap(_Network):
                                       learn_args=learn_args,
                                       learn_kwargs=learn_kwargs,
                                       neighbor_args=neighbor_args,
-                                      neighbor_kwargs=neighbor_kwargs)):
+                                      neighbor_kwargs=neighbor_kwargs,
+                                      monitor=monitor)):
             fits, bmu, learn_rate, learn_sigma = res
             if i % nbatch == 0 and verbose:
                 sys.stderr.write('\rIteration {:d}/{:d} '
@@ -1675,6 +2367,7 @@ class SelfOrganizingMap(_Network):
                                  .format(int(i/nbatch) + 1, niter,
                                          learn_rate, learn_sigma))
                 sys.stderr.flush()
+        self.train_metrics = monitor.results()
         if verbose:
             sys.stderr.write('\n')
             sys.stderr.flush()
@@ -1685,7 +2378,8 @@ class SelfOrganizingMap(_Network):
                        wt_thresh=1e-3, cdf_thresh=2e-4,
                        rstate=None, lprob_args=None, lprob_kwargs=None,
                        track_scale=False, learn_args=None, learn_kwargs=None,
-                       neighbor_args=None, neighbor_kwargs=None):
+                       neighbor_args=None, neighbor_kwargs=None,
+                       monitor=None):
         """
         Internal method used to train the SOM.
 
@@ -1772,11 +2466,14 @@ class SelfOrganizingMap(_Network):
         neighbor_kwargs : kwargs, optional
             Keyword arguments to be passed to `neighbor_func`.
 
+        monitor : `_TrainMonitor` instance, optional
+            If provided, used to record training metrics.
+
         """
 
         # Initialize values.
         self.NITER, self.NBATCH = niter, nbatch
-        times = np.linspace(0., 1., niter * nbatch)
+        times = _anneal_times(niter, nbatch, monitor=monitor)
         if lprob_func is None:
             lprob_func = logprob
         if lprob_args is None:
@@ -1842,6 +2539,17 @@ class SelfOrganizingMap(_Network):
             # Find the "best-matching unit".
             bmu = np.argmax(node_lnprob)
 
+            # Record training metrics.
+            if monitor is not None:
+                lnprob2 = np.array(node_lnprob)
+                lnprob2[bmu] = -np.inf
+                bmu2 = np.argmax(lnprob2)
+                topo = np.max(np.abs(self.nodes_pos[bmu] -
+                                     self.nodes_pos[bmu2])) > 1.
+                monitor.add(node_results[4][bmu], topo, bmu)
+                if (i + 1) % nbatch == 0:
+                    monitor.step(np.arange(self.NNODE))
+
             # Compute learning parameters.
             learn_rate = learn_func(t, *learn_args, **learn_kwargs)
             learn_wt, learn_sigma = neighbor_func(t, self.nodes_pos[bmu],
@@ -1867,6 +2575,344 @@ class SelfOrganizingMap(_Network):
             yield node_results, bmu, learn_rate, learn_sigma
 
 
+def _train_subnetwork(args):
+    """
+    Internal function used to train a single sub-map of a
+    `HierarchicalSOM`. Defined at the module level so that it can be
+    passed to a `pool`.
+
+    """
+
+    # Unpack arguments.
+    (models, models_err, models_mask, nodes_init, seed, nside, nproj,
+     niter, nbatch, lprob_func, lprob_args, lprob_kwargs, track_scale,
+     train_kwargs) = args
+
+    # Train the sub-map.
+    som = SelfOrganizingMap(models, models_err, models_mask)
+    som.train_network(nside=nside, nproj=nproj, nodes_init=nodes_init,
+                      niter=niter, nbatch=nbatch, lprob_func=lprob_func,
+                      rstate=np.random.RandomState(seed),
+                      lprob_args=lprob_args, lprob_kwargs=lprob_kwargs,
+                      track_scale=track_scale, verbose=False, **train_kwargs)
+
+    return som.nodes, som.train_metrics
+
+
+class HierarchicalSOM(_Network):
+    """
+    Fits data and generates predictions using a two-level hierarchical
+    Self-Organizing Map (SOM). A coarse SOM partitions the models, each
+    node of which owns a finer SOM trained only on the models assigned to
+    it. Fits descend the tree, so only the coarse nodes and the fine nodes
+    of the `nbranch` best-fitting coarse nodes are evaluated for each object.
+
+    """
+
+    def __init__(self, models, models_err, models_mask):
+        """
+        Load the model data into memory.
+
+        Parameters
+        ----------
+        models : `~numpy.ndarray` of shape (Nmodel, Nfilt)
+            Model values.
+
+        models_err : `~numpy.ndarray` of shape (Nmodel, Nfilt)
+            Associated errors on the model values.
+
+        models_mask : `~numpy.ndarray` of shape (Nmodel, Nfilt)
+            Binary mask (0/1) indicating whether the model value was observed.
+
+        """
+
+        # Initialize values.
+        super(HierarchicalSOM, self).__init__(models, models_err,
+                                              models_mask)  # _Network
+        self.coarse_nodes = None
+        self.NSIDE_FINE, self.NBRANCH = None, None
+
+    def train_network(self, models=None, models_err=None, models_mask=None,
+                      nside=10, nside_fine=10, nproj=2, nbranch=2,
+                      niter=2000, nbatch=50, niter_fine=None,
+                      nbatch_fine=None, err_kernel=None, lprob_func=None,
+                      rstate=None, lprob_args=None, lprob_kwargs=None,
+                      track_scale=False, train_kwargs=None, pool=None,
+                      verbose=True):
+        """
+        Train the hierarchical SOM using the provided set of models.
+        The coarse SOM is trained first and each model is assigned to its
+        best-matching coarse node. Each sub-map is then trained independently
+        (and optionally in parallel) on its assigned models.
+
+        Parameters
+        ----------
+        models : `~numpy.ndarray` of shape (Nmodel, Nfilt), optional
+            Model values.
+
+        models_err : `~numpy.ndarray` of shape (Nmodel, Nfilt), optional
+            Associated errors on the model values.
+
+        models_mask : `~numpy.ndarray` of shape (Nmodel, Nfilt), optional
+            Binary mask (0/1) indicating whether the model value was observed.
+
+        nside : int, optional
+            The number of nodes used to specify each side of the coarse SOM.
+            Default is `10`.
+
+        nside_fine : int, optional
+            The number of nodes used to specify each side of each sub-map.
+            The full network will have `(nside * nside_fine)**nproj` nodes.
+            Default is `10`.
+
+        nproj : int, optional
+            The number of projected dimensions used to specify the positions
+            of the nodes of the network. Default is `2`.
+
+        nbranch : int, optional
+            The number of best-fitting coarse nodes whose sub-maps are
+            searched when fitting an object. Default is `2`.
+
+        niter : int, optional
+            The number of iterations to train the coarse SOM.
+            Default is `2000`.
+
+        nbatch : int, optional
+            The number of objects used in a given iteration. Default is `50`.
+
+        niter_fine : int, optional
+            The number of iterations to train each sub-map. If not provided,
+            this will default to `niter`.
+
+        nbatch_fine : int, optional
+            The number of objects used in a given iteration for each sub-map.
+            If not provided, this will default to `nbatch`.
+
+        err_kernel : `~numpy.ndarray` of shape (Nmodel, Nfilt), optional
+            An error kernel added in quadrature to the provided
+            `models_err` used when training the SOM.
+
+        lprob_func : str or func, optional
+            Log-posterior function to be used when computing fits between
+            the network and the models. Must return ln(prior), ln(like),
+            ln(post), Ndim, chi2, and (optionally) scale and scale_err.
+            If not provided, `~frankenz.pdf.logprob` will be used.
+
+        rstate : `~numpy.random.RandomState` instance, optional
+            Random state instance. If not passed, the default `~numpy.random`
+            instance will be used. Each sub-map is trained using its own
+            random state seeded from `rstate`.
+
+        lprob_args : args, optional
+            Arguments to be passed to `lprob_func`.
+
+        lprob_kwargs : kwargs, optional
+            Keyword arguments to be passed to `lprob_func`.
+            By default, this sets `free_scale=True` and
+            `ignore_model_err=True`.
+
+        track_scale : bool, optional
+            Whether `lprob_func` also returns the scale-factor. Default is
+            `False`.
+
+        train_kwargs : kwargs, optional
+            Additional keyword arguments (e.g., `learn_func` or
+            `neighbor_func`) passed to
+            :meth:`SelfOrganizingMap.train_network` when training the
+            coarse SOM and each sub-map.
+
+        pool : user-provided pool, optional
+            Use this pool of workers to train the sub-maps in parallel.
+            Must provide a `map` function. If not provided, the sub-maps will
+            be trained serially. All arguments (including `lprob_func`) must
+            be picklable.
+
+        verbose : bool, optional
+            Whether to print progress to `~sys.stderr`. Default is `True`.
+
+        """
+
+        # Initialize values.
+        if lprob_func is None:
+            lprob_func = logprob
+        if lprob_args is None:
+            lprob_args = []
+        if lprob_kwargs is None:
+            lprob_kwargs = {'free_scale': True, 'ignore_model_err': True}
+        if train_kwargs is None:
+            train_kwargs = dict()
+        if niter_fine is None:
+            niter_fine = niter
+        if nbatch_fine is None:
+            nbatch_fine = nbatch
+        if rstate is None:
+            rstate = np.random
+        if pool is None:
+            M = map
+        else:
+            M = pool.map
+
+        # Load in models.
+        if models is None:
+            models = self.models
+        if models_mask is None:
+            models_mask = self.models_mask
+        if models_err is None:
+            models_err = self.models_err
+        if err_kernel is not None:
+            models_err = np.sqrt(models_err**2 + err_kernel**2)
+
+        # Train the coarse SOM.
+        if verbose:
+            sys.stderr.write('Training coarse SOM\n')
+            sys.stderr.flush()
+        coarse = SelfOrganizingMap(models, models_err, models_mask)
+        coarse.train_network(nside=nside, nproj=nproj, niter=niter,
+                             nbatch=nbatch, lprob_func=lprob_func,
+                             rstate=rstate, lprob_args=lprob_args,
+                             lprob_kwargs=lprob_kwargs,
+                             track_scale=track_scale, verbose=verbose,
+                             **train_kwargs)
+        self.coarse_nodes = coarse.nodes
+        Ncoarse, Nfine = nside**nproj, nside_fine**nproj
+
+        # Assign each model to its best-matching coarse node.
+        bmus = self._coarse_bmus(models, models_err, models_mask,
+                                 lprob_func=lprob_func,
+                                 lprob_args=lprob_args,
+                                 lprob_kwargs=lprob_kwargs)
+        members = [np.flatnonzero(bmus == i) for i in range(Ncoarse)]
+
+        # Train each of the sub-maps.
+        seeds = rstate.randint(2**31 - 1, size=Ncoarse)
+        argset = []
+        for i, idxs in enumerate(members):
+            if len(idxs) == 0:
+                continue
+            sub_rstate = np.random.RandomState(seeds[i])
+            init = sub_rstate.choice(idxs, size=Nfine,
+                                     replace=len(idxs) < Nfine)
+            argset.append((models[idxs], models_err[idxs], models_mask[idxs],
+                           np.array(models[init]), seeds[i], nside_fine,
+                           nproj, niter_fine, nbatch_fine, lprob_func,
+                           lprob_args, lprob_kwargs, track_scale,
+                           train_kwargs))
+        trained = [i for i, idxs in enumerate(members) if len(idxs) > 0]
+        self.nodes = np.tile(self.coarse_nodes, Nfine).reshape(-1, self.NDIM)
+        self.train_metrics = {'coarse': coarse.train_metrics,
+                              'fine': [None for i in range(Ncoarse)]}
+        for i, (nodes, metrics) in zip(trained, M(_train_subnetwork,
+                                                  argset)):
+            self.nodes[i*Nfine:(i+1)*Nfine] = nodes
+            self.train_metrics['fine'][i] = metrics
+            if verbose:
+                sys.stderr.write('\rTraining sub-map {0}/{1} '
+                                 .format(i + 1, Ncoarse))
+                sys.stderr.flush()
+        if verbose:
+            sys.stderr.write('\n')
+            sys.stderr.flush()
+
+        # Initialize node positions on the combined grid.
+        self.NSIDE, self.NSIDE_FINE = nside * nside_fine, nside_fine
+        self.NNODE, self.NPROJ, self.NBRANCH = Ncoarse * Nfine, nproj, nbranch
+        self.NITER, self.NBATCH = niter, nbatch
+        fine_pos = np.array(np.unravel_index(np.arange(Nfine),
+                                             (nside_fine,) * nproj)).T
+        self.nodes_pos = (coarse.nodes_pos[:, None, :] * nside_fine +
+                          fine_pos[None, :, :]).reshape(-1, nproj)
+
+    def _coarse_bmus(self, models, models_err, models_mask, lprob_func=None,
+                     lprob_args=None, lprob_kwargs=None, chunksize=10000):
+        """
+        Internal method used to find the best-matching coarse node for each
+        model.
+
+        """
+
+        # Initialize values.
+        if lprob_func is None:
+            lprob_func = logprob
+        if lprob_args is None:
+            lprob_args = []
+        if lprob_kwargs is None:
+            lprob_kwargs = dict()
+        Nmodel = len(models)
+        y = self.coarse_nodes
+        bmus = np.zeros(Nmodel, dtype='int')
+
+        if lprob_func is logprob and len(lprob_args) == 0:
+            # Compute fits in chunks using matrix products.
+            free_scale = lprob_kwargs.get('free_scale', False)
+            dim_prior = lprob_kwargs.get('dim_prior', True)
+            for i in range(0, Nmodel, chunksize):
+                sl = slice(i, i + chunksize)
+                lnprob, _ = _lprob_nodes(models[sl], models_err[sl],
+                                         models_mask[sl], y,
+                                         free_scale=free_scale,
+                                         dim_prior=dim_prior)
+                bmus[sl] = np.argmax(lnprob, axis=1)
+        else:
+            ye = np.zeros_like(y)
+            ym = np.ones_like(y, dtype='bool')
+            for i, (x, xe, xm) in enumerate(zip(models, models_err,
+                                                models_mask)):
+                results = lprob_func(x, xe, xm, y, ye, ym,
+                                     *lprob_args, **lprob_kwargs)
+                bmus[i] = np.argmax(results[2])
+
+        return bmus
+
+    def _fit_nodes(self, x, xe, xm, y, ye, ym, node_idxs=None,
+                   lpnet_func=None, lpnet_args=None, lpnet_kwargs=None):
+        """
+        Internal method used to compute fits between an object and the nodes
+        of the network by descending the tree. Only the sub-maps of the
+        `NBRANCH` best-fitting coarse nodes are evaluated. All other nodes
+        are assigned ln(post) = -inf and chi2 = inf.
+
+        """
+
+        # Initialize values.
+        if lpnet_func is None:
+            lpnet_func = logprob
+        if lpnet_args is None:
+            lpnet_args = []
+        if lpnet_kwargs is None:
+            lpnet_kwargs = dict()
+        Nfine = self.NSIDE_FINE**self.NPROJ
+        if node_idxs is None:
+            node_idxs = np.arange(self.NNODE)
+
+        # Fit the coarse nodes.
+        yc = self.coarse_nodes
+        results = lpnet_func(x, xe, xm, yc, np.zeros_like(yc),
+                             np.ones_like(yc, dtype='bool'),
+                             *lpnet_args, **lpnet_kwargs)
+        nbranch = min(self.NBRANCH, len(yc))
+        branches = np.argsort(results[2])[-nbranch:]
+
+        # Select the corresponding (fine) nodes.
+        fine = (branches[:, None] * Nfine + np.arange(Nfine)).flatten()
+        sel = np.searchsorted(node_idxs, fine)
+        found = sel < len(node_idxs)
+        sel, fine = sel[found], fine[found]
+        sel = sel[node_idxs[sel] == fine]  # only keep selected nodes
+
+        # Fit the selected nodes and fill in the remainder.
+        results = lpnet_func(x, xe, xm, y[sel], ye[sel], ym[sel],
+                             *lpnet_args, **lpnet_kwargs)
+        fills = [-np.inf, -np.inf, -np.inf, 0, np.inf, 1., 0.]
+        node_results = []
+        for r, fill in zip(results, fills + [0.] * len(results)):
+            r = np.asarray(r)
+            arr = np.full(len(node_idxs), fill, dtype=r.dtype)
+            arr[sel] = r
+            node_results.append(arr)
+
+        return node_results
+
+
 class GrowingNeuralGas(_Network):
     """
     Fits data and generates predictions using a Growing Neural Gas (GNG).
@@ -1901,9 +2947,11 @@ class GrowingNeuralGas(_Network):
                       max_nodes=2500, niter=5000, graph_init=None,
                       err_kernel=None, lprob_func=None, rstate=None,
                       lprob_args=None, lprob_kwargs=None, track_scale=False,
+                      minibatch=False, stop_tol=None, stop_patience=10,
                       verbose=True):
         """
-        Train the GNG using the provided set of models.
+        Train the GNG using the provided set of models. Training metrics
+        for each iteration are stored in `train_metrics`.
 
         Parameters
         ----------
@@ -1983,6 +3031,28 @@ class GrowingNeuralGas(_Network):
             Whether `lprob_func` also returns the scale-factor. Default is
             `False`.
 
+        minibatch : bool, optional
+            Whether to train the GNG using mini-batches. If `True`, each
+            iteration draws `nbatch` objects at once, fits them against all
+            the nodes simultaneously, and applies the accumulated node
+            updates, errors, and edge refreshes before adding a new node.
+            When using the default `lprob_func` (with no `lprob_args`) the
+            fits are computed using a handful of matrix products, which can
+            take advantage of multi-threaded linear algebra libraries.
+            Not compatible with `track_scale`. Default is `False`.
+
+        stop_tol : float, optional
+            If provided, training is stopped early once the relative
+            decrease in the mean quantization error (BMU chi2) between two
+            successive windows of `stop_patience` iterations falls below
+            `stop_tol`. Since the GNG uses fixed learning rates (there is
+            no schedule to anneal), training stops immediately.
+            Default is `None` (always run `niter` iterations).
+
+        stop_patience : int, optional
+            The number of iterations in each window used to check for
+            convergence when `stop_tol` is provided. Default is `10`.
+
         verbose : bool, optional
             Whether to print progress to `~sys.stderr`. Default is `True`.
 
@@ -1997,6 +3067,9 @@ class GrowingNeuralGas(_Network):
             lprob_kwargs = {'free_scale': True, 'ignore_model_err': True}
         if rstate is None:
             rstate = np.random
+        if minibatch and track_scale:
+            raise ValueError("`track_scale` is not supported when training "
+                             "with mini-batches.")
 
         # Load in models.
         if models is None:
@@ -2009,7 +3082,14 @@ class GrowingNeuralGas(_Network):
             models_err = np.sqrt(models_err**2 + err_kernel**2)
 
         # Train the GNG.
-        train = self._train_network
+        monitor = _TrainMonitor(niter, 2, stop_tol=stop_tol,
+                                stop_patience=stop_patience)
+        if minibatch:
+            train = self._train_network_batch
+            pstep = 1  # print every mini-batch
+        else:
+            train = self._train_network
+            pstep = nbatch
         for i, res in enumerate(train(models, models_err, models_mask,
                                       learn_best=learn_best,
                                       learn_neighbor=learn_neighbor,
@@ -2022,14 +3102,18 @@ class GrowingNeuralGas(_Network):
                                       lprob_func=lprob_func,
                                       rstate=rstate, lprob_args=lprob_args,
                                       lprob_kwargs=lprob_kwargs,
-                                      track_scale=track_scale)):
+                                      track_scale=track_scale,
+                                      monitor=monitor)):
             fits, bmu, nnodes, nprune = res
-            if i % nbatch == 0 and verbose:
+            if i % pstep == 0 and verbose:
                 sys.stderr.write('\rIteration {0}/{1} '
                                  '[nodes={2}, edges pruned={3}] '
-                                 .format(int(i/nbatch) + 1, niter, nnodes,
+                                 .format(int(i/pstep) + 1, niter, nnodes,
                                          nprune))
                 sys.stderr.flush()
+            if monitor.stop:
+                break
+        self.train_metrics = monitor.results()
         if verbose:
             sys.stderr.write('\n')
             sys.stderr.flush()
@@ -2039,7 +3123,7 @@ class GrowingNeuralGas(_Network):
                        nbatch=50, new_err_dec=0.5, all_err_dec=5e-3,
                        max_nodes=2500, niter=5000, graph_init=None,
                        lprob_func=None, rstate=None, lprob_args=None,
-                       lprob_kwargs=None, track_scale=False, verbose=True):
+                       lprob_kwargs=None, track_scale=False, monitor=None):
         """
         Train the GNG using the provided set of models.
 
@@ -2117,6 +3201,9 @@ class GrowingNeuralGas(_Network):
             Whether `lprob_func` also returns the scale-factor. Default is
             `False`.
 
+        monitor : `_TrainMonitor` instance, optional
+            If provided, used to record training metrics.
+
         """
 
         # Initialize values.
@@ -2177,6 +3264,11 @@ class GrowingNeuralGas(_Network):
                                            key=node_lnprob.__getitem__)
             bmu, bmu2 = node_idxs[y_bmu], node_idxs[y_bmu2]
 
+            # Record training metrics.
+            if monitor is not None:
+                monitor.add(node_chi2[y_bmu],
+                            not self.graph.has_edge(bmu, bmu2), bmu)
+
             # Update the BMU.
             resid = x - self.graph.nodes[bmu]['pos']
             y[y_bmu] += learn_best * resid
@@ -2257,4 +3349,392 @@ class GrowingNeuralGas(_Network):
             for j in list(self.graph.nodes()):
                 self.graph.nodes[j]['error'] *= (1. - all_err_dec)
 
+            if monitor is not None and (i + 1) % nbatch == 0:
+                monitor.step(list(self.graph.nodes()))
+
             yield node_results, bmu, self.NNODE, nprune
+
+    def _train_network_batch(self, models, models_err, models_mask,
+                             learn_best=0.2, learn_neighbor=0.005, max_age=15,
+                             nbatch=50, new_err_dec=0.5, all_err_dec=5e-3,
+                             max_nodes=2500, niter=5000, graph_init=None,
+                             lprob_func=None, rstate=None, lprob_args=None,
+                             lprob_kwargs=None, track_scale=False,
+                             monitor=None):
+        """
+        Train the GNG using mini-batches drawn from the provided set of models.
+        Each iteration fits `nbatch` objects to the current set of nodes,
+        applies the accumulated updates, and then adds a new node.
+
+        Parameters
+        ----------
+        models : `~numpy.ndarray` of shape (Nmodel, Nfilt)
+            Model values.
+
+        models_err : `~numpy.ndarray` of shape (Nmodel, Nfilt)
+            Associated errors on the model values.
+
+        models_mask : `~numpy.ndarray` of shape (Nmodel, Nfilt)
+            Binary mask (0/1) indicating whether the model value was observed.
+
+        learn_best : float, optional
+            The fractional amount to adjust the best-fit node based on the
+            residual between the node and the data. A node selected `n` times
+            within a batch is moved a fraction `1. - (1. - learn_best)**n`
+            of the way towards the mean of the associated objects.
+            Default is `0.2`.
+
+        learn_neighbor : float, optional
+            The fractional amount to adjust the topological neighbors
+            of the best-fit node (i.e. nodes connected by edges) based on the
+            residuals between the nodes and the data. Applied to the batch
+            in the same manner as `learn_best`. Default is `0.005`.
+
+        max_age : int, optional
+            The maximum age an edge can be before it is removed from the
+            graph. Edges are "aged" each time a node connected to them
+            is selected as the best-matching unit. Default is `15`.
+
+        nbatch : int, optional
+            The number of objects in each mini-batch. Default is `50`.
+
+        new_err_dec : float, optional
+            Decrease the accumulated error (chi2) of the nodes in the
+            topological vicinity of the new node by a factor of
+            `1. - new_err_dec`. Default is `0.5`.
+
+        all_err_dec : float, optional
+            Decrease the accumulated error (chi2) of **all** nodes in the
+            graph by a factor of `1. - all_err_dec` for each object
+            in the batch. Default is `5e-3`.
+
+        max_nodes : int, optional
+            The maximum number of allowed nodes in the graph.
+            Default is `2500`.
+
+        niter : int, optional
+            The number of mini-batches used during training.
+            Default is `5000`.
+
+        graph_init : `~networkx.Graph` instance, optional
+            The graph used to initialize the GNG. If not provided, the GNG
+            will be initialized using two random models.
+
+        lprob_func : str or func, optional
+            Log-posterior function to be used when computing fits between
+            the network and the models. Must return ln(prior), ln(like),
+            ln(post), Ndim, and chi2. If not provided,
+            `~frankenz.pdf.logprob` will be used and all fits in the batch
+            will be computed simultaneously.
+
+        rstate : `~numpy.random.RandomState` instance, optional
+            Random state instance. If not passed, the default `~numpy.random`
+            instance will be used.
+
+        lprob_args : args, optional
+            Arguments to be passed to `lprob_func`.
+
+        lprob_kwargs : kwargs, optional
+            Keyword arguments to be passed to `lprob_func`.
+            By default, this sets `free_scale=True` and
+            `ignore_model_err=True`.
+
+        track_scale : bool, optional
+            Not supported when training with mini-batches. Must be `False`.
+
+        monitor : `_TrainMonitor` instance, optional
+            If provided, used to record training metrics.
+
+        """
+
+        # Initialize values.
+        if lprob_func is None:
+            lprob_func = logprob
+        if lprob_args is None:
+            lprob_args = []
+        if lprob_kwargs is None:
+            lprob_kwargs = {'free_scale': True, 'ignore_model_err': True}
+        if rstate is None:
+            rstate = np.random
+        if track_scale:
+            raise ValueError("`track_scale` is not supported when training "
+                             "with mini-batches.")
+        vectorize = (lprob_func is logprob) and (len(lprob_args) == 0)
+        free_scale = lprob_kwargs.get('free_scale', False)
+        dim_prior = lprob_kwargs.get('dim_prior', True)
+        Nmodel, Nfilt = models.shape
+        rows = np.arange(nbatch)
+
+        # Initialize graph.
+        if graph_init is None:
+            i1, i2 = rstate.choice(Nmodel, size=2, replace=False)
+            ids_init = [0, 1]
+            pos_init = [models[i1], models[i2]]
+            err_init = [0., 0.]
+            edges_init = [(0, 1, 0)]
+        else:
+            ids_init = list(graph_init.nodes())
+            pos_init = [graph_init.nodes[n]['pos'] for n in ids_init]
+            err_init = [graph_init.nodes[n].get('error', 0.)
+                        for n in ids_init]
+            edges_init = list(graph_init.edges(data='age', default=0))
+        nnode_init = len(ids_init)
+
+        # Allocate node storage. Nodes occupy "slots" that are freed when
+        # nodes are removed and re-used when new nodes are added. Edges are
+        # stored as an adjacency list mapping each slot to the ages of the
+        # edges connecting it to its neighbors, so that each batch only
+        # touches the edges of its BMUs.
+        Nslot = max(max_nodes, nnode_init)
+        ids = np.full(Nslot, -1, dtype='int')
+        pos = np.zeros((Nslot, Nfilt), dtype='float')
+        err = np.zeros(Nslot, dtype='float')
+        active = np.zeros(Nslot, dtype='bool')
+        adj = [dict() for j in range(Nslot)]
+        ids[:nnode_init] = ids_init
+        pos[:nnode_init] = pos_init
+        err[:nnode_init] = err_init
+        active[:nnode_init] = True
+        slot = dict(zip(ids_init, range(nnode_init)))
+        for n1, n2, age in edges_init:
+            adj[slot[n1]][slot[n2]] = adj[slot[n2]][slot[n1]] = age
+        next_id = max(ids_init) + 1
+        # Nodes whose edges need to be checked for pruning/isolation.
+        check = set(range(nnode_init))
+        self.NNODE = nnode_init
+        self.nodes = pos[active]
+
+        try:
+            # Train the network.
+            for i in range(niter):
+
+                # Draw objects.
+                idxs = rstate.choice(Nmodel, size=nbatch)
+                x, xe, xm = models[idxs], models_err[idxs], models_mask[idxs]
+
+                # Fit network.
+                act = np.flatnonzero(active)
+                y = pos[act]
+                if vectorize:
+                    node_results = _lprob_nodes(x, xe, xm, y,
+                                                free_scale=free_scale,
+                                                dim_prior=dim_prior)
+                    node_lnprob, node_chi2 = node_results
+                else:
+                    ye = np.zeros_like(y)
+                    ym = np.ones_like(y, dtype='bool')
+                    node_lnprob, node_chi2 = [], []
+                    for j in range(nbatch):
+                        res = lprob_func(x[j], xe[j], xm[j], y, ye, ym,
+                                         *lprob_args, **lprob_kwargs)
+                        node_lnprob.append(res[2])
+                        node_chi2.append(res[4])
+                    node_lnprob = np.array(node_lnprob)
+                    node_chi2 = np.array(node_chi2)
+                    node_results = node_lnprob, node_chi2
+
+                # Find the BMU and its closest competitor for each object.
+                y_bmu = np.argmax(node_lnprob, axis=1)
+                lnprob2 = np.array(node_lnprob)
+                lnprob2[rows, y_bmu] = -np.inf
+                y_bmu2 = np.argmax(lnprob2, axis=1)
+                s_bmu, s_bmu2 = act[y_bmu], act[y_bmu2]
+                bmu = ids[s_bmu]
+
+                # Record training metrics.
+                if monitor is not None:
+                    monitor.add(node_chi2[rows, y_bmu],
+                                [b not in adj[a]
+                                 for a, b in zip(s_bmu, s_bmu2)], bmu)
+
+                # Accumulate the batch statistics for each BMU.
+                touched, inv = np.unique(s_bmu, return_inverse=True)
+                counts = np.bincount(inv, minlength=len(touched))
+                xsum = np.zeros((len(touched), Nfilt))
+                np.add.at(xsum, inv, x)
+                np.add.at(err, s_bmu, node_chi2[rows, y_bmu])
+
+                # Update the topological neighbors of the BMUs (using the
+                # positions prior to the BMU updates).
+                nbr_idx, nbr_src = [], []
+                for k, j in enumerate(touched):
+                    nbr_idx.extend(adj[j])
+                    nbr_src.extend([k] * len(adj[j]))
+                nbr_idx = np.array(nbr_idx, dtype='int')
+                nbr_src = np.array(nbr_src, dtype='int')
+                nbrs, nbr_inv = np.unique(nbr_idx, return_inverse=True)
+                nbr_counts = np.bincount(nbr_inv, weights=counts[nbr_src],
+                                         minlength=len(nbrs))
+                nbr_xsum = np.zeros((len(nbrs), Nfilt))
+                np.add.at(nbr_xsum, nbr_inv, xsum[nbr_src])
+                nbr_lr = 1. - (1. - learn_neighbor)**nbr_counts
+                nbr_resid = nbr_xsum / nbr_counts[:, None] - pos[nbrs]
+
+                # Update the BMUs.
+                bmu_lr = 1. - (1. - learn_best)**counts
+                bmu_resid = xsum / counts[:, None] - pos[touched]
+                pos[touched] += bmu_lr[:, None] * bmu_resid
+                pos[nbrs] += nbr_lr[:, None] * nbr_resid
+
+                # Age edges connected to the BMUs.
+                for j, c in zip(touched, counts):
+                    for n in adj[j]:
+                        adj[j][n] += c
+                        adj[n][j] += c
+
+                # Update the connections between BMU and BMU2.
+                for a, b in zip(s_bmu, s_bmu2):
+                    adj[a][b] = adj[b][a] = 0  # rejuvenate/add edge
+
+                # Prune the graph and remove any edges that are too old.
+                check.update(touched)
+                nprune = 0
+                for j in list(check):
+                    for n in [n for n, age in iteritems(adj[j])
+                              if age >= max_age]:
+                        del adj[j][n], adj[n][j]
+                        check.add(n)
+                        nprune += 1
+                # Remove any nodes that become disconnected.
+                for j in check:
+                    if active[j] and len(adj[j]) == 0:
+                        active[j] = False
+                check = set()
+
+                # Try to add a new node.
+                if np.sum(active) < max_nodes:
+                    # Find the node with the largest cumulative error.
+                    e1 = np.flatnonzero(active)[np.argmax(err[active])]
+                    # Find the neighbor with the largest cumulative error.
+                    e1_nbrs = np.array(list(adj[e1]), dtype='int')
+                    e2 = e1_nbrs[np.argmax(err[e1_nbrs])]
+                    # Adjust errors.
+                    err[e1] *= (1. - new_err_dec)
+                    err[e2] *= (1. - new_err_dec)
+                    # Insert new node halfway between `e1` and `e2`.
+                    new = np.flatnonzero(~active)[0]
+                    pos[new] = 0.5 * (pos[e1] + pos[e2])
+                    err[new] = err[e1]
+                    ids[new] = next_id
+                    active[new] = True
+                    next_id += 1
+                    # Modify immediate edges.
+                    del adj[e1][e2], adj[e2][e1]
+                    adj[new][e1] = adj[e1][new] = 0
+                    adj[new][e2] = adj[e2][new] = 0
+
+                # Decrease the cumulative errors within each node.
+                err *= (1. - all_err_dec)**nbatch
+
+                # Re-initialize models.
+                self.NNODE = int(np.sum(active))
+                self.nodes = pos[active]
+                if monitor is not None:
+                    monitor.step(ids[active])
+
+                yield node_results, bmu, self.NNODE, nprune
+        finally:
+            # Construct the final graph.
+            self.graph = nx.Graph()
+            act = np.flatnonzero(active)
+            for count, j in enumerate(act):
+                self.graph.add_node(int(ids[j]), pos=pos[j].copy(),
+                                    error=err[j], count=count)
+            for j in act:
+                for n, age in iteritems(adj[j]):
+                    if j < n:
+                        self.graph.add_edge(int(ids[j]), int(ids[n]),
+                                            age=int(age))
+
+
+def load_network(path, models=None, models_err=None, models_mask=None,
+                 mmap_mode='c', lpnet_func=None, lpnet_args=None,
+                 lpnet_kwargs=None):
+    """
+    Load a network saved using :meth:`_Network.save_network`.
+
+    Parameters
+    ----------
+    path : str
+        The directory where the network was saved.
+
+    models : `~numpy.ndarray` of shape (Nmodel, Nfilt), optional
+        Model values. Required if the models were not saved with the network.
+
+    models_err : `~numpy.ndarray` of shape (Nmodel, Nfilt), optional
+        Associated errors on the model values. Required if the models were
+        not saved with the network.
+
+    models_mask : `~numpy.ndarray` of shape (Nmodel, Nfilt), optional
+        Binary mask (0/1) indicating whether the model value was observed.
+        Required if the models were not saved with the network.
+
+    mmap_mode : {`None`, `'r'`, `'r+'`, `'c'`}, optional
+        The mode used to memory-map the saved arrays (see
+        :meth:`~numpy.load`). The default `'c'` (copy-on-write) allows
+        read-only data to be shared across processes while still
+        allowing in-memory modifications. If `None`, all arrays will be
+        read into memory.
+
+    lpnet_func : func, optional
+        Log-posterior function used when mapping objects onto the network.
+        Required if a custom function was used to populate the network.
+
+    lpnet_args : args, optional
+        Arguments to be passed to `lpnet_func`. If not provided, the saved
+        values will be used.
+
+    lpnet_kwargs : kwargs, optional
+        Keyword arguments to be passed to `lpnet_func`. If not provided,
+        the saved values will be used.
+
+    Returns
+    -------
+    network : `SelfOrganizingMap`, `HierarchicalSOM`, or `GrowingNeuralGas`
+        The re-loaded network.
+
+    """
+
+    # Load metadata.
+    with open(os.path.join(path, 'meta.json'), 'r') as f:
+        meta = json.load(f)
+    if meta['format_version'] > _NETWORK_FORMAT_VERSION:
+        raise ValueError("Network was saved using a newer format (version "
+                         "{0}) than is supported (version {1})."
+                         .format(meta['format_version'],
+                                 _NETWORK_FORMAT_VERSION))
+    network_types = {'SelfOrganizingMap': SelfOrganizingMap,
+                     'HierarchicalSOM': HierarchicalSOM,
+                     'GrowingNeuralGas': GrowingNeuralGas}
+    try:
+        network_type = network_types[meta['class']]
+    except KeyError:
+        raise ValueError("{0} is not a supported network type."
+                         .format(meta['class']))
+
+    # Load models.
+    if meta['models_saved']:
+        if models is None:
+            models = np.load(os.path.join(path, 'models.npy'),
+                             mmap_mode=mmap_mode)
+        if models_err is None:
+            models_err = np.load(os.path.join(path, 'models_err.npy'),
+                                 mmap_mode=mmap_mode)
+        if models_mask is None:
+            models_mask = np.load(os.path.join(path, 'models_mask.npy'),
+                                  mmap_mode=mmap_mode)
+    if models is None or models_err is None or models_mask is None:
+        raise ValueError("The models were not saved with the network and "
+                         "must be provided.")
+    if models.shape != (meta['NMODEL'], meta['NDIM']):
+        raise ValueError("The provided models do not match the shape "
+                         "{0} used by the network."
+                         .format((meta['NMODEL'], meta['NDIM'])))
+
+    # Initialize network.
+    network = network_type(models, models_err, models_mask)
+    network._load_network(path, meta, mmap_mode=mmap_mode,
+                          lpnet_func=lpnet_func, lpnet_args=lpnet_args,
+                          lpnet_kwargs=lpnet_kwargs)
+
+    return network
@@ -17,11 +17,12 @@ import math
 import numpy as np
 import warnings
 from scipy.special import erf, xlogy, gammaln
+from scipy import sparse
 
-__all__ = ["_loglike", "_loglike_s", "loglike", "logprob",
+__all__ = ["_loglike", "_loglike_s", "loglike", "logprob", "logprob_prior",
            "gaussian", "gaussian_bin", "gauss_kde", "gauss_kde_dict",
            "magnitude", "inv_magnitude", "luptitude", "inv_luptitude",
-           "PDFDict", "pdfs_resample", "pdfs_summarize"]
+           "PDFDict", "pdfs_resample", "pdfs_sparsify", "pdfs_summarize"]
 
 
 def _loglike(data, data_err, data_mask, models, models_err, models_mask,
@@ -411,6 +412,153 @@ def logprob(data, data_err, data_mask, models, models_err, models_mask,
         return lnprior, lnlike, lnprob, ndim, chi2, scale, scale_err
 
 
+def logprob_prior(data, data_err, data_mask, models, models_err, models_mask,
+                  lnprior, mbounds=(20, 32), ref_filter=0, zeropoint=23.9,
+                  free_scale=False, ignore_model_err=False, dim_prior=True,
+                  ltol=1e-4, return_scale=False, model_idx=None,
+                  *args, **kwargs):
+    """
+    A version of :meth:`~frankenz.pdf.logprob` that also applies a
+    magnitude-dependent prior P(z, t | m) over the models. The prior is
+    looked up from a precomputed (magnitude, model) table (see
+    :meth:`~frankenz.priors.lnprior_table`) using the magnitude bin
+    closest to the observed flux in the reference filter.
+
+    The table is defined over the full set of models, so `models` must
+    either be that full set or a subset whose indices are passed via
+    `model_idx`. Since :class:`~frankenz.knn.NearestNeighbors` and the
+    network-based fitters only pass `lprob_func` a subset of the models
+    (and not their indices), this function can only be used directly as
+    the `lprob_func` of :class:`~frankenz.bruteforce.BruteForce`.
+
+    Parameters
+    ----------
+    data : `~numpy.ndarray` of shape (Nfilt)
+        Observed data values.
+
+    data_err : `~numpy.ndarray` of shape (Nfilt)
+        Associated (Normal) errors on the observed values.
+
+    data_mask : `~numpy.ndarray` of shape (Nfilt)
+        Binary mask (0/1) indicating whether the data was observed.
+
+    models : `~numpy.ndarray` of shape (Nmodel, Nfilt)
+        Model values.
+
+    models_err : `~numpy.ndarray` of shape (Nmodel, Nfilt)
+        Associated errors on the model values.
+
+    models_mask : `~numpy.ndarray` of shape (Nmodel, Nfilt)
+        Binary mask (0/1) indicating whether the model value was observed.
+
+    lnprior : `~numpy.ndarray` of shape (Nm, Nmodel)
+        Log-prior for each model tabulated over a regular grid of `Nm`
+        magnitudes spanning `mbounds`.
+
+    mbounds : tuple of shape (2,), optional
+        Magnitude lower/upper bounds of the grid used to compute `lnprior`.
+        Default is `(20, 32)`.
+
+    ref_filter : int, optional
+        Index of the filter used to compute the (reference) magnitude.
+        Default is `0`.
+
+    zeropoint : float, optional
+        Zeropoint used to convert the reference flux into an (AB) magnitude.
+        Default is `23.9` (fluxes in microjanskies). Objects with
+        non-positive (or masked) reference flux are assigned to the faintest
+        magnitude bin.
+
+    free_scale : bool, optional
+        Whether to include a free scale factor (scaling the model to the data)
+        in the fit. Default is `False`.
+
+    ignore_model_err : bool, optional
+        Whether to ignore the model errors during calculation.
+        Default is `False`.
+
+    dim_prior : bool, optional
+        Whether to apply a dimensional-based correction (prior) to the
+        log-likelihood. Transforms the likelihood to a chi2 distribution
+        with `dof` degrees of freedom. Default is `True`.
+
+    ltol : float, optional
+        The fractional tolerance in the log-likelihood function used to
+        determine convergence when including errors when the scale factor is
+        left free (i.e. `free_scale = True` and `ignore_model_err = False`).
+        Default is `1e-4`.
+
+    return_scale : bool, optional
+        Whether to return the scale factor derived when `free_scale = True`.
+        Default is `False`.
+
+    model_idx : `~numpy.ndarray` of shape (Nmodel), optional
+        Indices of `models` within the full set of models used to compute
+        `lnprior`, used to slice the table when only a subset of the models
+        is fit. If not provided, `models` must be the full set.
+
+    Returns
+    -------
+    lnprior : `~numpy.ndarray` of shape (Nmodel)
+        Log-prior values.
+
+    lnlike : `~numpy.ndarray` of shape (Nmodel)
+        Log-likelihood values.
+
+    lnprob : `~numpy.ndarray` of shape (Nmodel)
+        Log-posterior values.
+
+    Ndim : `~numpy.ndarray` of shape (Nmodel)
+        Number of observations used in the fit (dimensionality).
+
+    chi2 : `~numpy.ndarray` of shape (Nmodel)
+        Chi-square values used to compute the log-likelihood.
+
+    scale : `~numpy.ndarray` of shape (Nmodel), optional
+        The factor used to scale the model observations to the observed data.
+        Returned if `return_scale = True`.
+
+    scale_err : `~numpy.ndarray` of shape (Nmodel), optional
+        The error on the factor used to scale the model observations.
+        Returned if `return_scale = True`.
+
+    """
+
+    Nm, Nmodel = np.shape(lnprior)
+    if model_idx is None and Nmodel != len(models):
+        raise ValueError("The prior table is defined over {0} models but "
+                         "{1} models were provided. Pass `model_idx` when "
+                         "fitting a subset of the models."
+                         .format(Nmodel, len(models)))
+    if model_idx is not None and len(model_idx) != len(models):
+        raise ValueError("`model_idx` has {0} entries but {1} models were "
+                         "provided.".format(len(model_idx), len(models)))
+
+    # Compute the reference magnitude and the associated prior.
+    flux = data[ref_filter]
+    if data_mask[ref_filter] and np.isfinite(flux) and flux > 0.:
+        mag = -2.5 * np.log10(flux) + zeropoint
+    else:
+        mag = mbounds[1]
+    u = (np.clip(mag, mbounds[0], mbounds[1]) - mbounds[0])
+    idx = int(round(u / (mbounds[1] - mbounds[0]) * (Nm - 1)))
+    lnp = lnprior[idx]
+    if model_idx is not None:
+        lnp = lnp[model_idx]
+
+    # Call `loglike`.
+    results = loglike(data, data_err, data_mask, models, models_err,
+                      models_mask, free_scale=free_scale,
+                      ignore_model_err=ignore_model_err,
+                      dim_prior=dim_prior, ltol=ltol,
+                      return_scale=return_scale, *args, **kwargs)
+
+    lnlike = results[0]
+    lnprob = lnlike + lnp
+
+    return (lnp, lnlike, lnprob) + tuple(results[1:])
+
+
 def gaussian(mu, std, x):
     """
     Gaussian kernal with mean `mu` and standard deviation `std` evaluated
@@ -896,6 +1044,54 @@ def pdfs_resample(pdfs, old_grid, new_grid, renormalize=True,
     return new_pdfs
 
 
+def pdfs_sparsify(pdfs, wt_thresh=1e-3, renormalize=True, chunksize=10000):
+    """
+    Convert a collection of PDFs to a sparse (CSR) representation by
+    discarding values that are (relatively) negligible.
+
+    Parameters
+    ----------
+    pdfs : `~numpy.ndarray` with shape (Npdf, Ngrid)
+        Original collection of PDFs. Can be a `~numpy.memmap`, since
+        only `chunksize` rows are loaded into memory at a time.
+
+    wt_thresh : float, optional
+        The threshold `wt_thresh * max(pdf)` used to ignore values with
+        (relatively) negligible weights. Default is `1e-3`.
+
+    renormalize : bool, optional
+        Whether to renormalize the PDFs after thresholding. PDFs with no
+        positive values are left empty (all zeros). Default is `True`.
+
+    chunksize : int, optional
+        The number of PDFs processed at a time. Default is `10000`.
+
+    Returns
+    -------
+    new_pdfs : `~scipy.sparse.csr_matrix` with shape (Npdf, Ngrid)
+        Sparse PDFs.
+
+    """
+
+    Npdf, Ngrid = np.shape(pdfs)
+
+    # Threshold (and renormalize) PDFs in chunks.
+    blocks = []
+    for i in range(0, Npdf, chunksize):
+        chunk = np.array(pdfs[i:i+chunksize], dtype='float')
+        chunk[chunk <= wt_thresh * chunk.max(axis=1)[:, None]] = 0.
+        if renormalize:
+            norm = chunk.sum(axis=1)
+            norm[norm == 0.] = 1.  # leave empty PDFs empty
+            chunk /= norm[:, None]
+        blocks.append(sparse.csr_matrix(chunk))
+
+    if len(blocks) == 0:
+        return sparse.csr_matrix((Npdf, Ngrid))
+
+    return sparse.vstack(blocks, format='csr')
+
+
 def pdfs_summarize(pdfs, pgrid, renormalize=True, rstate=None,
                    pkern='lorentz', pkern_grid=None, wconf_func=None):
     """
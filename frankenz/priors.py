@@ -14,15 +14,54 @@ import sys
 import os
 import warnings
 import math
+import hashlib
 import numpy as np
 import warnings
 from scipy.interpolate import RegularGridInterpolator as grid_interp
 
-__all__ = ["pmag", "_bpz_prior", "bpz_pt_m", "bpz_pz_tm"]
+__all__ = ["pmag", "_bpz_prior", "bpz_pt_m", "bpz_pz_tm", "lnprior_table"]
 
 bpz_ptm = None
 bpz_pztm = None
 
+# Default location of the cache for tabulated priors (also used by
+# `simulate` for parsed filters and templates).
+_CACHE_DIR = os.environ.get('FRANKENZ_CACHE',
+                            os.path.join(os.path.expanduser('~'), '.cache',
+                                         'frankenz'))
+_BPZ_GRID = {'mbounds': (20., 32.), 'Nm': 1000,
+             'zbounds': (0., 15.), 'Nz': 1000}
+
+# Trapezoid rule (`np.trapz` was renamed `np.trapezoid` in numpy 2.0).
+_trapz = getattr(np, 'trapezoid', None) or np.trapz
+
+
+def _write_cache(fname, write, *args, **kwargs):
+    """
+    Internal function used to write the cache file `fname` by calling
+    `write(f, *args, **kwargs)` on an open file `f`. The file is written
+    to a temporary file first and then moved into place so that concurrent
+    readers never see a partial file. Raises `IOError`/`OSError` on
+    failure.
+
+    """
+
+    cache_dir = os.path.dirname(fname)
+    if cache_dir and not os.path.isdir(cache_dir):
+        try:
+            os.makedirs(cache_dir)
+        except OSError:
+            if not os.path.isdir(cache_dir):  # not created by another process
+                raise
+    tmp = '{0}.{1}.tmp'.format(fname, os.getpid())
+    try:
+        with open(tmp, 'wb') as f:
+            write(f, *args, **kwargs)
+        getattr(os, 'replace', os.rename)(tmp, fname)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
 
 def pmag(mag, maglim, mbounds=(10., 28.), alpha=15., beta=2., gamma=1.,
          Npoints=1000, *args, **kwargs):
@@ -67,7 +106,7 @@ def pmag(mag, maglim, mbounds=(10., 28.), alpha=15., beta=2., gamma=1.,
     # Compute probabilities.
     mgrid = np.linspace(mbounds[0], mbounds[1], Npoints)  # mag grid
     pmgrid = mgrid**alpha * np.exp(-(mgrid / (maglim - gamma))**beta)  # P(mag)
-    pmgrid /= np.trapz(pmgrid, mgrid)  # normalize integral
+    pmgrid /= _trapz(pmgrid, mgrid)  # normalize integral
     pm = np.interp(mag, mgrid, pmgrid)  # extract P(mag)
 
     return pm
@@ -79,8 +118,9 @@ def _bpz_prior(m, zgrid, mbounds=(20, 32), zbounds=(0, 15), *args, **kwargs):
 
     Parameters
     ----------
-    m : float
-        Magnitude (at ~8140A).
+    m : float or `~numpy.ndarray` of shape (Nm,)
+        Magnitude (at ~8140A). If an array is passed, the outputs will have
+        an additional leading dimension of size `Nm`.
 
     zgrid : `~numpy.ndarray`
         Redshift grid.
@@ -113,34 +153,117 @@ def _bpz_prior(m, zgrid, mbounds=(20, 32), zbounds=(0, 15), *args, **kwargs):
 
     # Establish magnitude bounds.
     m = np.clip(m, mbounds[0], mbounds[1])
-    dm = m - mbounds[0]  # dmag
+    dm = np.asarray(m - mbounds[0])[..., None]  # dmag
 
     # Establish redshift bounds.
     zmt = np.clip(zo + km * dm, zbounds[0], zbounds[1])
-    zmt_at_a = zmt**a
+    zmt_at_a = (zmt**a)[..., None, :]
     zt_at_a = np.power.outer(zgrid, a)
 
     # Compute morphological fractions (0=Ell/S0, 1=Spiral, 2=Irr).
-    f_t = np.zeros(3)
-    f_t[:2] = fo_t[:2] * np.exp(-k_t * dm)
-    f_t[2] = 1 - sum(f_t)
+    f_t = np.zeros(dm.shape[:-1] + (3,))
+    f_t[..., :2] = fo_t[:2] * np.exp(-k_t * dm)
+    f_t[..., 2] = 1 - f_t.sum(axis=-1)
 
     # Compute probability.
     p_i = zt_at_a * np.exp(-np.clip(zt_at_a / zmt_at_a, 0., 700.))
-    p_i /= p_i.sum(axis=0)
-    p_i *= f_t
+    p_i /= p_i.sum(axis=-2)[..., None, :]
+    p_i *= f_t[..., None, :]
 
     return p_i, f_t
 
 
+class _GridLookup(object):
+    """
+    Internal class used to linearly interpolate values tabulated over a
+    regular grid. Positions are computed directly from the grid bounds
+    rather than searched for. Called in the same way as
+    `~scipy.interpolate.RegularGridInterpolator` with a tuple of
+    coordinates. Coordinates outside the grid are clipped to the bounds.
+
+    """
+
+    def __init__(self, bounds, values):
+
+        self.bounds = [(float(lo), float(hi)) for lo, hi in bounds]
+        self.values = values
+        self.ndim = len(bounds)
+
+    def __call__(self, points):
+
+        # Compute grid positions and interpolation weights.
+        corners, weights = [], []
+        for i, (x, (lo, hi)) in enumerate(zip(points, self.bounds)):
+            n = self.values.shape[i]
+            u = (np.clip(x, lo, hi) - lo) / (hi - lo) * (n - 1)
+            j = np.clip(np.floor(u).astype('int'), 0, n - 2)
+            corners.append(j)
+            weights.append(u - j)
+
+        # Sum over the corners of each cell.
+        res = 0.
+        for c in range(2**self.ndim):
+            w, sel = 1., []
+            for i in range(self.ndim):
+                bit = (c >> i) & 1
+                w = w * (weights[i] if bit else 1. - weights[i])
+                sel.append(corners[i] + bit)
+            res = res + w * self.values[tuple(sel)]
+
+        return res
+
+
+def _bpz_tables(cache=True, cache_dir=None):
+    """
+    Internal function used to tabulate the BPZ P(t | m) and P(z | t, m)
+    priors over the grid defined by `_BPZ_GRID`. The tables are
+    computed all at once and saved to (and subsequently memory-mapped
+    read-only from) a disk cache so they can be shared across processes.
+
+    """
+
+    if cache_dir is None:
+        cache_dir = _CACHE_DIR
+
+    # Locate the cache.
+    grid = (_BPZ_GRID['mbounds'], _BPZ_GRID['Nm'],
+            _BPZ_GRID['zbounds'], _BPZ_GRID['Nz'])
+    key = hashlib.sha1(str(('bpz', 1, grid)).encode('utf-8')).hexdigest()
+    fnames = [os.path.join(cache_dir, 'bpz_{0}_{1}.npy'.format(name, key))
+              for name in ('ptm', 'pztm')]
+    if cache and all(os.path.exists(fname) for fname in fnames):
+        try:
+            return [np.load(fname, mmap_mode='r') for fname in fnames]
+        except Exception:
+            pass
+
+    # Compute results over an (m, z) grid.
+    mgrid = np.linspace(_BPZ_GRID['mbounds'][0], _BPZ_GRID['mbounds'][1],
+                        _BPZ_GRID['Nm'])
+    zgrid = np.linspace(_BPZ_GRID['zbounds'][0], _BPZ_GRID['zbounds'][1],
+                        _BPZ_GRID['Nz'])
+    pztm, ptm = _bpz_prior(mgrid, zgrid)
+
+    # Save results.
+    if cache:
+        try:
+            for fname, arr in zip(fnames, (ptm, pztm)):
+                _write_cache(fname, np.save, arr)
+        except (IOError, OSError) as e:
+            warnings.warn("Unable to cache the BPZ prior: {0}".format(e))
+
+    return ptm, pztm
+
+
 def bpz_pt_m(t, m, mbounds=(20, 32), bpz_ptm_func=None, *args, **kwargs):
     """
     BPZ conditional prior for P(t | m).
 
     Parameters
     ----------
-    t : int
-        Type.
+    t : float
+        Type. The prior is tabulated for the integer types `0`, `1`, and `2`
+        and linearly interpolated in between.
 
     m : float
         Magnitude.
@@ -160,20 +283,17 @@ def bpz_pt_m(t, m, mbounds=(20, 32), bpz_ptm_func=None, *args, **kwargs):
 
     """
 
-    if t < 0 or t > 2:
+    t = np.asarray(t, dtype='float')
+    if not np.all((t >= 0) & (t <= 2)):
         raise ValueError("t must be between 0 and 2 (inclusive).")
 
     if bpz_ptm_func is None:
         global bpz_ptm
         if bpz_ptm is None:
 
-            # Compute results over an (m, z) grid.
-            mgrid = np.linspace(20., 32., 1000)
-            zgrid = np.linspace(0., 15., 1000)
-
-            # Define the N-D linearly interpolated prior.
-            bpz_arr = np.array([_bpz_prior(m, zgrid)[1] for m in mgrid])
-            bpz_ptm = grid_interp((mgrid, [0, 1, 2]), bpz_arr)
+            # Define the linearly interpolated prior.
+            bpz_arr = _bpz_tables()[0]
+            bpz_ptm = _GridLookup([_BPZ_GRID['mbounds'], (0, 2)], bpz_arr)
 
         bpz_ptm_func = bpz_ptm
 
@@ -190,8 +310,9 @@ def bpz_pz_tm(z, t, m, mbounds=(20, 32), zbounds=(0, 15), bpz_pztm_func=None,
     t : float
         Redshift.
 
-    t : int
-        Type.
+    t : float
+        Type. The prior is tabulated for the integer types `0`, `1`, and `2`
+        and linearly interpolated in between.
 
     m : float
         Magnitude.
@@ -214,22 +335,101 @@ def bpz_pz_tm(z, t, m, mbounds=(20, 32), zbounds=(0, 15), bpz_pztm_func=None,
 
     """
 
-    if t < 0 or t > 2:
+    t = np.asarray(t, dtype='float')
+    if not np.all((t >= 0) & (t <= 2)):
         raise ValueError("t must be between 0 and 2 (inclusive).")
 
     if bpz_pztm_func is None:
         global bpz_pztm
         if bpz_pztm is None:
 
-            # Compute results over an (m, z) grid.
-            mgrid = np.linspace(20., 32., 1000)
-            zgrid = np.linspace(0., 15., 1000)
-
-            # Define the N-D linearly interpolated prior.
-            bpz_arr = np.array([_bpz_prior(m, zgrid)[0] for m in mgrid])
-            bpz_pztm = grid_interp((mgrid, zgrid, [0, 1, 2]), bpz_arr)
+            # Define the linearly interpolated prior.
+            bpz_arr = _bpz_tables()[1]
+            bpz_pztm = _GridLookup([_BPZ_GRID['mbounds'],
+                                    _BPZ_GRID['zbounds'], (0, 2)], bpz_arr)
 
         bpz_pztm_func = bpz_pztm
 
     return bpz_pztm_func((np.clip(m, mbounds[0], mbounds[1]),
                           np.clip(z, zbounds[0], zbounds[1]), t))
+
+
+def lnprior_table(redshifts, types, p_tm=None, p_ztm=None, weights=None,
+                  mbounds=(20, 32), Nm=241, ptm_kwargs=None, pztm_kwargs=None,
+                  *args, **kwargs):
+    """
+    Tabulate the log-prior ln P(z, t | m) = ln P(t | m) + ln P(z | t, m)
+    for a set of models over a regular grid of magnitudes. The result can
+    be passed to :meth:`~frankenz.pdf.logprob_prior` to apply the prior
+    when fitting data.
+
+    Parameters
+    ----------
+    redshifts : `~numpy.ndarray` of shape (Nmodel,)
+        Redshift of each model.
+
+    types : `~numpy.ndarray` of shape (Nmodel,)
+        Type (index) of each model.
+
+    p_tm : function, optional
+        Function of the form `p_tm(t, m, **ptm_kwargs)` that returns
+        P(type | mag). Must broadcast over arrays of types and magnitudes.
+        Default is :meth:`bpz_pt_m`.
+
+    p_ztm : function, optional
+        Function of the form `p_ztm(z, t, m, **pztm_kwargs)` that returns
+        P(z | type, mag). Must broadcast over arrays of redshifts, types,
+        and magnitudes. Default is :meth:`bpz_pz_tm`.
+
+    weights : `~numpy.ndarray` of shape (Nmodel,), optional
+        Additional weights applied to each model (e.g., to split the
+        probability of a given type among multiple templates).
+
+    mbounds : tuple of shape (2,), optional
+        Magnitude lower/upper bounds of the grid. Default is `(20, 32)`.
+
+    Nm : int, optional
+        The number of magnitudes in the grid. Default is `241`.
+
+    ptm_kwargs : dict, optional
+        Additional keyword arguments to be passed to `p_tm`.
+
+    pztm_kwargs : dict, optional
+        Additional keyword arguments to be passed to `p_ztm`.
+
+    Returns
+    -------
+    lnprior : `~numpy.ndarray` of shape (Nm, Nmodel)
+        Log-prior for each model at each magnitude in the grid.
+
+    mgrid : `~numpy.ndarray` of shape (Nm,)
+        The corresponding magnitude grid.
+
+    """
+
+    # Initialize values.
+    if p_tm is None:
+        p_tm = bpz_pt_m
+    if p_ztm is None:
+        p_ztm = bpz_pz_tm
+    if ptm_kwargs is None:
+        ptm_kwargs = dict()
+    if pztm_kwargs is None:
+        pztm_kwargs = dict()
+    redshifts = np.asarray(redshifts, dtype='float')
+    types = np.asarray(types, dtype='int')
+    if redshifts.shape != types.shape:
+        raise ValueError("The shapes of `redshifts` {0} and `types` {1} "
+                         "do not match.".format(redshifts.shape, types.shape))
+    mgrid = np.linspace(mbounds[0], mbounds[1], Nm)
+
+    # Compute P(z, t | m) over the (mag, model) grid.
+    m = mgrid[:, None]
+    prob = (p_tm(types[None, :], m, **ptm_kwargs) *
+            p_ztm(redshifts[None, :], types[None, :], m, **pztm_kwargs))
+    if weights is not None:
+        prob = prob * weights
+    with np.errstate(divide='ignore'):
+        lnprior = np.log(np.broadcast_to(prob, (Nm, len(redshifts))))
+
+    return lnprior, mgrid
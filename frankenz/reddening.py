@@ -20,6 +20,19 @@ import warnings
 __all__ = ["_madau_t1", "_madau_tau1", "_madau_tau2", "madau_teff"]
 
 
+# Lyman series n->1 transitions (n=2,3,...,12) and coefficients.
+_MADAU_LINES = np.array([1216.0, 1026.0, 973.0, 950.0, 938.1, 931.0, 926.5,
+                         923.4, 921.2, 919.6, 918.4])
+_MADAU_COEFFS = np.array([0.0037, 0.00177, 0.00106, 0.000584, 0.00044,
+                          0.00040, 0.00037, 0.00035, 0.00033, 0.00032,
+                          0.00031])
+
+# Cumulative sum of `coeff * l**-3.46` over the lines (in order), so that
+# the contribution from the `m` reddest lines is `wave**3.46 * table[m]`.
+_MADAU_TAU1_TABLE = np.append(0., np.cumsum(_MADAU_COEFFS *
+                                            _MADAU_LINES**-3.46))
+
+
 def _madau_t1(wave, z, l, coeff):
     """
     Applies attenuation from the IGM at a particular set of wavelengths
@@ -29,9 +42,8 @@ def _madau_t1(wave, z, l, coeff):
     """
 
     zlambda = l * (1 + z)  # redshift wavelength
-    tau = np.zeros_like(wave)
-    sel = wave < zlambda  # selecting all wavelengths < zlambda
-    tau[sel] = coeff * (wave[sel] / l) ** 3.46  # optical depth contribution
+    tau = np.where(wave < zlambda,  # selecting all wavelengths < zlambda
+                   coeff * (wave / l) ** 3.46, 0.)  # optical depth
 
     return tau
 
@@ -41,17 +53,20 @@ def _madau_tau1(wave, z):
     Applies attenuation from the IGM from 912-1216 Angstroms at a particular
     set of wavelengths `wave` at redshift `z`.
 
+    Since the lines are ordered by wavelength, a wavelength `wave` is
+    affected by exactly the lines redder than its rest-frame wavelength.
+    The sum over lines is therefore a step function in the rest-frame
+    wavelength times `wave**3.46`, which is evaluated by table lookup.
+
     """
 
-    tau1 = np.zeros_like(wave)
-    lines = [1216.0, 1026.0, 973.0, 950.0, 938.1, 931.0, 926.5, 923.4, 921.2,
-             919.6, 918.4]  # n->1 transitions (n=2,3,...,12)
-    coeffs = [0.0037, 0.00177, 0.00106, 0.000584, 0.00044, 0.00040, 0.00037,
-              0.00035, 0.00033, 0.00032, 0.00031]  # coefficients
+    # Count the number of lines redder than the rest-frame wavelength.
+    wave_rest = wave / (1. + z)
+    nlines = len(_MADAU_LINES) - np.searchsorted(_MADAU_LINES[::-1],
+                                                 wave_rest, side='right')
 
     # Apply attenuation from absorption lines.
-    for l, c in zip(lines, coeffs):
-        tau1 += _madau_t1(wave, z, l, c)
+    tau1 = np.asarray(wave, dtype='float')**3.46 * _MADAU_TAU1_TABLE[nlines]
 
     return tau1
 
@@ -64,16 +79,15 @@ def _madau_tau2(wave, z):
     """
 
     zlambda = 912.0 * (1 + z)
-    tau2 = np.zeros_like(wave)
     sel = wave < zlambda
 
-    xc = wave[sel] / 912.0  # (1+z) factors assuming this was at 912A
+    xc = wave / 912.0  # (1+z) factors assuming this was at 912A
     xem = 1. + z  # observed (1+z)
-    tau2[sel] = ((0.25 * (xc**3) * (xem**0.46 - xc**0.46)) +
-                 (9.4 * (xc**1.5) * (xem**0.18 - xc**0.18)) -
-                 (0.7 * (xc**3) * (xc**-1.32 - xem**-1.32)) -
-                 (0.023 * (xem**1.68 - xc**1.68)))  # compute optical depth
-    tau2[tau2 < 0.] = 0.  # set floor to 0.
+    tau2 = ((0.25 * (xc**3) * (xem**0.46 - xc**0.46)) +
+            (9.4 * (xc**1.5) * (xem**0.18 - xc**0.18)) -
+            (0.7 * (xc**3) * (xc**-1.32 - xem**-1.32)) -
+            (0.023 * (xem**1.68 - xc**1.68)))  # compute optical depth
+    tau2 = np.where(sel & (tau2 > 0.), tau2, 0.)  # set floor to 0.
 
     return tau2
 
@@ -82,10 +96,15 @@ def madau_teff(wave, z):
     """
     Applies attenuation from the IGM at <1216 Angstroms at a particular
     set of wavelengths `wave` at redshift `z`. Returns the **effective
-    transmission**.
+    transmission**. If `z` is an array of shape `(Nz,)`, the transmission
+    is computed for all redshifts at once and an array of shape
+    `(Nz, Nwave)` is returned.
 
     """
 
+    if np.ndim(z) > 0:
+        z = np.asarray(z, dtype='float')[:, None]
+
     # Compute optical depth by splicing together <912 and 912-1216 components.
     tau = _madau_tau1(wave, z) + _madau_tau2(wave, z)
 
@@ -9,6 +9,7 @@ Various samplers used for population/hierarchical redshift inference.
 from __future__ import (print_function, division)
 import six
 from six.moves import range
+from six import iteritems
 
 import sys
 import os
@@ -16,9 +17,16 @@ import warnings
 import math
 import numpy as np
 import warnings
-from scipy import stats
+from scipy import stats, sparse
+from scipy.special import gammaln, xlogy
+try:
+    from scipy.special import logsumexp
+except ImportError:
+    from scipy.misc import logsumexp
 
-__all__ = ["loglike_nz", "population_sampler", "hierarchical_sampler"]
+__all__ = ["loglike_nz", "population_sampler", "hierarchical_sampler",
+           "population_hmc_sampler", "population_em", "load_samples",
+           "ChainDiagnostics"]
 
 
 def loglike_nz(nz, pdfs, overlap=None, return_overlap=False,
@@ -33,8 +41,10 @@ def loglike_nz(nz, pdfs, overlap=None, return_overlap=False,
     nz : `~numpy.ndarray` of shape `(Nbins,)`
         The population redshift distribution.
 
-    pdfs : `~numpy.ndarray` of shape `(Nobs, Nbins,)`
-        The individual redshift PDFs that make up the sample.
+    pdfs : array-like of shape `(Nobs, Nbins,)`
+        The individual redshift PDFs that make up the sample. Can be
+        a `~numpy.ndarray` or a `~scipy.sparse` matrix. Column
+        access (used with `pair`) is fastest with a CSC matrix.
 
     overlap : `~numpy.ndarray` of shape `(Nobs,)`
         The overlap integrals (sums) between `pdfs` and `nz`. If not provided,
@@ -65,12 +75,16 @@ def loglike_nz(nz, pdfs, overlap=None, return_overlap=False,
     else:
         # Compute overlap.
         if overlap is None:
-            overlap = np.dot(pdfs, nz)
+            overlap = pdfs.dot(nz)
         # Compute perturbation from pair.
         if pair is not None:
             i, j = pair
             if pair_step is not None:
-                perturb = pair_step * (pdfs[:, i] - pdfs[:, j])
+                if sparse.issparse(pdfs):
+                    pdiff = (pdfs[:, i] - pdfs[:, j]).toarray().flatten()
+                else:
+                    pdiff = pdfs[:, i] - pdfs[:, j]
+                perturb = pair_step * pdiff
         # Compute log-likelihood.
         lnlike = np.sum(np.log(overlap + perturb))
 
@@ -80,44 +94,1250 @@ def loglike_nz(nz, pdfs, overlap=None, return_overlap=False,
         return lnlike
 
 
-class population_sampler(object):
+def population_em(pdfs, alpha=None, pos_init=None, maxiter=1000, tol=1e-8,
+                  accelerate=True, mix=0., chunksize=None, pool=None,
+                  verbose=True):
     """
-    Sampler for drawing redshift population distributions given a set of
-    individual redshift PDFs.
+    Compute the maximum-a-posteriori (MAP) population redshift distribution
+    given a collection of PDFs using the expectation-maximization (EM)
+    fixed-point iteration
+
+        `nz_j <- (nz_j * sum_i pdfs_ij / overlap_i + alpha_j - 1) /
+                 (Nobs + sum_j (alpha_j - 1))`,
+
+    optionally accelerated using SQUAREM (Varadhan & Roland 2008).
+    Assumes a Dirichlet prior. The MAP can contain bins at exactly zero
+    (e.g., for `alpha <= 1.`), which samplers working in log-space (e.g.,
+    :class:`population_hmc_sampler`) cannot easily move away from, so use
+    `mix > 0.` when using the result as `pos_init` for the MCMC samplers.
+
+    Parameters
+    ----------
+    pdfs : array-like of shape `(Nobs, Nbins,)`
+        The individual redshift PDFs that make up the sample. Can be
+        a `~numpy.ndarray` (including a `~numpy.memmap`) or a
+        `~scipy.sparse` matrix.
+
+    alpha : `~numpy.ndarray` of shape `(Nbins,)`, optional
+        The concentration parameters for the Dirichlet prior.
+        If not provided, a flat `alpha = 1.` will be assumed, in which case
+        the maximum-likelihood solution is returned. Bins where the update
+        is negative (only possible for `alpha < 1.`) are set to zero.
+
+    pos_init : `~numpy.ndarray` of shape `(Nbins,)`, optional
+        The initial position from where we should start iterating.
+        If not provided, the initial position will be the stacked PDFs.
+
+    maxiter : int, optional
+        The maximum number of (accelerated) iterations. Default is `1000`.
+
+    tol : float, optional
+        The iteration stops when the maximum absolute change in `nz`
+        between iterations falls below `tol`. Default is `1e-8`.
+
+    accelerate : bool, optional
+        Whether to use SQUAREM extrapolation to accelerate convergence.
+        Default is `True`.
+
+    mix : float, optional
+        If positive, the returned `nz` is mixed with a uniform distribution
+        as `(1 - mix) * nz + mix / Nbins` so that every bin is positive,
+        which provides a good starting position for the MCMC samplers
+        (e.g., `mix=0.1`). Default is `0.` (return the MAP).
+
+    chunksize : int, optional
+        If provided, the overlap integrals are computed over chunks of
+        `chunksize` objects at a time to limit memory usage when working
+        with large (e.g., memory-mapped) PDF tables.
+
+    pool : user-provided pool, optional
+        Use this pool of workers to compute the overlap integrals over
+        chunks of `chunksize` objects in parallel. Must provide a `map`
+        function. Memory-mapped `pdfs` are re-opened by each worker rather
+        than copied.
+
+    verbose : bool, optional
+        Whether or not to output a simple summary of the current run that
+        updates with each iteration. Default is `True`.
+
+    Returns
+    -------
+    nz : `~numpy.ndarray` of shape `(Nbins,)`
+        The MAP population redshift distribution (mixed with a uniform
+        distribution if `mix > 0.`).
+
+    lnpost : float
+        The log-posterior (up to a constant) at the MAP.
+
+    niter : int
+        The number of iterations performed.
+
+    """
+
+    # Initialize values.
+    Nobs, Ndim = pdfs.shape
+    if alpha is None:
+        alpha = np.ones(Ndim)
+    if pos_init is None:
+        nz = _stack_pdfs(pdfs)
+    else:
+        nz = np.array(pos_init, dtype='float')
+        nz /= nz.sum()
+
+    def update(x):
+        return _em_update(pdfs, x, alpha, chunksize=chunksize, pool=pool)
+
+    # Iterate.
+    nz_new, lnpost = update(nz)
+    niter = 0
+    for i in range(maxiter):
+        niter = i + 1
+        if accelerate:
+            # Take two EM steps.
+            nz2, lnpost1 = update(nz_new)
+            r = nz_new - nz
+            v = nz2 - 2. * nz_new + nz
+            vnorm = np.sqrt(np.dot(v, v))
+            if vnorm > 0.:
+                # Extrapolate (SQUAREM-3 step length).
+                a = min(-np.sqrt(np.dot(r, r)) / vnorm, -1.)
+                nz_acc = nz - 2. * a * r + a**2 * v
+                nz_acc = np.clip(nz_acc, 0., None)
+                nz_acc /= nz_acc.sum()
+                # Stabilize with an additional EM step.
+                nz_acc, lnpost_acc = update(nz_acc)
+            else:
+                nz_acc, lnpost_acc = nz2, -np.inf
+            nz_next, lnpost_next = update(nz_acc)
+            # Fall back to the plain EM step if extrapolation got worse.
+            if not lnpost_next >= lnpost1:
+                nz_acc = nz2
+                nz_next, lnpost_next = update(nz_acc)
+        else:
+            nz_acc = nz_new
+            nz_next, lnpost_next = update(nz_acc)
+        delta = np.max(np.abs(nz_acc - nz))
+        nz, nz_new, lnpost = nz_acc, nz_next, lnpost_next
+        if verbose:
+            sys.stderr.write('\r Iteration {:d}/{:d} [lnpost = {:6.3f}, '
+                             'delta = {:6.3e}]      '
+                             .format(i+1, maxiter, lnpost, delta))
+            sys.stderr.flush()
+        if delta < tol:
+            break
+
+    # Regularize the solution.
+    if mix > 0.:
+        nz = (1. - mix) * nz + mix / Ndim
+
+    return nz, lnpost, niter
+
+
+def _em_update(pdfs, nz, alpha, chunksize=None, pool=None):
+    """
+    Internal function used to compute a single EM update of `nz` along with
+    the log-posterior at the input `nz`.
+
+    """
+
+    # Compute the overlaps and expected bin counts.
+    lnlike, grad = _reduce_pdfs(pdfs, nz, chunksize=chunksize, pool=pool)
+    counts = grad * nz
+    lnpost = lnlike + np.sum(xlogy(alpha - 1., nz))
+
+    # Compute the (MAP) update.
+    nz_new = np.clip(counts + alpha - 1., 0., None)
+    nz_new /= nz_new.sum()
+
+    return nz_new, lnpost
+
+
+def _pair_diff(pdfs, pair):
+    """
+    Internal function used to compute the difference `pdfs[:, i] -
+    pdfs[:, j]` between a pair of columns of a sparse (CSC) matrix over the
+    rows where either column is nonzero.
+
+    Returns
+    -------
+    rows : `~numpy.ndarray` of shape `(Nrows,)`
+        The rows where either column is nonzero.
+
+    pdiff : `~numpy.ndarray` of shape `(Nrows,)`
+        The difference between the two columns for each row.
+
+    """
+
+    i, j = pair
+    ptr, idxs, vals = pdfs.indptr, pdfs.indices, pdfs.data
+    rows = np.concatenate([idxs[ptr[i]:ptr[i+1]], idxs[ptr[j]:ptr[j+1]]])
+    rows, inv = np.unique(rows, return_inverse=True)
+    pdiff = np.bincount(inv.flatten(),
+                        weights=np.concatenate([vals[ptr[i]:ptr[i+1]],
+                                                -vals[ptr[j]:ptr[j+1]]]),
+                        minlength=len(rows))
+
+    return rows, pdiff
+
+
+def _loglike_nz_pair(nz, overlap, lnlike, rows, pdiff, pair_step):
+    """
+    Internal function used to update the log-likelihood computed using
+    :meth:`loglike_nz` after perturbing a pair of bins, using only the rows
+    affected by the perturbation (see `_pair_diff`).
+
+    Returns
+    -------
+    loglike : float
+        The updated log-likelihood.
+
+    overlap_new : `~numpy.ndarray` of shape `(Nrows,)`
+        The updated overlap integrals for the affected rows.
+
+    """
+
+    if np.any(~np.isfinite(nz) | (nz < 0.)):
+        return -np.inf, None
+    ov = overlap[rows]
+    ov_new = ov + pair_step * pdiff
+    lnlike = lnlike + np.sum(np.log(ov_new)) - np.sum(np.log(ov))
+
+    return lnlike, ov_new
+
+
+def _block_hessian(pdfs, overlap):
+    """
+    Internal function used to compute the (negative) Hessian of
+    :meth:`loglike_nz` with respect to `nz`, `pdfs.T * diag(1 / overlap**2)
+    * pdfs`, which sets the curvature along each pair of bins used for
+    blocked updates.
+
+    """
+
+    w = 1. / overlap**2
+    if sparse.issparse(pdfs):
+        hess = pdfs.T.dot(pdfs.multiply(w[:, None]).tocsr())
+        return np.asarray(hess.todense())
+
+    return np.asarray(pdfs.T.dot(pdfs * w[:, None]))
+
+
+def _block_scale(hess, p1, p2):
+    """
+    Internal function used to compute the proposal scale along each of the
+    disjoint pairs of bins `(p1, p2)` used for blocked updates from the
+    curvature of the log-likelihood along each pair (see `_block_hessian`).
+
+    """
+
+    K = len(p1)
+    curv = hess[p1, p1] + hess[p2, p2] - 2. * hess[p1, p2]
+    # Fall back to the typical curvature for degenerate pairs.
+    good = np.isfinite(curv) & (curv > 0.)
+    if not np.all(good):
+        curv = np.where(good, curv, np.mean(curv[good]) if np.any(good)
+                        else 1.)
+
+    return 2.38 / np.sqrt(K * curv)
+
+
+def _reflect(x, upper):
+    """
+    Internal function used to reflect `x` into the interval `[0, upper]`.
+    Since each pair of bins updated during blocked updates conserves its
+    total `upper`, reflecting the proposal at both ends of the interval
+    keeps it symmetric while ensuring bins never become negative.
+
+    """
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        y = np.mod(x, 2. * upper)
+        y = np.where(y > upper, 2. * upper - y, y)
+
+    return np.where(upper > 0., y, 0.)
+
+
+def _stack_pdfs(pdfs):
+    """
+    Internal function used to compute the normalized stacked PDF.
+
+    """
+
+    return np.asarray(pdfs.sum(axis=0)).flatten() / pdfs.sum()
+
+
+def _check_mass(mass):
+    """
+    Internal function used to check that every object has some probability
+    of being assigned to a redshift bin.
+
+    """
+
+    nempty = int(np.sum(~(mass > 0.)))
+    if nempty > 0:
+        raise ValueError("{0} object(s) have PDFs with no probability in "
+                         "any bin with nonzero `nz`. These must be removed "
+                         "before sampling.".format(nempty))
+
+
+def _draw_counts(pdfs, nz, rstate=None, chunksize=10000):
+    """
+    Draw a redshift bin for each object from the categorical distribution
+    proportional to `pdfs * nz` and return the total number of objects
+    in each bin. Objects are sampled in chunks using the (unnormalized)
+    cumulative distribution and a single set of uniform random numbers.
+
+    Parameters
+    ----------
+    pdfs : array-like of shape `(Nobs, Nbins,)`
+        The individual redshift PDFs that make up the sample. Can be
+        a `~numpy.ndarray` or a `~scipy.sparse` matrix. Sparse
+        matrices are sampled all at once using the cumulative distribution
+        over the stored (nonzero) values.
+
+    nz : `~numpy.ndarray` of shape `(Nbins,)`
+        The population redshift distribution.
+
+    rstate : `~numpy.random.RandomState`, optional
+        `~numpy.random.RandomState` instance.
+
+    chunksize : int, optional
+        The number of objects sampled at once. Default is `10000`.
+
+    Returns
+    -------
+    counts : `~numpy.ndarray` of shape `(Nbins,)`
+        The number of objects drawn in each bin.
+
+    Raises
+    ------
+    ValueError
+        If any object has no probability in any bin (i.e. `pdfs * nz`
+        sums to zero), since it cannot be assigned a redshift.
+
+    """
+
+    if rstate is None:
+        rstate = np.random
+    Nobs, Nbins = pdfs.shape
+
+    if sparse.issparse(pdfs):
+        pdfs = sparse.csr_matrix(pdfs)
+        cdf = np.cumsum(pdfs.data * nz[pdfs.indices])
+        start, end = pdfs.indptr[:-1], pdfs.indptr[1:]
+        low = np.append(0., cdf)[start]
+        high = np.append(0., cdf)[end]
+        _check_mass(high - low)
+        u = low + rstate.rand(Nobs) * (high - low)
+        idxs = np.clip(np.searchsorted(cdf, u, side='right'), start, end - 1)
+        return np.bincount(pdfs.indices[idxs], minlength=Nbins)
+
+    counts = np.zeros(Nbins, dtype='int')
+    for i in range(0, Nobs, chunksize):
+        cdf = np.cumsum(pdfs[i:i+chunksize] * nz, axis=1)
+        _check_mass(cdf[:, -1])
+        u = rstate.rand(len(cdf)) * cdf[:, -1]
+        idxs = np.minimum(np.sum(cdf <= u[:, None], axis=1), Nbins - 1)
+        counts += np.bincount(idxs, minlength=Nbins)
+
+    return counts
+
+
+def _share_pdfs(pdfs):
+    """
+    Internal function used to pass `pdfs` to pool workers. Memory-mapped
+    arrays are passed by reference (filename) so each worker can re-open
+    them read-only rather than receiving a copy.
+
+    """
+
+    if isinstance(pdfs, np.memmap) and pdfs.filename is not None:
+        order = 'F' if (pdfs.flags.f_contiguous and
+                        not pdfs.flags.c_contiguous) else 'C'
+        return ('memmap', pdfs.filename, pdfs.dtype.str, pdfs.offset,
+                pdfs.shape, order)
+    else:
+        return pdfs
+
+
+def _load_pdfs(pdfs):
+    """
+    Internal function used to load `pdfs` passed using `_share_pdfs`.
+
+    """
+
+    if isinstance(pdfs, tuple) and pdfs[0] == 'memmap':
+        _, filename, dtype, offset, shape, order = pdfs
+        return np.memmap(filename, dtype=dtype, mode='r', offset=offset,
+                         shape=shape, order=order)
+    else:
+        return pdfs
+
+
+def _reduce_block(args):
+    """
+    Internal function used to reduce a single block of `pdfs`. Defined at
+    the module level so that it can be passed to a `pool`.
+
+    """
+
+    # Unpack arguments.
+    kind, pdfs, start, stop, nz, seed = args
+    pdfs = _load_pdfs(pdfs)
+    if start > 0 or stop < pdfs.shape[0]:
+        pdfs = pdfs[start:stop]
+
+    if kind == 'counts':
+        # Draw redshifts and count the number of objects in each bin.
+        return _draw_counts(pdfs, nz, rstate=np.random.RandomState(seed))
+    elif kind == 'dot':
+        # Compute the product with `nz` (e.g., the overlap integrals).
+        return np.asarray(pdfs.dot(nz)).flatten()
+    elif kind == 'pair':
+        # Compute the difference between the pair of columns `nz`.
+        i, j = nz
+        pdiff = pdfs[:, i] - pdfs[:, j]
+        if sparse.issparse(pdiff):
+            pdiff = pdiff.toarray()
+        return np.asarray(pdiff, dtype='float').flatten()
+    elif kind == 'hess':
+        # Compute the (negative) Hessian of the log-likelihood.
+        return _block_hessian(pdfs, np.asarray(pdfs.dot(nz)).flatten())
+    else:
+        # Compute the log-likelihood and its gradient.
+        overlap = pdfs.dot(nz)
+        grad = np.asarray(pdfs.T.dot(1. / overlap)).flatten()
+        return np.sum(np.log(overlap)), grad
+
+
+def _reduce_pdfs(pdfs, nz, kind='grad', chunksize=None, pool=None,
+                 rstate=None):
+    """
+    Internal function used to stream over blocks of `chunksize` objects
+    in `pdfs` (e.g., a `~numpy.memmap` that does not fit in memory),
+    optionally in parallel using `pool`. If `kind='grad'`, returns the
+    log-likelihood (see :meth:`loglike_nz`) and its gradient with respect
+    to `nz`. If `kind='counts'`, returns the number of objects drawn in
+    each bin (see `_draw_counts`). If `kind='dot'`, returns `pdfs.dot(nz)`.
+    If `kind='pair'`, returns the difference between the pair of columns
+    `nz = (i, j)` (see `_pair_diff`). If `kind='hess'`, returns the
+    (negative) Hessian of the log-likelihood at `nz` (see `_block_hessian`).
+
+    """
+
+    # Initialize values.
+    if rstate is None:
+        rstate = np.random
+    Nobs, Nbins = pdfs.shape
+    if chunksize is None:
+        chunksize = Nobs
+    bounds = [(i, min(i + chunksize, Nobs)) for i in range(0, Nobs, chunksize)]
+
+    # Reduce blocks serially.
+    if pool is None:
+        if kind == 'counts':
+            counts = np.zeros(Nbins, dtype='int')
+            for start, stop in bounds:
+                counts += _draw_counts(pdfs[start:stop], nz, rstate=rstate)
+            return counts
+        results = [_reduce_block((kind, pdfs, start, stop, nz, None))
+                   for start, stop in bounds]
+    else:
+        # Reduce blocks in parallel. Memory-mapped arrays are re-opened by
+        # each worker, otherwise only the block itself is passed.
+        shared = _share_pdfs(pdfs)
+        if kind == 'counts':
+            seeds = rstate.randint(2**31 - 1, size=len(bounds))
+        else:
+            seeds = [None for b in bounds]
+        if isinstance(shared, tuple):
+            argset = [(kind, shared, start, stop, nz, seed)
+                      for (start, stop), seed in zip(bounds, seeds)]
+        else:
+            argset = [(kind, pdfs[start:stop], 0, stop - start, nz, seed)
+                      for (start, stop), seed in zip(bounds, seeds)]
+        results = list(pool.map(_reduce_block, argset))
+
+    # Combine results.
+    if kind in ('counts', 'hess'):
+        return np.sum(results, axis=0)
+    elif kind in ('dot', 'pair'):
+        return np.concatenate(results)
+
+    return (sum(res[0] for res in results),
+            np.sum([res[1] for res in results], axis=0))
+
+
+def _run_chain(args):
+    """
+    Internal function used to run a single chain. Defined at the module
+    level so that it can be passed to a `pool`.
+
+    """
+
+    # Unpack arguments.
+    (sampler_type, pdfs, init_kwargs, Niter, seed, pos_init, tuning,
+     kwargs) = args
+
+    # Run the chain, re-using any proposal tuned in a previous round.
+    sampler = sampler_type(_load_pdfs(pdfs), **init_kwargs)
+    for name, val in iteritems(tuning):
+        setattr(sampler, name, val)
+    sampler.run_mcmc(Niter, pos_init=pos_init,
+                     rstate=np.random.RandomState(seed), verbose=False,
+                     **kwargs)
+    tuning = {name: getattr(sampler, name) for name in sampler._TUNING}
+    last = (sampler._buffer.last, sampler._buffer.last_lnp)
+
+    return sampler.results + (last, sampler.naccept, sampler.nprop,
+                              sampler.nwarmup, tuning)
+
 
+def _multinomial_logpmf(counts, N, p):
     """
+    Internal function used to compute the log-pmf of a multinomial
+    distribution. Equivalent to `~scipy.stats.multinomial.logpmf` without
+    the input validation.
 
-    def __init__(self, pdfs):
+    """
+
+    return (gammaln(N + 1) - np.sum(gammaln(counts + 1)) +
+            np.sum(xlogy(counts, p)))
+
+
+def _dirichlet_logpdf(x, alpha):
+    """
+    Internal function used to compute the log-pdf of a Dirichlet
+    distribution. Equivalent to `~scipy.stats.dirichlet.logpdf` without
+    the input validation.
+
+    """
+
+    return (gammaln(np.sum(alpha)) - np.sum(gammaln(alpha)) +
+            np.sum(xlogy(alpha - 1., x)))
+
+
+class _SampleBuffer(object):
+    """
+    Internal class used to store samples in preallocated arrays that grow
+    geometrically as needed. If a `sink` is provided, samples are instead
+    written to disk in blocks of `blocksize` samples (as
+    `<sink>_<block>.npz` files) so that only the current block is held
+    in memory.
+
+    """
+
+    def __init__(self, sink=None, blocksize=1000):
+
+        self.sink, self.blocksize = sink, blocksize
+        self._samples, self._samples_lnp = None, None
+        self.nsamps, self.nblocks = 0, 0
+        self.last, self.last_lnp = None, None
+
+    @property
+    def samples(self):
+        """Samples currently held in memory."""
+
+        if self._samples is None:
+            return np.array([])
+        return self._samples[:self.nsamps]
+
+    @property
+    def samples_lnp(self):
+        """ln(posterior) of the samples currently held in memory."""
+
+        if self._samples_lnp is None:
+            return np.array([])
+        return self._samples_lnp[:self.nsamps]
+
+    def append(self, x, lnp):
+        """Add a sample to the buffer."""
+
+        x = np.asarray(x)
+        if self._samples is None:
+            # Allocate storage.
+            size = self.blocksize if self.sink is not None else 128
+            self._samples = np.empty((size,) + x.shape, dtype=x.dtype)
+            self._samples_lnp = np.empty(size)
+        elif self.nsamps == len(self._samples):
+            # Grow storage.
+            size = 2 * len(self._samples)
+            samples = np.empty((size,) + x.shape, dtype=x.dtype)
+            samples_lnp = np.empty(size)
+            samples[:self.nsamps] = self._samples
+            samples_lnp[:self.nsamps] = self._samples_lnp
+            self._samples, self._samples_lnp = samples, samples_lnp
+        self._samples[self.nsamps] = x
+        self._samples_lnp[self.nsamps] = lnp
+        self.nsamps += 1
+        self.last, self.last_lnp = np.array(x), lnp
+        if self.sink is not None and self.nsamps >= self.blocksize:
+            self.flush()
+
+    def skip(self, x, lnp):
+        """Record the latest position without saving it as a sample."""
+
+        self.last, self.last_lnp = np.array(x), lnp
+
+    def flush(self):
+        """Write the samples held in memory to the `sink`."""
+
+        if self.sink is None or self.nsamps == 0:
+            return
+        fname = '{0}_{1:06d}.npz'.format(self.sink, self.nblocks)
+        np.savez(fname, samples=self.samples, samples_lnp=self.samples_lnp)
+        self.nsamps = 0
+        self.nblocks += 1
+
+    def load(self):
+        """Return all samples, including those written to the `sink`."""
+
+        samples, samples_lnp = [], []
+        if self.sink is not None and self.nblocks > 0:
+            samples, samples_lnp = load_samples(self.sink, self.nblocks)
+            samples, samples_lnp = [samples], [samples_lnp]
+        if self.nsamps > 0:
+            samples.append(self.samples)
+            samples_lnp.append(self.samples_lnp)
+        if len(samples) == 0:
+            return np.array([]), np.array([])
+
+        return np.concatenate(samples), np.concatenate(samples_lnp)
+
+
+def load_samples(sink, nblocks=None):
+    """
+    Load samples written to disk by a sampler using a `sink`.
+
+    Parameters
+    ----------
+    sink : str
+        The prefix used when writing the samples.
+
+    nblocks : int, optional
+        The number of blocks to load. If not provided, all consecutive
+        blocks found on disk will be loaded.
+
+    Returns
+    -------
+    samples : `~numpy.ndarray` of shape `(Nsamps, Ndim)`
+        The saved samples.
+
+    samples_lnp : `~numpy.ndarray` of shape `(Nsamps,)`
+        The ln(posterior) of each sample.
+
+    """
+
+    samples, samples_lnp = [], []
+    i = 0
+    while nblocks is None or i < nblocks:
+        fname = '{0}_{1:06d}.npz'.format(sink, i)
+        if nblocks is None and not os.path.exists(fname):
+            break
+        with np.load(fname) as f:
+            samples.append(f['samples'])
+            samples_lnp.append(f['samples_lnp'])
+        i += 1
+    if len(samples) == 0:
+        return np.array([]), np.array([])
+
+    return np.concatenate(samples), np.concatenate(samples_lnp)
+
+
+class ChainDiagnostics(object):
+    """
+    Convergence diagnostics for one or more chains that are updated as
+    samples arrive using constant memory. Each chain is summarized by at
+    most `nbatch` batch sums (and sums of squares) whose size doubles
+    whenever all batches are full. These are used to estimate the
+    autocorrelation time (via batch means), the effective sample size, and
+    the split-Rhat (Gelman et al. 2013) over the first and second halves of
+    each chain.
+
+    """
+
+    def __init__(self, ndim, nchains=1, nbatch=64):
         """
-        Initialize the sampler.
+        Initialize the diagnostics.
 
         Parameters
         ----------
-        pdfs : `~numpy.ndarray` of shape `(Nobs, Nbins,)`
-            The individual redshift PDFs that make up the sample.
+        ndim : int
+            The number of dimensions (bins) of each sample.
+
+        nchains : int, optional
+            The number of chains. Default is `1`.
+
+        nbatch : int, optional
+            The maximum number of batches stored for each chain. Must be
+            even. Default is `64`.
 
         """
 
+        if nbatch < 4 or nbatch % 2 != 0:
+            raise ValueError("`nbatch` must be an even number >= 4.")
+
         # Initialize values.
-        self.pdfs = pdfs
-        self.samples = []
-        self.samples_lnp = []
+        self.ndim, self.nchains, self.nbatch = ndim, nchains, nbatch
+        self.nsamps = np.zeros(nchains, dtype='int')
+        self.bsize = np.ones(nchains, dtype='int')
+        self.nb = np.zeros(nchains, dtype='int')
+        self.shift = np.zeros((nchains, ndim))
+        self.psum = np.zeros((nchains, ndim))
+        self.psq = np.zeros((nchains, ndim))
+        self.pcount = np.zeros(nchains, dtype='int')
+        self.bsum = np.zeros((nchains, nbatch, ndim))
+        self.bsq = np.zeros((nchains, nbatch, ndim))
+
+    def update(self, x, chain=0):
+        """
+        Add a new sample `x` of shape `(ndim,)` from chain `chain`.
+
+        """
+
+        c = chain
+        x = np.asarray(x, dtype='float')
+        if self.nsamps[c] == 0:
+            # Shift samples by the first sample for numerical stability.
+            self.shift[c] = x
+        x = x - self.shift[c]
+        self.nsamps[c] += 1
+        self.psum[c] += x
+        self.psq[c] += x * x
+        self.pcount[c] += 1
+
+        # Close the current batch.
+        if self.pcount[c] == self.bsize[c]:
+            self.bsum[c, self.nb[c]] = self.psum[c]
+            self.bsq[c, self.nb[c]] = self.psq[c]
+            self.nb[c] += 1
+            self.psum[c], self.psq[c], self.pcount[c] = 0., 0., 0
+            # Merge adjacent batches once we run out of space.
+            if self.nb[c] == self.nbatch:
+                h = self.nbatch // 2
+                self.bsum[c, :h] = self.bsum[c, 0::2] + self.bsum[c, 1::2]
+                self.bsq[c, :h] = self.bsq[c, 0::2] + self.bsq[c, 1::2]
+                self.nb[c], self.bsize[c] = h, 2 * self.bsize[c]
+
+    def _moments(self, c, start, stop):
+        # Mean and variance of the samples in batches `start:stop`.
+        n = (stop - start) * self.bsize[c]
+        mean = self.bsum[c, start:stop].sum(axis=0) / n
+        var = self.bsq[c, start:stop].sum(axis=0) / n - mean**2
+
+        return mean, np.clip(var, 0., None) * n / max(n - 1, 1)
+
+    @property
+    def tau(self):
+        """
+        The integrated autocorrelation time in each dimension, averaged
+        over chains. Returns `nan` until each chain has at least 4 batches.
+
+        """
 
-    def reset(self):
-        """Re-initialize the sampler."""
+        if np.any(self.nb < 4):
+            return np.full(self.ndim, np.nan)
+        tau = np.zeros(self.ndim)
+        for c in range(self.nchains):
+            nb, b = self.nb[c], self.bsize[c]
+            _, var = self._moments(c, 0, nb)
+            bmeans = self.bsum[c, :nb] / b
+            bvar = np.var(bmeans, axis=0, ddof=1)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                tau += np.where(var > 0., b * bvar / var, 1.)
 
-        self.samples = []
-        self.samples_lnp = []
+        return tau / self.nchains
+
+    @property
+    def ess(self):
+        """The effective sample size in each dimension (over all chains)."""
+
+        return np.sum(self.nb * self.bsize) / self.tau
+
+    @property
+    def rhat(self):
+        """
+        The split-Rhat in each dimension computed from the first and
+        second halves of each chain. Returns `nan` until each chain has at
+        least 4 batches.
+
+        """
+
+        if np.any(self.nb < 4):
+            return np.full(self.ndim, np.nan)
+        means, variances = [], []
+        for c in range(self.nchains):
+            h = self.nb[c] // 2
+            for start in (0, h):
+                mean, var = self._moments(c, start, start + h)
+                means.append(mean + self.shift[c])
+                variances.append(var)
+        n = np.min(self.nb // 2 * self.bsize)
+        W = np.mean(variances, axis=0)
+        B = np.var(means, axis=0, ddof=1)  # B / n
+        var_plus = (n - 1.) / n * W + B
+        with np.errstate(invalid='ignore', divide='ignore'):
+            rhat = np.where(W > 0., np.sqrt(var_plus / W), 1.)
+
+        return rhat
+
+    def converged(self, min_ess=None, max_rhat=None):
+        """
+        Check whether the chains satisfy the provided stopping criteria.
+
+        Parameters
+        ----------
+        min_ess : float, optional
+            The minimum effective sample size required in every dimension.
+
+        max_rhat : float, optional
+            The maximum split-Rhat allowed in every dimension.
+
+        Returns
+        -------
+        converged : bool
+            Whether all provided criteria have been met. Always `False` if
+            no criteria are provided or there are too few samples to
+            compute the diagnostics.
+
+        """
+
+        if min_ess is None and max_rhat is None:
+            return False
+        if min_ess is not None and not np.all(self.ess >= min_ess):
+            return False
+        if max_rhat is not None and not np.all(self.rhat <= max_rhat):
+            return False
+
+        return True
+
+
+class _Sampler(object):
+    """
+    Base class containing functionality shared by the samplers.
+
+    """
+
+    # Attributes holding tuned proposal parameters, which are saved along
+    # with the samples by `save_checkpoint`.
+    _TUNING = ()
+
+    def run_chains(self, Nchains, Niter, pos_init=None, seeds=None,
+                   pool=None, rstate=None, verbose=True, min_ess=None,
+                   max_rhat=None, max_rounds=10, **kwargs):
+        """
+        Run several independent chains, optionally in parallel.
+
+        Parameters
+        ----------
+        Nchains : int
+            The number of chains to run.
+
+        Niter : int
+            The number of samples to draw/iterations to run in each chain.
+
+        pos_init : `~numpy.ndarray` of shape `(Nchains, Ndim)`, optional
+            The initial positions of each chain. A single position of shape
+            `(Ndim,)` will be used for all chains. If not provided, each
+            chain will start from the stacked PDFs.
+
+        seeds : `~numpy.ndarray` of shape `(Nchains,)`, optional
+            The seeds used to initialize the random state of each chain.
+            If not provided, these will be drawn using `rstate`.
+
+        pool : user-provided pool, optional
+            Use this pool of workers to run the chains in parallel. Must
+            provide a `map` function. Memory-mapped `pdfs` (e.g., loaded
+            using `np.load(..., mmap_mode='r')`) are re-opened by each
+            worker rather than copied. Any functions passed through `kwargs`
+            must be picklable. If not provided, the chains will be run
+            serially.
+
+        rstate : `~numpy.random.RandomState`, optional
+            `~numpy.random.RandomState` instance used to generate `seeds`.
+
+        verbose : bool, optional
+            Whether or not to output a simple summary of the chains as they
+            finish. Default is `True`.
+
+        min_ess : float, optional
+            If provided, the chains will be run in rounds of `Niter` samples
+            (each continuing from the end of the previous round) until the
+            total effective sample size estimated by
+            :attr:`chains_diagnostics` exceeds `min_ess` in every bin.
+
+        max_rhat : float, optional
+            If provided, the chains will be run in rounds of `Niter` samples
+            until the split-Rhat across chains estimated by
+            :attr:`chains_diagnostics` falls below `max_rhat` in every bin.
+            If both `min_ess` and `max_rhat` are provided, both criteria
+            must be met.
+
+        max_rounds : int, optional
+            The maximum number of rounds to run when using `min_ess` or
+            `max_rhat`. Default is `10`.
+
+        **kwargs
+            Additional keyword arguments passed to `run_mcmc`. Any proposal
+            parameters tuned by a chain (e.g., the HMC step size) are
+            carried over to later rounds, which do not re-tune them.
+
+        Returns
+        -------
+        samples : `~numpy.ndarray` of shape `(Nchains, Nsamps, Ndim)`
+            The samples from each chain. Samples drawn while the proposal
+            was being tuned are discarded (see :attr:`chains_nwarmup`), so
+            chains can have slightly different lengths if adaptation ended
+            at different points, in which case they are truncated to the
+            shortest chain.
+
+        samples_lnp : `~numpy.ndarray` of shape `(Nchains, Nsamps)`
+            The ln(posterior) of each sample.
+
+        """
+
+        # Initialize values.
+        if rstate is None:
+            rstate = np.random
+        if seeds is None:
+            seeds = rstate.randint(2**31 - 1, size=Nchains)
+        if len(seeds) != Nchains:
+            raise ValueError("The number of seeds ({0}) does not match the "
+                             "number of chains ({1}).".format(len(seeds),
+                                                               Nchains))
+        if pos_init is None or np.ndim(pos_init) == 1:
+            pos_init = [pos_init for i in range(Nchains)]
+        pos_init = list(pos_init)
+        if pool is None:
+            M, pdfs = map, self.pdfs
+        else:
+            M, pdfs = pool.map, _share_pdfs(self.pdfs)
+        if min_ess is None and max_rhat is None:
+            max_rounds = 1
+        # Chains stream over `pdfs` in the same way (but serially).
+        init_kwargs = {}
+        if getattr(self, 'chunksize', None) is not None:
+            init_kwargs['chunksize'] = self.chunksize
+        self.chains_diagnostics = ChainDiagnostics(self.pdfs.shape[1],
+                                                   nchains=Nchains)
+        self.chains_naccept = np.zeros(Nchains, dtype='int')
+        self.chains_nprop = np.zeros(Nchains, dtype='int')
+        self.chains_nwarmup = np.zeros(Nchains, dtype='int')
+        tuning = [dict() for i in range(Nchains)]
+
+        # Run chains.
+        samples = [[] for i in range(Nchains)]
+        samples_lnp = [[] for i in range(Nchains)]
+        for r in range(max_rounds):
+            if r > 0:
+                # Continue each chain from its last position.
+                seeds = rstate.randint(2**31 - 1, size=Nchains)
+                if 'Nadapt' in kwargs:
+                    kwargs = dict(kwargs, Nadapt=0)
+            argset = [(type(self), pdfs, init_kwargs, Niter, seeds[i],
+                       pos_init[i], tuning[i], kwargs)
+                      for i in range(Nchains)]
+            for i, res in enumerate(M(_run_chain, argset)):
+                x, lnp, last, nacc, nprop, nwarm, tuning[i] = res
+                pos_init[i] = last[0]
+                # Samples drawn while tuning the proposal are not saved.
+                x = np.reshape(x, (len(lnp), self.pdfs.shape[1]))
+                samples[i].append(x)
+                samples_lnp[i].append(lnp)
+                self.chains_naccept[i] += nacc
+                self.chains_nprop[i] += nprop
+                self.chains_nwarmup[i] += nwarm
+                for xi in x:
+                    self.chains_diagnostics.update(xi, chain=i)
+                if verbose:
+                    sys.stderr.write('\r Round {:d} Chain {:d}/{:d} '
+                                     '[lnpost = {:6.3f}]     '
+                                     .format(r+1, i+1, Nchains,
+                                             last[1]))
+                    sys.stderr.flush()
+            # Check stopping criteria.
+            if self.chains_diagnostics.converged(min_ess=min_ess,
+                                                 max_rhat=max_rhat):
+                break
+        if verbose:
+            sys.stderr.write('\n')
+            sys.stderr.flush()
+        samples = [np.concatenate(x) for x in samples]
+        samples_lnp = [np.concatenate(x) for x in samples_lnp]
+        Nsamps = min(len(x) for x in samples)
+        self.chains = np.array([x[len(x)-Nsamps:] for x in samples])
+        self.chains_lnp = np.array([x[len(x)-Nsamps:] for x in samples_lnp])
+
+        return self.chains, self.chains_lnp
+
+    def reset(self, sink=None, blocksize=1000):
+        """
+        Re-initialize the sampler.
+
+        Parameters
+        ----------
+        sink : str, optional
+            If provided, samples will be written to disk in blocks as
+            `<sink>_<block>.npz` files rather than kept in memory. These
+            can be loaded using :meth:`load_samples`.
+
+        blocksize : int, optional
+            The number of samples written to each block when using a `sink`.
+            Default is `1000`.
+
+        """
+
+        self._buffer = _SampleBuffer(sink=sink, blocksize=blocksize)
+        self.rstate = None
+        self.diagnostics = ChainDiagnostics(self.pdfs.shape[1])
+        self.naccept, self.nprop = 0, 0
+        self.nwarmup = 0  # samples discarded while tuning
+
+    def _store(self, x, lnp, warmup=False):
+        """
+        Internal method used to store a new sample. Samples drawn while the
+        proposal is still being tuned (`warmup=True`) are not saved or
+        used to update :attr:`diagnostics`, although the position is kept
+        so that sampling can be continued from it. Returns whether the
+        sample was saved.
+
+        """
+
+        if warmup:
+            self._buffer.skip(x, lnp)
+            return False
+        self._buffer.append(x, lnp)
+        self.diagnostics.update(x)
+
+        return True
+
+    @property
+    def samples(self):
+        """Return the samples currently held in memory."""
+
+        return self._buffer.samples
+
+    @property
+    def samples_lnp(self):
+        """Return the ln(posterior) of the samples currently in memory."""
+
+        return self._buffer.samples_lnp
+
+    @property
+    def acceptance_fraction(self):
+        """
+        Return the fraction of Metropolis-Hastings proposals (or HMC
+        trajectories) that have been accepted. Returns `nan` for samplers
+        that only use Gibbs updates.
+
+        """
+
+        if self.nprop == 0:
+            return np.nan
+
+        return self.naccept / self.nprop
 
     @property
     def results(self):
         """Return samples."""
 
-        return np.array(self.samples), np.array(self.samples_lnp)
+        samples, samples_lnp = self._buffer.load()
+
+        return np.array(samples), np.array(samples_lnp)
+
+    def save_checkpoint(self, fname, rstate=None):
+        """
+        Save the current state of the sampler to disk. The state can be
+        restored using :meth:`load_checkpoint`, after which calling
+        `run_mcmc` will resume sampling from the last saved position
+        using any tuned proposal parameters (e.g., the HMC step size).
+
+        Parameters
+        ----------
+        fname : str
+            The name of the checkpoint file.
+
+        rstate : `~numpy.random.RandomState`, optional
+            `~numpy.random.RandomState` instance whose state will be saved.
+            If not provided, the instance used in the most recent call to
+            `run_mcmc` (or the default `~numpy.random` instance) will be used.
+
+        """
+
+        if rstate is None:
+            rstate = self.rstate if self.rstate is not None else np.random
+        buf = self._buffer
+        state = rstate.get_state()
+        last = buf.last if buf.last is not None else np.array([])
+        last_lnp = buf.last_lnp if buf.last_lnp is not None else np.nan
+
+        # Collect any tuned proposal parameters.
+        tuning = {}
+        for name in self._TUNING:
+            val = getattr(self, name, None)
+            if isinstance(val, dict):
+                for k, v in iteritems(val):
+                    tuning['tune_{0}__{1}'.format(name, k)] = v
+            elif val is not None:
+                tuning['tune_' + name] = val
+
+        # Write to a temporary file first so an interrupted write does not
+        # clobber a previous checkpoint.
+        tmp = fname + '.tmp'
+        with open(tmp, 'wb') as f:
+            np.savez(f, samples=buf.samples, samples_lnp=buf.samples_lnp,
+                     last=last, last_lnp=last_lnp,
+                     sink='' if buf.sink is None else buf.sink,
+                     blocksize=buf.blocksize, nblocks=buf.nblocks,
+                     rng_key=state[0], rng_keys=state[1], rng_pos=state[2],
+                     rng_has_gauss=state[3], rng_gauss=state[4], **tuning)
+        getattr(os, 'replace', os.rename)(tmp, fname)
+
+    def load_checkpoint(self, fname):
+        """
+        Restore the state of the sampler saved using :meth:`save_checkpoint`.
+
+        Parameters
+        ----------
+        fname : str
+            The name of the checkpoint file.
+
+        Returns
+        -------
+        rstate : `~numpy.random.RandomState`
+            `~numpy.random.RandomState` instance with the saved state,
+            which should be passed to `run_mcmc` to resume sampling.
+
+        """
+
+        with np.load(fname) as f:
+            sink = str(f['sink'])
+            buf = _SampleBuffer(sink=sink if sink else None,
+                                blocksize=int(f['blocksize']))
+            for x, lnp in zip(f['samples'], f['samples_lnp']):
+                buf.append(x, lnp)
+            buf.nblocks = int(f['nblocks'])
+            if f['last'].size > 0:
+                buf.last, buf.last_lnp = f['last'], float(f['last_lnp'])
+            rstate = np.random.RandomState()
+            rstate.set_state((str(f['rng_key']), f['rng_keys'],
+                              int(f['rng_pos']), int(f['rng_has_gauss']),
+                              float(f['rng_gauss'])))
+            # Restore any tuned proposal parameters.
+            for name in self._TUNING:
+                key = 'tune_' + name
+                vals = {k[len(key)+2:]: f[k] for k in f.files
+                        if k.startswith(key + '__')}
+                if key in f.files:
+                    val = f[key]
+                    setattr(self, name, val.item() if val.ndim == 0 else val)
+                elif len(vals) > 0:
+                    setattr(self, name, {k: v.item() if v.ndim == 0 else v
+                                         for k, v in iteritems(vals)})
+        self._buffer = buf
+        self.rstate = rstate
+        self.diagnostics = ChainDiagnostics(self.pdfs.shape[1])
+        for x in buf.samples:
+            self.diagnostics.update(x)
+
+        return rstate
+
+
+class population_sampler(_Sampler):
+    """
+    Sampler for drawing redshift population distributions given a set of
+    individual redshift PDFs.
+
+    """
+
+    _TUNING = ('block_hess', 'block_mult')
+
+    def __init__(self, pdfs, sink=None, blocksize=1000, chunksize=None,
+                 pool=None):
+        """
+        Initialize the sampler.
+
+        Parameters
+        ----------
+        pdfs : array-like of shape `(Nobs, Nbins,)`
+            The individual redshift PDFs that make up the sample. Can be
+            a `~numpy.ndarray` or a `~scipy.sparse` matrix. Sparse
+            PDFs (see :meth:`~frankenz.pdf.pdfs_sparsify`) are stored in
+            both CSR and CSC format so that overlap updates only involve
+            the nonzero elements.
+
+        sink : str, optional
+            If provided, samples will be written to disk in blocks as
+            `<sink>_<block>.npz` files rather than kept in memory. These
+            can be loaded using :meth:`load_samples`.
+
+        blocksize : int, optional
+            The number of samples written to each block when using a `sink`.
+            Default is `1000`.
+
+        chunksize : int, optional
+            If provided, computations over `pdfs` (the overlap integrals,
+            the differences between pairs of columns, and the curvature
+            used for blocked updates) are performed by streaming over
+            blocks of `chunksize` objects at a time. Combined with a
+            memory-mapped `pdfs` (e.g., loaded using
+            `np.load(..., mmap_mode='r')`, possibly stored in single
+            precision), this allows sampling PDF sets that do not fit in
+            memory. Only the `(Nobs,)` overlap integrals are kept in memory.
+
+        pool : user-provided pool, optional
+            Use this pool of workers to reduce the blocks of `pdfs` in
+            parallel. Must provide a `map` function. Memory-mapped `pdfs`
+            are re-opened by each worker rather than copied.
+
+        """
+
+        # Initialize values.
+        if sparse.issparse(pdfs):
+            self.pdfs = sparse.csr_matrix(pdfs)
+            self.pdfs_csc = sparse.csc_matrix(pdfs)
+        else:
+            self.pdfs = pdfs
+            self.pdfs_csc = None
+        self.chunksize, self.pool = chunksize, pool
+        self.block_hess, self.block_mult = None, 1.
+        self.reset(sink=sink, blocksize=blocksize)
+
+    def _stream(self, vec, kind='dot'):
+        """
+        Internal method used to compute quantities over `pdfs` (see
+        `_reduce_pdfs`), streaming over blocks of `pdfs` if requested.
+
+        """
+
+        if self.chunksize is None and self.pool is None:
+            return _reduce_block((kind, self.pdfs, 0, self.pdfs.shape[0],
+                                  vec, None))
+
+        return _reduce_pdfs(self.pdfs, vec, kind=kind,
+                            chunksize=self.chunksize, pool=self.pool)
+
+    def _pair_diff(self, pair):
+        """
+        Internal method used to compute the difference between a pair of
+        columns of `pdfs` over the rows where they differ (see
+        `_pair_diff`).
+
+        """
+
+        if self.pdfs_csc is not None:
+            return _pair_diff(self.pdfs_csc, pair)
+        pdiff = self._stream(pair, kind='pair')
+        rows = np.flatnonzero(pdiff)
+
+        return rows, pdiff[rows]
 
     def run_mcmc(self, Niter, logprior_nz=None, pos_init=None,
                  thin=400, mh_steps=3, rstate=None, verbose=True,
-                 prior_args=[], prior_kwargs={}):
+                 prior_args=[], prior_kwargs={}, blocked=False,
+                 Nadapt=None, target_accept=0.234, checkpoint=None,
+                 checkpoint_every=100, min_ess=None, max_rhat=None,
+                 check_every=100):
         """
         Sample the distribution using MH-in-Gibbs MCMC.
 
@@ -156,12 +1376,67 @@ class population_sampler(object):
         prior_kwargs : args, optional
             Optional keyword arguments for `logprior_nz`.
 
+        blocked : bool, optional
+            Whether to update all bins at once during each Gibbs iteration
+            by jointly proposing moves along `Nbins // 2` disjoint (random)
+            pairs of bins. The proposal along each pair is scaled using the
+            curvature of the log-likelihood (see :attr:`block_hess`) times
+            a global multiplier (see :attr:`block_mult`) and reflected at
+            the boundaries so that bins never become negative, which also
+            allows sampling from positions with bins at exactly zero (e.g.,
+            MAP estimates). Each proposal only requires a single
+            matrix-vector product with `pdfs`. When
+            `True`, `thin` is the number of blocked updates between saved
+            samples. Default is `False`.
+
+        Nadapt : int, optional
+            The number of blocked updates at the start of the run used to
+            tune the proposal when `blocked=True`. During adaptation, the
+            curvature is periodically re-computed at the current position
+            and the multiplier is adjusted towards `target_accept`. Both
+            are then frozen. If not provided, this defaults to
+            `Niter * thin // 2` if the proposal has not been tuned yet and
+            `0` otherwise. Samples drawn during adaptation are discarded
+            (see :attr:`nwarmup`), so only the remaining
+            `Niter - ceil(Nadapt / thin)` samples are saved.
+
+        target_accept : float, optional
+            The target acceptance fraction used when tuning the blocked
+            proposal. Default is `0.234`.
+
+        checkpoint : str, optional
+            If provided, the state of the sampler (see
+            :meth:`save_checkpoint`) will be saved to this file every
+            `checkpoint_every` samples.
+
+        checkpoint_every : int, optional
+            The number of samples between checkpoints. Default is `100`.
+
+        min_ess : float, optional
+            If provided, sampling will stop early (before `Niter` samples
+            have been drawn) once the effective sample size estimated by
+            :attr:`diagnostics` exceeds `min_ess` in every bin. The
+            stopping criteria are only checked (and the diagnostics only
+            computed) using samples drawn after adaptation has finished.
+
+        max_rhat : float, optional
+            If provided, sampling will stop early once the split-Rhat
+            estimated by :attr:`diagnostics` falls below `max_rhat` in
+            every bin. If both `min_ess` and `max_rhat` are provided, both
+            criteria must be met.
+
+        check_every : int, optional
+            The number of samples between checks of the stopping criteria.
+            Default is `100`.
+
         """
 
         # Initialize values.
         Nobs, Ndim = self.pdfs.shape
         if rstate is None:
             rstate = np.random
+        if Nadapt is None:
+            Nadapt = Niter * thin // 2 if self.block_hess is None else 0
 
         # Initialize prior.
         if logprior_nz is None:
@@ -170,35 +1445,48 @@ class population_sampler(object):
 
         # Initialize starting position.
         if pos_init is None:
-            try:
-                # Try to start from out last position.
-                pos = self.samples[-1]
-            except:
+            if self._buffer.last is not None:
+                # Start from our last position.
+                pos = self._buffer.last
+            else:
                 # Otherwise, just stack the individual PDFs.
-                pos = self.pdfs.sum(axis=0) / self.pdfs.sum()
-                pass
+                pos = _stack_pdfs(self.pdfs)
         else:
             # Use provided position.
             pos = pos_init
+        self.rstate = rstate
 
         # Sample.
+        nwarmup, nsaved = self.nwarmup, 0
         for i, (x, lnp) in enumerate(self.sample(Niter,
                                                  logprior_nz=logprior_nz,
-                                                 pos_init=pos_init, thin=thin,
+                                                 pos_init=pos, thin=thin,
                                                  mh_steps=mh_steps,
                                                  rstate=rstate,
                                                  prior_args=prior_args,
-                                                 prior_kwargs=prior_kwargs)):
-
-            self.samples.append(np.array(x))
-            self.samples_lnp.append(lnp)
+                                                 prior_kwargs=prior_kwargs,
+                                                 blocked=blocked,
+                                                 Nadapt=Nadapt,
+                                                 target_accept=target_accept
+                                                 )):
+
+            warmup, nwarmup = self.nwarmup > nwarmup, self.nwarmup
+            nsaved += self._store(x, lnp, warmup=warmup)
+            if checkpoint is not None and (i + 1) % checkpoint_every == 0:
+                self.save_checkpoint(checkpoint, rstate=rstate)
             if verbose:
                 sys.stderr.write('\r Sample {:d}/{:d} [lnpost = {:6.3f}]      '
                                  .format(i+1, Niter, lnp))
                 sys.stderr.flush()
+            # Check stopping criteria (only once adaptation has finished).
+            if (not warmup and nsaved % check_every == 0 and
+               self.diagnostics.converged(min_ess=min_ess,
+                                          max_rhat=max_rhat)):
+                break
 
     def sample(self, Niter, logprior_nz=None, pos_init=None, thin=400,
-               mh_steps=3, rstate=None, prior_args=[], prior_kwargs={}):
+               mh_steps=3, rstate=None, prior_args=[], prior_kwargs={},
+               blocked=False, Nadapt=0, target_accept=0.234):
         """
         Internal generator used for MH-in-Gibbs MCMC sampling.
 
@@ -237,6 +1525,34 @@ class population_sampler(object):
         prior_kwargs : args, optional
             Optional keyword arguments for `logprior_nz`.
 
+        blocked : bool, optional
+            Whether to update all bins at once during each Gibbs iteration
+            by jointly proposing moves along `Nbins // 2` disjoint (random)
+            pairs of bins. The proposal along each pair is scaled using the
+            curvature of the log-likelihood (see :attr:`block_hess`) times
+            a global multiplier (see :attr:`block_mult`) and reflected at
+            the boundaries so that bins never become negative, which also
+            allows sampling from positions with bins at exactly zero (e.g.,
+            MAP estimates). Each proposal only requires a single
+            matrix-vector product with `pdfs`. When
+            `True`, `thin` is the number of blocked updates between saved
+            samples. Default is `False`.
+
+        Nadapt : int, optional
+            The number of blocked updates at the start of the run used to
+            tune the proposal when `blocked=True`. During adaptation, the
+            curvature is periodically re-computed at the current position
+            and the multiplier is adjusted towards `target_accept`. Both
+            are then frozen. If not provided, this defaults to
+            `Niter * thin // 2` if the proposal has not been tuned yet and
+            `0` otherwise. Samples drawn during adaptation are discarded
+            (see :attr:`nwarmup`), so only the remaining
+            `Niter - ceil(Nadapt / thin)` samples are saved.
+
+        target_accept : float, optional
+            The target acceptance fraction used when tuning the blocked
+            proposal. Default is `0.234`.
+
         """
 
         # Initialize values.
@@ -251,15 +1567,78 @@ class population_sampler(object):
 
         # Initialize starting position.
         if pos_init is None:
-            pos = self.pdfs.sum(axis=0) / self.pdfs.sum()
+            pos = _stack_pdfs(self.pdfs)
         else:
             pos = pos_init
-        lnlike, overlap = loglike_nz(pos, self.pdfs, return_overlap=True)
+        lnlike, overlap = loglike_nz(pos, self.pdfs,
+                                     overlap=self._stream(pos),
+                                     return_overlap=True)
         lnprior = logprior_nz(pos, *prior_args, **prior_kwargs)
         lnpost = lnlike + lnprior
+        # Only update the overlaps that change when `pdfs` are sparse or
+        # must be streamed.
+        incremental = (self.pdfs_csc is not None or
+                       self.chunksize is not None or self.pool is not None)
+
+        # Initialize blocked proposal.
+        if blocked and self.block_hess is None:
+            self.block_hess = self._stream(pos, kind='hess')
+        log_mult, nupdate = np.log(self.block_mult), 0
 
         # Sample.
         for i in range(Niter):
+            if blocked:
+                # Blocked Gibbs step.
+                K = Ndim // 2
+                for j in range(thin):
+                    # Generate disjoint pairs.
+                    perm = rstate.permutation(Ndim)
+                    p1, p2 = perm[:K], perm[K:2*K]
+                    gscale = (_block_scale(self.block_hess, p1, p2) *
+                              self.block_mult)
+
+                    # Metropolis-Hastings step.
+                    for k in range(mh_steps):
+                        # Generate proposal. Moves are reflected at the
+                        # boundaries so bins at (or near) zero can still
+                        # be updated.
+                        z = rstate.randn(K) * gscale
+                        ptot = pos[p1] + pos[p2]
+                        pos_new = pos.copy()
+                        pos_new[p1] = _reflect(pos[p1] + z, ptot)
+                        pos_new[p2] = ptot - pos_new[p1]
+                        dpos = pos_new - pos
+                        self.nprop += 1
+                        overlap_new = overlap + self._stream(dpos)
+                        lnlike_new = np.sum(np.log(overlap_new))
+                        lnprior_new = logprior_nz(pos_new, *prior_args,
+                                                  **prior_kwargs)
+                        lnpost_new = lnlike_new + lnprior_new
+                        dlnp = lnpost_new - lnpost
+                        accept = np.exp(min(dlnp, 0.))
+                        # Metropolis update.
+                        if -rstate.exponential() < dlnp:
+                            self.naccept += 1
+                            pos, lnpost = pos_new, lnpost_new
+                            lnlike, overlap = lnlike_new, overlap_new
+                        # Tune the multiplier.
+                        if nupdate < Nadapt:
+                            log_mult += ((accept - target_accept) /
+                                         np.sqrt(nupdate * mh_steps + k + 1))
+                            self.block_mult = np.exp(log_mult)
+
+                    # Re-compute the curvature during adaptation.
+                    nupdate += 1
+                    if nupdate <= Nadapt and (nupdate % 10 == 0 or
+                                              nupdate == Nadapt):
+                        self.block_hess = self._stream(pos, kind='hess')
+
+                # Return current position.
+                if nupdate - thin < Nadapt:
+                    self.nwarmup += 1
+                yield pos, lnpost
+                continue
+
             # Generate random pairs.
             pairs = [rstate.choice(Ndim, size=2, replace=False)
                      for i in range(thin)]
@@ -271,12 +1650,20 @@ class population_sampler(object):
                 # Compute absolute range.
                 scale = 1e-4 * np.min(np.append(pos[pair], 1. - pos[pair]))
                 # Compute numerical gradient.
-                lnp1 = loglike_nz(pos, self.pdfs, overlap=overlap,
-                                  pair=pair, pair_step=scale/2.)
+                if incremental:
+                    # Only update the overlaps that change.
+                    rows, pdiff = self._pair_diff(pair)
+                    lnp1 = _loglike_nz_pair(pos, overlap, lnlike, rows,
+                                            pdiff, scale/2.)[0]
+                    lnp2 = _loglike_nz_pair(pos, overlap, lnlike, rows,
+                                            pdiff, -scale/2.)[0]
+                else:
+                    lnp1 = loglike_nz(pos, self.pdfs, overlap=overlap,
+                                      pair=pair, pair_step=scale/2.)
+                    lnp2 = loglike_nz(pos, self.pdfs, overlap=overlap,
+                                      pair=pair, pair_step=-scale/2.)
                 lnp1 += logprior_nz(pos + t*scale/2.,
                                     *prior_args, **prior_kwargs)
-                lnp2 = loglike_nz(pos, self.pdfs, overlap=overlap,
-                                  pair=pair, pair_step=-scale/2.)
                 lnp2 += logprior_nz(pos - t*scale/2.,
                                     *prior_args, **prior_kwargs)
                 grad = (lnp1 - lnp2) / scale
@@ -292,23 +1679,32 @@ class population_sampler(object):
                     z = rstate.randn() * gscale
                     # Generate new proposal.
                     pos_new = pos + (t * z)
-                    lnlike_new, overlap_new = loglike_nz(pos_new, self.pdfs,
-                                                         overlap=overlap,
-                                                         return_overlap=True,
-                                                         pair=pair,
-                                                         pair_step=z)
+                    if incremental:
+                        res = _loglike_nz_pair(pos_new, overlap, lnlike,
+                                               rows, pdiff, z)
+                    else:
+                        res = loglike_nz(pos_new, self.pdfs, overlap=overlap,
+                                         return_overlap=True, pair=pair,
+                                         pair_step=z)
+                    lnlike_new, overlap_new = res
                     lnprior_new = logprior_nz(pos_new,
                                               *prior_args, **prior_kwargs)
                     lnpost_new = lnlike_new + lnprior_new
                     # Metropolis update.
+                    self.nprop += 1
                     if -rstate.exponential() < lnpost_new - lnpost:
-                        pos, lnpost, overlap = pos_new, lnpost_new, overlap_new
+                        self.naccept += 1
+                        pos, lnpost, lnlike = pos_new, lnpost_new, lnlike_new
+                        if incremental:
+                            overlap[rows] = overlap_new
+                        else:
+                            overlap = overlap_new
 
             # Return current position.
             yield pos, lnpost
 
 
-class hierarchical_sampler(object):
+class hierarchical_sampler(_Sampler):
     """
     Sampler for jointly drawing redshift population distributions and
     individual redshift predictions given a set of individual redshift PDFs.
@@ -317,38 +1713,69 @@ class hierarchical_sampler(object):
 
     """
 
-    def __init__(self, pdfs):
+    def __init__(self, pdfs, sink=None, blocksize=1000, chunksize=None,
+                 pool=None):
         """
         Initialize the sampler.
 
         Parameters
         ----------
-        pdfs : `~numpy.ndarray` of shape `(Nobs, Nbins,)`
-            The individual redshift PDFs that make up the sample.
+        pdfs : array-like of shape `(Nobs, Nbins,)`
+            The individual redshift PDFs that make up the sample. Can be
+            a `~numpy.ndarray` or a `~scipy.sparse` matrix. Sparse
+            PDFs (see :meth:`~frankenz.pdf.pdfs_sparsify`) are stored in
+            CSR format.
+
+        sink : str, optional
+            If provided, samples will be written to disk in blocks as
+            `<sink>_<block>.npz` files rather than kept in memory. These
+            can be loaded using :meth:`load_samples`.
+
+        blocksize : int, optional
+            The number of samples written to each block when using a `sink`.
+            Default is `1000`.
+
+        chunksize : int, optional
+            If provided, computations over `pdfs` are performed by streaming
+            over blocks of `chunksize` objects at a time. Combined with a
+            memory-mapped `pdfs` (e.g., loaded using
+            `np.load(..., mmap_mode='r')`, possibly stored in single
+            precision), this allows sampling PDF sets that do not fit in
+            memory.
+
+        pool : user-provided pool, optional
+            Use this pool of workers to reduce the blocks of `pdfs` in
+            parallel. Must provide a `map` function. Memory-mapped `pdfs`
+            are re-opened by each worker rather than copied.
 
         """
 
         # Initialize values.
-        self.pdfs = pdfs
-        self.samples = []
-        self.samples_lnp = []
+        if sparse.issparse(pdfs):
+            self.pdfs = sparse.csr_matrix(pdfs)
+        else:
+            self.pdfs = pdfs
+        self.chunksize, self.pool = chunksize, pool
+        self.reset(sink=sink, blocksize=blocksize)
 
-    def reset(self):
-        """Re-initialize the sampler."""
+    def _draw_counts(self, nz, rstate=None):
+        """
+        Internal method used to draw the number of objects in each bin,
+        streaming over blocks of `pdfs` if requested.
 
-        self.samples_prior = []
-        self.samples_lnp = []
-        self.samples_counts = []
+        """
 
-    @property
-    def results(self):
-        """Return samples."""
+        if self.chunksize is None and self.pool is None:
+            return _draw_counts(self.pdfs, nz, rstate=rstate)
 
-        return np.array(self.samples), np.array(self.samples_lnp)
+        return _reduce_pdfs(self.pdfs, nz, kind='counts',
+                            chunksize=self.chunksize, pool=self.pool,
+                            rstate=rstate)
 
     def run_mcmc(self, Niter, alpha=None, pos_init=None,
                  thin=5, ref_sample=None, beta=None, rstate=None,
-                 verbose=True):
+                 verbose=True, checkpoint=None, checkpoint_every=100,
+                 min_ess=None, max_rhat=None, check_every=100):
         """
         Sample the joint distribution using Gibbs MCMC.
 
@@ -387,6 +1814,29 @@ class hierarchical_sampler(object):
             Whether or not to output a simple summary of the current run that
             updates with each iteration. Default is `True`.
 
+        checkpoint : str, optional
+            If provided, the state of the sampler (see
+            :meth:`save_checkpoint`) will be saved to this file every
+            `checkpoint_every` samples.
+
+        checkpoint_every : int, optional
+            The number of samples between checkpoints. Default is `100`.
+
+        min_ess : float, optional
+            If provided, sampling will stop early (before `Niter` samples
+            have been drawn) once the effective sample size estimated by
+            :attr:`diagnostics` exceeds `min_ess` in every bin.
+
+        max_rhat : float, optional
+            If provided, sampling will stop early once the split-Rhat
+            estimated by :attr:`diagnostics` falls below `max_rhat` in
+            every bin. If both `min_ess` and `max_rhat` are provided, both
+            criteria must be met.
+
+        check_every : int, optional
+            The number of samples between checks of the stopping criteria.
+            Default is `100`.
+
         """
 
         # Initialize values.
@@ -402,29 +1852,36 @@ class hierarchical_sampler(object):
 
         # Initialize starting position.
         if pos_init is None:
-            try:
-                # Try to start from out last position.
-                pos = self.samples[-1]
-            except:
+            if self._buffer.last is not None:
+                # Start from our last position.
+                pos = self._buffer.last
+            else:
                 # Otherwise, just stack the individual PDFs.
-                pos = self.pdfs.sum(axis=0) / self.pdfs.sum()
-                pass
+                pos = _stack_pdfs(self.pdfs)
         else:
             # Use provided position.
             pos = pos_init
+        self.rstate = rstate
 
         # Sample.
         for i, (x, lnp) in enumerate(self.sample(Niter, alpha=alpha, beta=beta,
-                                                 pos_init=pos_init, thin=thin,
+                                                 pos_init=pos, thin=thin,
                                                  ref_sample=ref_sample,
                                                  rstate=rstate)):
 
-            self.samples.append(np.array(x))
-            self.samples_lnp.append(lnp)
+            self._buffer.append(x, lnp)
+            self.diagnostics.update(x)
+            if checkpoint is not None and (i + 1) % checkpoint_every == 0:
+                self.save_checkpoint(checkpoint, rstate=rstate)
             if verbose:
                 sys.stderr.write('\r Sample {:d}/{:d} [lnpost = {:6.3f}]      '
                                  .format(i+1, Niter, lnp))
                 sys.stderr.flush()
+            # Check stopping criteria.
+            if ((i + 1) % check_every == 0 and
+               self.diagnostics.converged(min_ess=min_ess,
+                                          max_rhat=max_rhat)):
+                break
 
     def sample(self, Niter, alpha=None, pos_init=None, thin=5,
                ref_sample=None, beta=None, rstate=None):
@@ -491,33 +1948,22 @@ class hierarchical_sampler(object):
 
         # Initialize starting position.
         if pos_init is None:
-            pos = self.pdfs.sum(axis=0) / self.pdfs.sum()
+            pos = _stack_pdfs(self.pdfs)
         else:
             pos = pos_init
         # Sample redshifts.
-        counts = np.sum([rstate.multinomial(1, p * pos / np.dot(p, pos))
-                         for p in self.pdfs], axis=0)
+        counts = self._draw_counts(pos, rstate=rstate)
         # Sample population.
         pos = rstate.dirichlet(alpha + counts + ref_counts)
         # Sample reference set.
         if ref_sample is not None:
             pcounts = ref_sample + beta + Nobs * pos
             ref_counts = rstate.multinomial(Nref, pcounts / pcounts.sum())
-        # Evaluate posterior.
-        lnlike = stats.multinomial.logpmf(counts, Nobs, pos)
-        lnprior = stats.dirichlet.logpdf(pos, alpha + ref_counts)
-        if ref_sample is not None:
-            lnpriorref = stats.multinomial.logpmf(ref_counts, Nref, ref_norm)
-        else:
-            lnpriorref = 0.
-        lnpost = lnlike + lnprior + lnpriorref
-
         # Sample.
         for i in range(Niter):
             for j in range(thin):
                 # Sample redshifts.
-                counts = np.sum([rstate.multinomial(1, p*pos / np.dot(p, pos))
-                                 for p in self.pdfs], axis=0)
+                counts = self._draw_counts(pos, rstate=rstate)
                 # Sample population.
                 pos = rstate.dirichlet(alpha + counts + ref_counts)
                 # Sample reference set.
@@ -525,11 +1971,349 @@ class hierarchical_sampler(object):
                     pcounts = ref_sample + beta + Nobs * pos
                     ref_counts = rstate.multinomial(Nref, (pcounts /
                                                            pcounts.sum()))
-                    lnpriorref = stats.multinomial.logpmf(ref_counts, Nref,
-                                                          ref_norm)
-                lnlike = stats.multinomial.logpmf(counts, Nobs, pos)
-                lnprior = stats.dirichlet.logpdf(pos, alpha + ref_counts)
-                lnpost = lnlike + lnprior + lnpriorref
+
+            # Evaluate posterior (only needed for saved samples).
+            lnlike = _multinomial_logpmf(counts, Nobs, pos)
+            lnprior = _dirichlet_logpdf(pos, alpha + ref_counts)
+            if ref_sample is not None:
+                lnpriorref = _multinomial_logpmf(ref_counts, Nref, ref_norm)
+            else:
+                lnpriorref = 0.
+            lnpost = lnlike + lnprior + lnpriorref
+
+            # Return current position.
+            yield pos, lnpost
+
+
+class population_hmc_sampler(_Sampler):
+    """
+    Sampler for drawing redshift population distributions given a set of
+    individual redshift PDFs using Hamiltonian Monte Carlo (HMC). The
+    distribution is sampled in an unconstrained additive log-ratio
+    parametrization `nz = softmax(theta)` (with `theta[-1] = 0`) using
+    analytic gradients computed from the cached overlaps.
+    Assumes a Dirichlet prior.
+
+    """
+
+    _TUNING = ('step_size', 'adapt_state')
+
+    def __init__(self, pdfs, sink=None, blocksize=1000, chunksize=None,
+                 pool=None):
+        """
+        Initialize the sampler.
+
+        Parameters
+        ----------
+        pdfs : array-like of shape `(Nobs, Nbins,)`
+            The individual redshift PDFs that make up the sample. Can be
+            a `~numpy.ndarray` or a `~scipy.sparse` matrix.
+
+        sink : str, optional
+            If provided, samples will be written to disk in blocks as
+            `<sink>_<block>.npz` files rather than kept in memory. These
+            can be loaded using :meth:`load_samples`.
+
+        blocksize : int, optional
+            The number of samples written to each block when using a `sink`.
+            Default is `1000`.
+
+        chunksize : int, optional
+            If provided, computations over `pdfs` are performed by streaming
+            over blocks of `chunksize` objects at a time. Combined with a
+            memory-mapped `pdfs` (e.g., loaded using
+            `np.load(..., mmap_mode='r')`, possibly stored in single
+            precision), this allows sampling PDF sets that do not fit in
+            memory.
+
+        pool : user-provided pool, optional
+            Use this pool of workers to reduce the blocks of `pdfs` in
+            parallel. Must provide a `map` function. Memory-mapped `pdfs`
+            are re-opened by each worker rather than copied.
+
+        """
+
+        # Initialize values.
+        if sparse.issparse(pdfs):
+            self.pdfs = sparse.csr_matrix(pdfs)
+        else:
+            self.pdfs = pdfs
+        self.chunksize, self.pool = chunksize, pool
+        self.step_size, self.adapt_state = None, None
+        self.reset(sink=sink, blocksize=blocksize)
+
+    def run_mcmc(self, Niter, alpha=None, pos_init=None, thin=1, nleap=10,
+                 step_size=None, Nadapt=None, target_accept=0.8,
+                 rstate=None, verbose=True, checkpoint=None,
+                 checkpoint_every=100, min_ess=None, max_rhat=None,
+                 check_every=100):
+        """
+        Sample the distribution using HMC.
+
+        Parameters
+        ----------
+        Niter : int
+            The number of samples to draw/iterations to run.
+
+        alpha : `~numpy.ndarray` of shape `(Ndim,)`, optional
+            The concentration parameters for the Dirichlet prior.
+            If not provided, a flat `alpha = 1.` will be assumed.
+
+        pos_init : `~numpy.ndarray` of shape `(Ndim,)`, optional
+            The initial position from where we should start sampling.
+            If not provided, the last position available from the previous
+            set of samples will be used. If no samples have been drawn, the
+            initial position will be the stacked PDFs.
+
+        thin : int, optional
+            The number of HMC trajectories to run before saving a sample.
+            Default is `1`.
+
+        nleap : int, optional
+            The number of leapfrog steps in each trajectory. Default is `10`.
+
+        step_size : float, optional
+            The (initial) leapfrog step size. If not provided, the step size
+            from the previous run will be used (or `0.1` if no samples have
+            been drawn).
+
+        Nadapt : int, optional
+            The number of trajectories at the start of the run used to tune
+            the step size using dual averaging. If not provided, this
+            defaults to `Niter * thin // 2` if the step size has not been
+            tuned yet, continues any adaptation left unfinished by a
+            previous run (e.g., one restored using :meth:`load_checkpoint`),
+            and is `0` otherwise. Samples drawn during adaptation are
+            discarded (see :attr:`nwarmup`), so only the remaining
+            `Niter - ceil(Nadapt / thin)` samples are saved.
+
+        target_accept : float, optional
+            The target mean acceptance probability used when tuning the
+            step size. Default is `0.8`.
+
+        rstate : `~numpy.random.RandomState`
+            `~numpy.random.RandomState` instance.
+
+        verbose : bool, optional
+            Whether or not to output a simple summary of the current run that
+            updates with each iteration. Default is `True`.
+
+        checkpoint : str, optional
+            If provided, the state of the sampler (see
+            :meth:`save_checkpoint`) will be saved to this file every
+            `checkpoint_every` samples.
+
+        checkpoint_every : int, optional
+            The number of samples between checkpoints. Default is `100`.
+
+        min_ess : float, optional
+            If provided, sampling will stop early (before `Niter` samples
+            have been drawn) once the effective sample size estimated by
+            :attr:`diagnostics` exceeds `min_ess` in every bin. The
+            stopping criteria are only checked (and the diagnostics only
+            computed) using samples drawn after adaptation has finished.
+
+        max_rhat : float, optional
+            If provided, sampling will stop early once the split-Rhat
+            estimated by :attr:`diagnostics` falls below `max_rhat` in
+            every bin. If both `min_ess` and `max_rhat` are provided, both
+            criteria must be met.
+
+        check_every : int, optional
+            The number of samples between checks of the stopping criteria.
+            Default is `100`.
+
+        """
+
+        # Initialize values.
+        Nobs, Ndim = self.pdfs.shape
+        if rstate is None:
+            rstate = np.random
+        adapt_state = None
+        if Nadapt is None:
+            state = self.adapt_state
+            if (step_size is None and state is not None and
+               state['ntraj'] < state['Nadapt']):
+                adapt_state = state  # resume adaptation
+            Nadapt = Niter * thin // 2 if self.step_size is None else 0
+        if step_size is None:
+            step_size = self.step_size if self.step_size is not None else 0.1
+
+        # Initialize starting position.
+        if pos_init is None:
+            if self._buffer.last is not None:
+                # Start from our last position.
+                pos = self._buffer.last
+            else:
+                # Otherwise, just stack the individual PDFs.
+                pos = _stack_pdfs(self.pdfs)
+        else:
+            # Use provided position.
+            pos = pos_init
+        self.rstate = rstate
+
+        # Sample.
+        nwarmup, nsaved = self.nwarmup, 0
+        for i, (x, lnp) in enumerate(self.sample(Niter, alpha=alpha,
+                                                 pos_init=pos, thin=thin,
+                                                 nleap=nleap,
+                                                 step_size=step_size,
+                                                 Nadapt=Nadapt,
+                                                 target_accept=target_accept,
+                                                 adapt_state=adapt_state,
+                                                 rstate=rstate)):
+
+            warmup, nwarmup = self.nwarmup > nwarmup, self.nwarmup
+            nsaved += self._store(x, lnp, warmup=warmup)
+            if checkpoint is not None and (i + 1) % checkpoint_every == 0:
+                self.save_checkpoint(checkpoint, rstate=rstate)
+            if verbose:
+                sys.stderr.write('\r Sample {:d}/{:d} [lnpost = {:6.3f}, '
+                                 'step = {:6.4f}]      '
+                                 .format(i+1, Niter, lnp, self.step_size))
+                sys.stderr.flush()
+            # Check stopping criteria (only once adaptation has finished).
+            if (not warmup and nsaved % check_every == 0 and
+               self.diagnostics.converged(min_ess=min_ess,
+                                          max_rhat=max_rhat)):
+                break
+
+    def sample(self, Niter, alpha=None, pos_init=None, thin=1, nleap=10,
+               step_size=0.1, Nadapt=0, target_accept=0.8, adapt_state=None,
+               rstate=None):
+        """
+        Internal generator used for HMC sampling.
+
+        Parameters
+        ----------
+        Niter : int
+            The number of samples to draw/iterations to run.
+
+        alpha : `~numpy.ndarray` of shape `(Ndim,)`, optional
+            The concentration parameters for the Dirichlet prior.
+            If not provided, a flat `alpha = 1.` will be assumed.
+
+        pos_init : `~numpy.ndarray` of shape `(Ndim,)`, optional
+            The initial position from where we should start sampling.
+            If not provided, the initial position will be the stacked PDFs.
+
+        thin : int, optional
+            The number of HMC trajectories to run before saving a sample.
+            Default is `1`.
+
+        nleap : int, optional
+            The number of leapfrog steps in each trajectory. Default is `10`.
+
+        step_size : float, optional
+            The (initial) leapfrog step size. Default is `0.1`.
+
+        Nadapt : int, optional
+            The number of trajectories used to tune the step size using
+            dual averaging. Default is `0`.
+
+        target_accept : float, optional
+            The target mean acceptance probability used when tuning the
+            step size. Default is `0.8`.
+
+        adapt_state : dict, optional
+            The dual averaging state (see :attr:`adapt_state`) from which
+            to resume adaptation. If provided, `step_size` and `Nadapt` are
+            taken from the saved state.
+
+        rstate : `~numpy.random.RandomState`
+            `~numpy.random.RandomState` instance.
+
+        """
+
+        # Initialize values.
+        Nobs, Ndim = self.pdfs.shape
+        if rstate is None:
+            rstate = np.random
+        if alpha is None:
+            alpha = np.ones(Ndim)
+        pdfs = self.pdfs
+
+        def lnpost_grad(theta):
+            # Compute ln(post) (with Jacobian) and its gradient w.r.t. theta.
+            lnz = np.append(theta, 0.)
+            lnz -= logsumexp(lnz)
+            nz = np.exp(lnz)
+            lnlike, g = _reduce_pdfs(pdfs, nz, chunksize=self.chunksize,
+                                     pool=self.pool)
+            lnprior = np.dot(alpha - 1., lnz)
+            lnjac = np.sum(lnz)
+            # Chain rule through the softmax.
+            g = g * nz + alpha
+            grad = g - nz * np.sum(g)
+            return lnlike + lnprior, lnjac, grad[:-1], nz
+
+        # Initialize starting position.
+        if pos_init is None:
+            pos = _stack_pdfs(self.pdfs)
+        else:
+            pos = np.array(pos_init)
+        pos = np.clip(pos, 1e-300, None)  # avoid -inf log-ratios
+        theta = np.log(pos[:-1]) - np.log(pos[-1])
+        lnpost, lnjac, grad, pos = lnpost_grad(theta)
+
+        # Initialize dual averaging.
+        if adapt_state is None:
+            adapt_state = {'log_eps': np.log(step_size),
+                           'log_eps_bar': np.log(step_size), 'hbar': 0.,
+                           'mu': np.log(10. * step_size), 'ntraj': 0,
+                           'Nadapt': Nadapt}
+        adapt_state = dict(adapt_state)
+        self.adapt_state = adapt_state
+        log_eps, hbar = adapt_state['log_eps'], adapt_state['hbar']
+        log_eps_bar, mu = adapt_state['log_eps_bar'], adapt_state['mu']
+        ntraj, Nadapt = adapt_state['ntraj'], adapt_state['Nadapt']
+        gamma, t0, kappa = 0.05, 10., 0.75
+
+        # Sample.
+        for i in range(Niter):
+            for j in range(thin):
+                # Randomize step size slightly to avoid periodic trajectories.
+                eps = np.exp(log_eps) * rstate.uniform(0.9, 1.1)
+                # Draw momentum.
+                p = rstate.randn(Ndim - 1)
+                H = -(lnpost + lnjac) + 0.5 * np.dot(p, p)
+                # Integrate trajectory using leapfrog steps.
+                theta_new, grad_new = theta.copy(), grad
+                p_new = p + 0.5 * eps * grad_new
+                for k in range(nleap):
+                    theta_new += eps * p_new
+                    lnpost_new, lnjac_new, grad_new, pos_new = \
+                        lnpost_grad(theta_new)
+                    if k < nleap - 1:
+                        p_new += eps * grad_new
+                p_new += 0.5 * eps * grad_new
+                H_new = (-(lnpost_new + lnjac_new) +
+                         0.5 * np.dot(p_new, p_new))
+                # Metropolis update.
+                if np.isfinite(H_new):
+                    accept = min(1., np.exp(H - H_new))
+                else:
+                    accept = 0.
+                self.nprop += 1
+                if rstate.rand() < accept:
+                    self.naccept += 1
+                    theta, grad = theta_new, grad_new
+                    lnpost, lnjac, pos = lnpost_new, lnjac_new, pos_new
+                # Tune step size.
+                ntraj += 1
+                if ntraj <= Nadapt:
+                    w = 1. / (ntraj + t0)
+                    hbar = (1. - w) * hbar + w * (target_accept - accept)
+                    log_eps = mu - np.sqrt(ntraj) / gamma * hbar
+                    eta = ntraj**(-kappa)
+                    log_eps_bar = eta * log_eps + (1. - eta) * log_eps_bar
+                    if ntraj == Nadapt:
+                        log_eps = log_eps_bar
+                    adapt_state.update(log_eps=log_eps, hbar=hbar,
+                                       log_eps_bar=log_eps_bar, ntraj=ntraj)
+                self.step_size = np.exp(log_eps)
 
             # Return current position.
+            if ntraj - thin < Nadapt:
+                self.nwarmup += 1
             yield pos, lnpost
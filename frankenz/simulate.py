@@ -14,13 +14,19 @@ import sys
 import os
 import warnings
 import math
+import copy
+import hashlib
 import numpy as np
 import warnings
+from scipy import sparse
+from scipy.interpolate import PchipInterpolator, CubicSpline
 from . import priors
 from . import reddening
 
 __all__ = ["mag_err", "draw_mag", "draw_type_given_mag",
-           "draw_redshift_given_type_mag", "draw_ztm", "MockSurvey"]
+           "draw_redshift_given_type_mag", "draw_types_given_mags",
+           "draw_redshifts_given_types_mags", "draw_ztm", "NoiseModel",
+           "ModelGrid", "MockSurvey"]
 
 # Filter lists for pre-set surveys.
 _FILTERS = {'cosmos': 'COSMOS.list',
@@ -50,6 +56,62 @@ _IGM = {'madau+99': reddening.madau_teff}
 # Useful constants.
 c = 299792458.0  # speed of light in m/s
 
+# Spacing of the ln(wavelength) grid used to compute photometry.
+_DLNW = 2e-4
+
+# Version of the cache for parsed filters and templates, which are stored
+# alongside the tabulated priors (see `priors._CACHE_DIR`).
+_CACHE_VERSION = 1
+
+
+def _cache_key(kind, fnames, *args):
+    """
+    Internal function used to compute a key identifying a cache entry based
+    on the contents of the files `fnames` along with any additional
+    arguments `args` that affect the cached quantities.
+
+    """
+
+    h = hashlib.sha1()
+    h.update(str((kind, _CACHE_VERSION, args)).encode('utf-8'))
+    for fname in fnames:
+        with open(fname, 'rb') as f:
+            h.update(f.read())
+
+    return '{0}_{1}'.format(kind, h.hexdigest())
+
+
+def _load_cache(key, cache_dir):
+    """
+    Internal function used to load a cache entry saved using `_save_cache`.
+    Returns `None` if the entry does not exist or cannot be read.
+
+    """
+
+    fname = os.path.join(cache_dir, key + '.npz')
+    if not os.path.exists(fname):
+        return None
+    try:
+        with np.load(fname) as f:
+            return dict(f)
+    except Exception:
+        return None
+
+
+def _save_cache(key, cache_dir, **arrays):
+    """
+    Internal function used to save a cache entry (see
+    `priors._write_cache`). Failures (e.g., from a read-only file system)
+    only raise a warning.
+
+    """
+
+    fname = os.path.join(cache_dir, key + '.npz')
+    try:
+        priors._write_cache(fname, np.savez, **arrays)
+    except (IOError, OSError) as e:
+        warnings.warn("Unable to write cache file {0}: {1}".format(fname, e))
+
 
 def mag_err(mag, maglim, sigdet=5., params=(4.56, 1., 1.)):
     """
@@ -83,11 +145,11 @@ def mag_err(mag, maglim, sigdet=5., params=(4.56, 1., 1.)):
     teff = np.exp(a + b * (maglim - 21.))
 
     # Compute flux/limit.
-    F = 10**(-0.4 * (m - 22.5))
-    Flim = 10**(-0.4 * (mlim - 22.5))
+    F = 10**(-0.4 * (mag - 22.5))
+    Flim = 10**(-0.4 * (maglim - 22.5))
 
     # Compute noise.
-    Fnoise = (Flim / sigmadet)**2 * k * teff - Flim
+    Fnoise = (Flim / sigdet)**2 * k * teff - Flim
     magerr = 2.5 / np.log(10.) * np.sqrt((1. + Fnoise / F) / (F * k * teff))
 
     return magerr
@@ -273,6 +335,183 @@ def draw_redshift_given_type_mag(p_z_tm, types, mags, rstate=None,
         yield redshift
 
 
+def _mag_grid_nodes(mags, Nm, rstate):
+    """
+    Internal function used to construct a magnitude grid spanning `mags`
+    and randomly assign each magnitude to one of its two neighboring grid
+    points with probabilities given by the linear interpolation weights.
+    Sampling from the quantities tabulated at the assigned grid points
+    is then equivalent to sampling from their linear interpolation in
+    magnitude.
+
+    """
+
+    mags = np.asarray(mags, dtype='float')
+    mlow, mhigh = np.min(mags), np.max(mags)
+    if mhigh > mlow and Nm > 1:
+        mgrid = np.linspace(mlow, mhigh, Nm)
+        pos = (mags - mlow) / (mgrid[1] - mgrid[0])
+        idx = np.clip(np.floor(pos).astype('int'), 0, Nm - 2)
+        idx += (rstate.rand(len(mags)) < (pos - idx))
+    else:
+        mgrid = np.array([mlow])
+        idx = np.zeros(len(mags), dtype='int')
+
+    return mgrid, idx
+
+
+def draw_types_given_mags(p_type_given_mag, mags, Ntypes, rstate=None,
+                          ptm_kwargs=None, Nm=1000):
+    """
+    Draw corresponding types from P(type | mag) using the
+    :meth:`p_type_given_mag` function for all objects at once. P(type | mag)
+    is tabulated over a grid of `Nm` magnitudes spanning `mags` and
+    linearly interpolated.
+
+    Parameters
+    ----------
+    p_type_mag : function
+        Function that returns the probability of an object's type at a
+        given magnitude.
+
+    mags : iterable of shape (N,)
+        Set of input magnitudes.
+
+    Ntypes : int
+        The number of types we can draw.
+
+    rstate : `~numpy.random.RandomState`, optional
+        `~numpy.random.RandomState` instance. If not given, the
+         global random state of the `~numpy.random` module will be used.
+
+    ptm_kwargs : dict, optional
+        Additional keyword arguments to be passed to :meth:`p_type_given_mag`.
+
+    Nm : int, optional
+        The number of magnitudes used to tabulate P(type | mag).
+        Default is `1000`.
+
+    Returns
+    -------
+    types : `~numpy.ndarray` of shape (N,)
+        The types of the simulated objects drawn from :meth:`p_type_given_mag`
+        given `mags`.
+
+    """
+
+    if ptm_kwargs is None:
+        ptm_kwargs = dict()
+    if rstate is None:
+        rstate = np.random
+
+    # Tabulate P(type | mag).
+    mgrid, idx = _mag_grid_nodes(mags, Nm, rstate)
+    prob = np.array([[p_type_given_mag(t, m, **ptm_kwargs)
+                      for t in range(Ntypes)] for m in mgrid])
+    cdf = prob.cumsum(axis=1)  # compute CDF
+    cdf /= cdf[:, -1:]  # normalize
+
+    # Draw types.
+    u = rstate.rand(len(idx))
+    types = np.minimum(np.sum(cdf[idx] < u[:, None], axis=1), Ntypes - 1)
+
+    return types
+
+
+def draw_redshifts_given_types_mags(p_z_tm, types, mags, Ntypes, rstate=None,
+                                    pztm_kwargs=None, zbounds=(0, 15),
+                                    Npoints=1000, Nm=1000):
+    """
+    Draw corresponding redshifts from P(z | type, mag) using the
+    :meth:`p_ztm` function for all objects at once. The inverse cumulative
+    distribution functions (CDFs) are tabulated over a grid of `Nm`
+    magnitudes spanning `mags` (for each type) and linearly interpolated.
+
+    Parameters
+    ----------
+    p_z_tm : function
+        Function that takes in `z`, `t`, and `m` and returns a
+        probability P(z | t, m).
+
+    types : iterable of shape (N,)
+        Set of input types.
+
+    mags : iterable of shape (N,)
+        Set of input magnitudes.
+
+    Ntypes : int
+        The number of types.
+
+    rstate : `~numpy.random.RandomState`, optional
+        `~numpy.random.RandomState` instance. If not given, the
+         global random state of the `~numpy.random` module will be used.
+
+    pztm_kwargs : dict, optional
+        Additional keyword arguments to be passed to :meth:`p_ztm`.
+
+    zbounds : tuple of length 2, optional
+        The minimum/maximum redshift allowed. Default is
+        `(0, 15)`.
+
+    Npoints : int, optional
+        The number of points used when interpolating the inverse cumulative
+        distribution function (CDF). Default is `1000`.
+
+    Nm : int, optional
+        The number of magnitudes used to tabulate the CDFs.
+        Default is `1000`.
+
+    Returns
+    -------
+    redshifts : `~numpy.ndarray` of shape (Nobj,)
+        The redshifts of the simulated objects drawn from :meth:`p_ztm`.
+
+    """
+
+    if pztm_kwargs is None:
+        pztm_kwargs = dict()
+    if zbounds[0] >= zbounds[1]:
+        raise ValueError("The values {0} in `zbounds` are incorrectly "
+                         "ordered.".format(zbounds))
+    if rstate is None:
+        rstate = np.random
+
+    # Compute the redshift grid.
+    zgrid = np.linspace(zbounds[0], zbounds[1], Npoints)
+    lpad = 1e-5 * (zbounds[1] - zbounds[0])  # compute left padding for z
+    zgrid2 = np.append(zgrid[0] - lpad, zgrid)  # zgrid with left padding
+
+    # Tabulate the (augmented) CDFs over (mag, type).
+    mgrid, idx = _mag_grid_nodes(mags, Nm, rstate)
+    cdf_z = np.zeros((len(mgrid), Ntypes, Npoints + 1))
+    for i, m in enumerate(mgrid):
+        for t in range(Ntypes):
+            try:
+                pdf_z = p_z_tm(z=zgrid, t=t, m=m, **pztm_kwargs)
+            except:
+                pdf_z = np.array([p_z_tm(z=z, t=t, m=m, **pztm_kwargs)
+                                  for z in zgrid])
+            cdf = pdf_z.cumsum()
+            cdf_z[i, t, 1:] = cdf / cdf[-1]  # left pad and normalize
+
+    # Draw redshifts from the inverse CDFs F^-1(x). Each CDF is offset by
+    # its row index so that all objects can be inverted at once using
+    # a single search over the flattened table.
+    rows = idx * Ntypes + np.asarray(types, dtype='int')
+    cdf_flat = (cdf_z.reshape(-1, Npoints + 1) +
+                np.arange(len(mgrid) * Ntypes)[:, None]).flatten()
+    u = rows + rstate.rand(len(rows))
+    k = np.searchsorted(cdf_flat, u, side='right')
+    k = np.clip(k, rows * (Npoints + 1) + 1, (rows + 1) * (Npoints + 1) - 1)
+    c0, c1 = cdf_flat[k - 1], cdf_flat[k]
+    j = k - rows * (Npoints + 1)  # position within each CDF
+    with np.errstate(invalid='ignore', divide='ignore'):
+        w = np.where(c1 > c0, (u - c0) / (c1 - c0), 1.)
+    redshifts = zgrid2[j - 1] + w * (zgrid2[j] - zgrid2[j - 1])
+
+    return np.maximum(0., redshifts)
+
+
 def draw_ztm(pmag, p_tm, p_ztm, Nobj, pm_kwargs=None, ptm_kwargs=None,
              pztm_kwargs=None, mbounds=(10, 28), zbound=(0, 15), Npoints=1000):
     """
@@ -351,6 +590,438 @@ def draw_ztm(pmag, p_tm, p_ztm, Nobj, pm_kwargs=None, ptm_kwargs=None,
     return mags, types, redshifts
 
 
+def _grid_bounds(filters, redshifts, dlnw=_DLNW):
+    """
+    Internal function used to compute the (inclusive) range of indices of
+    the uniform ln(wavelength) grid with spacing `dlnw` that covers the
+    rest-frame wavelengths probed by `filters` over `redshifts`.
+
+    """
+
+    lzp1 = np.log1p(np.atleast_1d(np.asarray(redshifts, dtype='float')))
+    flw_min = min(np.log(f['wavelength']).min() for f in filters)
+    flw_max = max(np.log(f['wavelength']).max() for f in filters)
+    n0 = int(np.floor((flw_min - np.max(lzp1)) / dlnw)) - 2
+    n1 = int(np.ceil((flw_max - np.min(lzp1)) / dlnw)) + 2
+
+    return n0, n1
+
+
+def _template_grid(templates, filters, redshifts, dlnw=_DLNW):
+    """
+    Internal function used to resample each template in `templates` onto a
+    uniform grid in ln(wavelength) with spacing `dlnw` that covers the
+    rest-frame wavelengths probed by `filters` over `redshifts`. Grid
+    points lie at integer multiples of `dlnw` so that redshifting a
+    template corresponds to an offset in index. Returns the index of the
+    first grid point and the `(Ngrid, Nt)` resampled templates.
+
+    """
+
+    # Compute the range of the grid.
+    n0, n1 = _grid_bounds(filters, redshifts, dlnw=dlnw)
+    lw = np.arange(n0, n1 + 1) * dlnw
+
+    # Resample templates. Interpolation is performed using the arcsinh
+    # transform for improved numerical stability.
+    tgrid = np.empty((len(lw), len(templates)))
+    for j, t in enumerate(templates):
+        tgrid[:, j] = np.sinh(np.interp(lw, np.log(t['wavelength']),
+                                        np.arcsinh(t['fnu'])))
+
+    return n0, tgrid
+
+
+def _model_phot(templates, filters, redshifts, red_fn=None, dlnw=_DLNW,
+                tgrid=None):
+    """
+    Internal function used to compute the (unnormalized) photometry of
+    each template in `templates` over the set of filters `filters` at each
+    redshift in `redshifts`. Returns an `(Nz, Nt, Nf)` `~numpy.ndarray`.
+
+    Templates and filters are resampled onto a shared uniform grid in
+    ln(wavelength) with spacing `dlnw` (see `_template_grid`, which can
+    be precomputed and passed as `tgrid`, in which case `templates` is not
+    used). The grid only needs to cover `_grid_bounds` over `redshifts`.
+    Redshifting then amounts to an offset in index (linearly interpolated
+    between neighboring grid points), so the filter integrals for all
+    redshifts and templates reduce to one sparse `(Nz, Ngrid)` by dense
+    `(Ngrid, Nt)` matrix product per filter.
+
+    """
+
+    # Initialize useful quantities.
+    redshifts = np.atleast_1d(np.asarray(redshifts, dtype='float'))
+    Nz = len(redshifts)
+    if tgrid is None:
+        tgrid = _template_grid(templates, filters, redshifts, dlnw=dlnw)
+    n0, tgrid = tgrid
+    shift = np.log1p(redshifts) / dlnw  # ln(1+z) in units of the grid
+    s0 = np.floor(shift).astype('int')
+    frac = (shift - s0)[:, None]
+
+    # Compute unnormalized photometry.
+    phot = np.zeros((Nz, tgrid.shape[1], len(filters)))
+    for k, f in enumerate(filters):
+        # Resample the filter onto the grid. Integrating over d(ln nu)
+        # corresponds to uniform weights in ln(wavelength).
+        f_lw = np.log(f['wavelength'])
+        n = np.arange(int(np.ceil(f_lw[0] / dlnw)),
+                      int(np.floor(f_lw[-1] / dlnw)) + 1)
+        wt = np.interp(n * dlnw, f_lw, f['transmission'])
+        wt /= np.sum(wt)  # filter normalization
+
+        # Compute reddening. Preset functions are vectorized over redshift.
+        f_wave = np.exp(n * dlnw)
+        if red_fn is not None and red_fn in _IGM.values():
+            igm_teff = red_fn(f_wave, redshifts)
+        elif red_fn is not None:
+            igm_teff = np.array([red_fn(f_wave, z) for z in redshifts])
+        else:
+            igm_teff = np.ones((Nz, len(n)))
+
+        # Integrate the flux over the filter for all redshifts and
+        # templates at once. Rest-frame grid point `n - shift` lies between
+        # `n - s0 - 1` and `n - s0`, so each redshift contributes a
+        # contiguous band of `len(n) + 1` template grid points.
+        a = igm_teff * wt
+        vals = np.zeros((Nz, len(n) + 1))
+        vals[:, :-1] += frac * a
+        vals[:, 1:] += (1. - frac) * a
+        cols = (n[0] - 1 - n0 - s0)[:, None] + np.arange(len(n) + 1)
+        proj = sparse.csr_matrix((vals.ravel(), cols.ravel(),
+                                  np.arange(Nz + 1) * (len(n) + 1)),
+                                 shape=(Nz, len(tgrid)))
+        phot[:, :, k] = proj.dot(tgrid)
+
+    return phot
+
+
+def _model_phot_chunk(args):
+    """
+    Internal function used to compute photometry over a chunk of redshifts
+    (see `_model_phot`). Defined at the module level so that it can be
+    passed to a `pool`.
+
+    """
+
+    # Unpack arguments.
+    filters, redshifts, red_fn, tgrid = args
+
+    return _model_phot(None, filters, redshifts, red_fn=red_fn,
+                       tgrid=tgrid)
+
+
+def _make_mock_chunk(args):
+    """
+    Internal function used to generate a single chunk of a mock catalog.
+    Defined at the module level so that it can be passed to a `pool`.
+
+    """
+
+    # Unpack arguments.
+    survey, i, Nobj, seed, fname, params_kwargs, phot_kwargs = args
+
+    # Derive the random state for this chunk.
+    ss = np.random.SeedSequence(seed, spawn_key=(i,))
+    rstate = np.random.RandomState(np.random.MT19937(ss))
+
+    # Generate the mock.
+    mock = copy.copy(survey)
+    mock.sample_params(Nobj, rstate=rstate, verbose=False, **params_kwargs)
+    mock.sample_phot(rstate=rstate, verbose=False, **phot_kwargs)
+
+    # Write the catalog.
+    if fname is not None:
+        fname = fname.format(i)
+        np.savez(fname, **mock.data)
+        return fname
+
+    return mock.data
+
+
+class NoiseModel(object):
+    """
+    Vectorized model for the photometric errors of simulated objects and
+    the noise used to jitter their photometry. Errors are derived from the
+    1-sigma flux noise in each band, which can be modulated by a spatial
+    depth map and per-object (lognormal) background variation, and the
+    noise can be correlated across bands. Can be subclassed (overriding
+    :meth:`sample_errors` and/or :meth:`jitter`) to implement other error
+    models.
+
+    """
+
+    def __init__(self, depths, depth_map=None, map_weights=None,
+                 bkg_scatter=0., corr=None, chunksize=100000):
+        """
+        Initialize the noise model.
+
+        Parameters
+        ----------
+        depths : `~numpy.ndarray` of shape (Nfilt,)
+            The (mean) 1-sigma flux noise in each band.
+
+        depth_map : `~numpy.ndarray` of shape (Npix, Nfilt), optional
+            The 1-sigma flux noise in each band over `Npix` spatial regions
+            (e.g., pixels). If provided, each object is assigned to a
+            region and `depths` is ignored.
+
+        map_weights : `~numpy.ndarray` of shape (Npix,), optional
+            The relative probability of an object falling in each region
+            (e.g., the area). Default is uniform.
+
+        bkg_scatter : float or `~numpy.ndarray` of shape (Nfilt,), optional
+            The (natural log) scatter of the background noise among objects.
+            The noise in every band is scaled by a common mean-one lognormal
+            factor whose scatter in each band is set by `bkg_scatter`.
+            Default is `0.` (no variation).
+
+        corr : `~numpy.ndarray` of shape (Nfilt, Nfilt), optional
+            The correlation matrix of the noise across bands. Default is
+            uncorrelated noise.
+
+        chunksize : int, optional
+            The number of objects jittered at once. Default is `100000`.
+
+        """
+
+        # Initialize values.
+        self.depths = np.asarray(depths, dtype='float')
+        self.NFILTER = len(self.depths)
+        self.depth_map = depth_map
+        if depth_map is not None:
+            self.depth_map = np.asarray(depth_map, dtype='float')
+            if self.depth_map.ndim != 2 or \
+               self.depth_map.shape[1] != self.NFILTER:
+                raise ValueError("`depth_map` must have shape (Npix, {0})."
+                                 .format(self.NFILTER))
+            if map_weights is not None:
+                map_weights = np.asarray(map_weights, dtype='float')
+                map_weights = map_weights / map_weights.sum()
+        self.map_weights = map_weights
+        self.bkg_scatter = np.asarray(bkg_scatter, dtype='float')
+        self.corr_chol = None
+        if corr is not None:
+            corr = np.asarray(corr, dtype='float')
+            if corr.shape != (self.NFILTER, self.NFILTER):
+                raise ValueError("`corr` must have shape ({0}, {0})."
+                                 .format(self.NFILTER))
+            self.corr_chol = np.linalg.cholesky(corr)  # raises if not PD
+        self.chunksize = chunksize
+
+    def sample_errors(self, Nobj, rstate=None, pix=None):
+        """
+        Sample the 1-sigma flux errors of `Nobj` objects.
+
+        Parameters
+        ----------
+        Nobj : int
+            The number of objects.
+
+        rstate : `~numpy.random.RandomState`, optional
+            `~numpy.random.RandomState` instance. If not given, the
+             global random state of the `~numpy.random` module will be used.
+
+        pix : `~numpy.ndarray` of shape (Nobj,), optional
+            The region of `depth_map` each object falls in. If not provided,
+            regions will be drawn following `map_weights`.
+
+        Returns
+        -------
+        fnoise : `~numpy.ndarray` of shape (Nobj, Nfilt)
+            The 1-sigma flux errors.
+
+        pix : `~numpy.ndarray` of shape (Nobj,)
+            The region each object falls in. `None` if no `depth_map` was
+            provided.
+
+        """
+
+        if rstate is None:
+            rstate = np.random
+
+        # Assign depths.
+        if self.depth_map is not None:
+            if pix is None:
+                pix = rstate.choice(len(self.depth_map), size=Nobj,
+                                    p=self.map_weights)
+            fnoise = self.depth_map[pix]
+        else:
+            fnoise = np.tile(self.depths, (Nobj, 1))
+
+        # Add in background variation.
+        if np.any(self.bkg_scatter > 0.):
+            s = self.bkg_scatter
+            fnoise = fnoise * np.exp(np.outer(rstate.standard_normal(Nobj), s)
+                                     - 0.5 * s**2)
+
+        return fnoise, pix
+
+    def jitter(self, phot, fnoise, rstate=None):
+        """
+        Jitter the input photometry using the input errors. Noise is drawn
+        in chunks of `chunksize` objects, which does not change the results
+        for a given random state.
+
+        Parameters
+        ----------
+        phot : `~numpy.ndarray` of shape (Nobj, Nfilt)
+            The noiseless photometry.
+
+        fnoise : `~numpy.ndarray` of shape (Nobj, Nfilt)
+            The 1-sigma flux errors.
+
+        rstate : `~numpy.random.RandomState`, optional
+            `~numpy.random.RandomState` instance. If not given, the
+             global random state of the `~numpy.random` module will be used.
+
+        Returns
+        -------
+        phot_obs : `~numpy.ndarray` of shape (Nobj, Nfilt)
+            The noisy photometry.
+
+        """
+
+        if rstate is None:
+            rstate = np.random
+
+        # Jitter photometry.
+        Nobj = len(phot)
+        phot_obs = np.empty(np.shape(phot), dtype='float')
+        for i in range(0, Nobj, self.chunksize):
+            sl = slice(i, min(i + self.chunksize, Nobj))
+            noise = rstate.standard_normal(phot_obs[sl].shape)
+            if self.corr_chol is not None:
+                noise = noise.dot(self.corr_chol.T)  # correlate bands
+            noise *= fnoise[sl]
+            noise += phot[sl]
+            phot_obs[sl] = noise
+
+        return phot_obs
+
+
+class ModelGrid(object):
+    """
+    Model photometry computed over a (coarse) set of redshift nodes that
+    is interpolated smoothly in `ln(1 + z)` for each template and filter,
+    so that models can be generated at arbitrary redshifts on demand.
+
+    """
+
+    def __init__(self, znodes, phot, kind='pchip'):
+        """
+        Initialize the interpolants.
+
+        Parameters
+        ----------
+        znodes : `~numpy.ndarray` of shape (Nnode,)
+            Redshift nodes (in increasing order).
+
+        phot : `~numpy.ndarray` of shape (Nnode, Nt, Nf)
+            Photometry of `Nt` templates in `Nf` filters at each node.
+
+        kind : {`'pchip'`, `'cubic'`, `'linear'`}, optional
+            The interpolant used. `'pchip'` (default) uses piecewise cubic
+            Hermite polynomials that preserve monotonicity and so do not
+            overshoot around sharp features (e.g., breaks moving through
+            filters). `'cubic'` uses a (not-a-knot) cubic spline, which is
+            more accurate for smooth photometry. `'linear'` uses linear
+            interpolation.
+
+        """
+
+        # Initialize values.
+        self.znodes = np.asarray(znodes, dtype='float')
+        self.phot = np.asarray(phot, dtype='float')
+        if self.phot.ndim != 3 or len(self.phot) != len(self.znodes):
+            raise ValueError("`phot` must have shape (Nnode, Nt, Nf) with "
+                             "Nnode={0}.".format(len(self.znodes)))
+        if np.any(np.diff(self.znodes) <= 0.):
+            raise ValueError("`znodes` must be strictly increasing.")
+        self.NNODE, self.NTEMPLATE, self.NFILTER = self.phot.shape
+        self.kind = kind
+
+        # Construct interpolants.
+        x = np.log1p(self.znodes)
+        if kind == 'pchip':
+            self.interp = PchipInterpolator(x, self.phot, axis=0,
+                                            extrapolate=False)
+        elif kind == 'cubic':
+            self.interp = CubicSpline(x, self.phot, axis=0,
+                                      extrapolate=False)
+        elif kind == 'linear':
+            self.interp = None
+        else:
+            raise ValueError("{0} is not a valid interpolant.".format(kind))
+
+    def __call__(self, redshifts):
+        """
+        Compute the photometry at the input redshifts.
+
+        Parameters
+        ----------
+        redshifts : float or `~numpy.ndarray` of shape (Nz,)
+            Input redshifts. Must lie within the range spanned by `znodes`
+            (up to round-off). Scalars are treated as arrays with `Nz=1`.
+
+        Returns
+        -------
+        phot : `~numpy.ndarray` of shape (Nz, Nt, Nf)
+            Interpolated photometry.
+
+        """
+
+        redshifts = np.atleast_1d(np.asarray(redshifts, dtype='float'))
+        zlow, zhigh = self.znodes[0], self.znodes[-1]
+        ztol = 1e-10 * (1. + zhigh)  # tolerance for round-off
+        if not np.all((redshifts >= zlow - ztol) &
+                      (redshifts <= zhigh + ztol)):
+            raise ValueError("Redshifts must lie between {0} and {1}."
+                             .format(zlow, zhigh))
+        x = np.log1p(np.clip(redshifts, zlow, zhigh))
+
+        if self.interp is not None:
+            phot = self.interp(x)
+        else:
+            xn = np.log1p(self.znodes)
+            idx = np.clip(np.searchsorted(xn, x) - 1, 0, self.NNODE - 2)
+            w = ((x - xn[idx]) / (xn[idx + 1] - xn[idx]))[:, None, None]
+            phot = (1. - w) * self.phot[idx] + w * self.phot[idx + 1]
+
+        return phot
+
+    def models(self, zgrid):
+        """
+        Generate models for all templates over the input redshift grid in
+        the form used by :class:`~frankenz.bruteforce.BruteForce`.
+
+        Parameters
+        ----------
+        zgrid : `~numpy.ndarray` of shape (Nz,)
+            Input redshift grid.
+
+        Returns
+        -------
+        models : `~numpy.ndarray` of shape (Nz * Nt, Nf)
+            Model photometry ordered by redshift and then template.
+
+        models_z : `~numpy.ndarray` of shape (Nz * Nt,)
+            Redshift of each model.
+
+        models_t : `~numpy.ndarray` of shape (Nz * Nt,)
+            Template (index) of each model.
+
+        """
+
+        zgrid = np.atleast_1d(np.asarray(zgrid, dtype='float'))
+        models = self(zgrid).reshape(-1, self.NFILTER)
+        models_z = np.repeat(zgrid, self.NTEMPLATE)
+        models_t = np.tile(np.arange(self.NTEMPLATE), len(zgrid))
+
+        return models, models_z, models_t
+
+
 class MockSurvey(object):
     """
     A mock survey object used to generate and store mock data.
@@ -441,7 +1112,8 @@ class MockSurvey(object):
         if rstate is None:
             self.rstate = np.random
 
-    def load_survey(self, filter_list, path='', Npoints=5e4):
+    def load_survey(self, filter_list, path='', Npoints=5e4, cache=True,
+                    cache_dir=None):
         """
         Load an input filter list and associated depths for a particular
         survey. Results are stored internally under `filters`.
@@ -462,6 +1134,18 @@ class MockSurvey(object):
             The number of points used to interpolate the filter transmission
             curves when computing the effective wavelength. Default is `5e4`.
 
+        cache : bool, optional
+            Whether to store the parsed filters (and effective wavelengths)
+            in a binary cache that is used in place of re-parsing the
+            filters on subsequent calls. Entries are keyed on the contents
+            of the filter files, so they are invalidated whenever the files
+            change. Default is `True`.
+
+        cache_dir : str, optional
+            The directory where cached filters are stored. Default is the
+            `FRANKENZ_CACHE` environment variable or, if not set,
+            `~/.cache/frankenz`.
+
         """
 
         # Get filter list.
@@ -487,6 +1171,23 @@ class MockSurvey(object):
 
         self.NFILTER = len(self.filters)  # number of filters
 
+        # Check for cached filters.
+        if cache:
+            if cache_dir is None:
+                cache_dir = priors._CACHE_DIR
+            key = _cache_key('filters', [path + fpath
+                                         for fpath in filter_paths],
+                             int(Npoints))
+            cached = _load_cache(key, cache_dir)
+            if cached is not None:
+                for i, fltr in enumerate(self.filters):
+                    fltr['wavelength'] = cached['wavelength_{0}'.format(i)]
+                    fltr['transmission'] = cached['transmission_{0}'
+                                                  .format(i)]
+                    fltr['frequency'] = c / (1e-10 * fltr['wavelength'])
+                    fltr['lambda_eff'] = float(cached['lambda_eff'][i])
+                return
+
         # Extract filters.
         for fpath, fltr in zip(filter_paths, self.filters):
             wavelength, transmission = np.loadtxt(path + fpath).T
@@ -498,17 +1199,26 @@ class MockSurvey(object):
         for fltr in self.filters:
             nuMax = 0.999 * c / (min(fltr['wavelength']) * 1e-10)  # max nu
             nuMin = 1.001 * c / (max(fltr['wavelength']) * 1e-10)  # min nu
-            nu = np.linspace(nuMin, nuMax, Npoints)  # frequency array
+            nu = np.linspace(nuMin, nuMax, int(Npoints))  # frequency array
             lnu = np.log(nu)  # ln(frequency)
             wave = c / nu  # convert to wavelength
             lwave = np.log(wave)  # ln(wavelength)
             trans = np.interp(1e10 * wave, fltr['wavelength'],
                               fltr['transmission'])  # interp transmission
-            lambda_eff = np.exp(np.trapz(trans * lwave, lnu) /
-                                np.trapz(trans, lnu)) * 1e10  # integrate
+            lambda_eff = np.exp(priors._trapz(trans * lwave, lnu) /
+                                priors._trapz(trans, lnu)) * 1e10
             fltr['lambda_eff'] = lambda_eff
 
-    def load_templates(self, template_list, path='', wnorm=7000.):
+        # Save filters to the cache.
+        if cache:
+            arrays = {'lambda_eff': [f['lambda_eff'] for f in self.filters]}
+            for i, fltr in enumerate(self.filters):
+                arrays['wavelength_{0}'.format(i)] = fltr['wavelength']
+                arrays['transmission_{0}'.format(i)] = fltr['transmission']
+            _save_cache(key, cache_dir, **arrays)
+
+    def load_templates(self, template_list, path='', wnorm=7000.,
+                       cache=True, cache_dir=None):
         """
         Load an input template list. Results are stored internally under
         `templates`.
@@ -529,6 +1239,17 @@ class MockSurvey(object):
             The "pivot wavelength" [A] where templates will be normalized.
             Default is `7000.`.
 
+        cache : bool, optional
+            Whether to store the parsed templates in a binary cache that is
+            used in place of re-parsing the templates on subsequent calls.
+            Entries are keyed on the contents of the template files, so they
+            are invalidated whenever the files change. Default is `True`.
+
+        cache_dir : str, optional
+            The directory where cached templates are stored. Default is the
+            `FRANKENZ_CACHE` environment variable or, if not set,
+            `~/.cache/frankenz`.
+
         """
 
         # Get template list.
@@ -564,13 +1285,32 @@ class MockSurvey(object):
                                for t in self.templates], dtype='int').flatten()
 
         # Extract templates.
-        for fpath, tmp in zip(template_paths, self.templates):
-            wavelength, flambda = np.loadtxt(path + fpath).T
+        cached = None
+        if cache:
+            if cache_dir is None:
+                cache_dir = priors._CACHE_DIR
+            key = _cache_key('templates', [path + fpath
+                                           for fpath in template_paths])
+            cached = _load_cache(key, cache_dir)
+        for i, (fpath, tmp) in enumerate(zip(template_paths, self.templates)):
+            if cached is not None:
+                wavelength = cached['wavelength_{0}'.format(i)]
+                flambda = cached['flambda_{0}'.format(i)].copy()
+            else:
+                wavelength, flambda = np.loadtxt(path + fpath).T
             tmp['wavelength'] = wavelength
             tmp['frequency'] = c / (1e-10 * wavelength)
             tmp['flambda'] = flambda
             tmp['fnu'] = (wavelength * 1e-10)**2 / c * (flambda * 1e10)
 
+        # Save templates to the cache.
+        if cache and cached is None:
+            arrays = {}
+            for i, tmp in enumerate(self.templates):
+                arrays['wavelength_{0}'.format(i)] = tmp['wavelength']
+                arrays['flambda_{0}'.format(i)] = tmp['flambda']
+            _save_cache(key, cache_dir, **arrays)
+
         # Normalize flux densities at the pivot wavelength.
         for tmp in self.templates:
             tmp['flambda'] /= np.interp(wnorm, tmp['wavelength'],
@@ -629,7 +1369,7 @@ class MockSurvey(object):
 
     def sample_params(self, Nobj, rstate=None, mbounds=None, zbounds=(0, 15),
                       Nm=1000, Nz=1000, pm_kwargs=None, ptm_kwargs=None,
-                      pztm_kwargs=None, verbose=True):
+                      pztm_kwargs=None, exact=False, verbose=True):
         """
         Draw `Nobj` samples from the joint P(z, t, m) prior. Results are
         stored internally under `data`.
@@ -671,6 +1411,13 @@ class MockSurvey(object):
         pztm_kwargs : dict, optional
             Additional keyword arguments to be passed to :meth:`p_ztm`.
 
+        exact : bool, optional
+            Whether to evaluate P(type | mag) and P(z | type, mag) at the
+            magnitude of each object individually. If `False` (default),
+            these are tabulated over a grid of `Nm` magnitudes and all
+            objects are drawn at once (see :meth:`draw_types_given_mags`
+            and :meth:`draw_redshifts_given_types_mags`).
+
         verbose : bool, optional
             Whether to print progress to `~sys.stderr`. Default is `True`.
 
@@ -707,14 +1454,23 @@ class MockSurvey(object):
             sys.stderr.write('\n')
             sys.stderr.flush()
         types = np.zeros(Nobj, dtype='int')
-        generator = draw_type_given_mag  # alias for generator
-        for i, t in enumerate(generator(self.ptm, mags, self.NTYPE,
-                                        ptm_kwargs=ptm_kwargs,
-                                        rstate=rstate)):
-            types[i] = t  # assign type draw
+        if exact:
+            generator = draw_type_given_mag  # alias for generator
+            for i, t in enumerate(generator(self.ptm, mags, self.NTYPE,
+                                            ptm_kwargs=ptm_kwargs,
+                                            rstate=rstate)):
+                types[i] = t  # assign type draw
+                if verbose:
+                    sys.stderr.write('\rSampling types: {0}/{1}'
+                                     .format(i+1, Nobj))
+                    sys.stderr.flush()
+        else:
+            types = draw_types_given_mags(self.ptm, mags, self.NTYPE,
+                                          ptm_kwargs=ptm_kwargs,
+                                          rstate=rstate, Nm=Nm)
             if verbose:
                 sys.stderr.write('\rSampling types: {0}/{1}'
-                                 .format(i+1, Nobj))
+                                 .format(Nobj, Nobj))
                 sys.stderr.flush()
 
         # Re-label templates by type and construct probability vectors.
@@ -741,15 +1497,25 @@ class MockSurvey(object):
             sys.stderr.write('\n')
             sys.stderr.flush()
         redshifts = np.zeros(Nobj, dtype='float')
-        generator = draw_redshift_given_type_mag
-        for i, z in enumerate(generator(self.pztm, types, mags,
-                                        pztm_kwargs=pztm_kwargs,
-                                        zbounds=zbounds, Npoints=Nz,
-                                        rstate=rstate)):
-            redshifts[i] = z  # assign redshift draw
+        if exact:
+            generator = draw_redshift_given_type_mag
+            for i, z in enumerate(generator(self.pztm, types, mags,
+                                            pztm_kwargs=pztm_kwargs,
+                                            zbounds=zbounds, Npoints=Nz,
+                                            rstate=rstate)):
+                redshifts[i] = z  # assign redshift draw
+                if verbose:
+                    sys.stderr.write('\rSampling redshifts: {0}/{1}'
+                                     .format(i+1, Nobj))
+                    sys.stderr.flush()
+        else:
+            generator = draw_redshifts_given_types_mags
+            redshifts = generator(self.pztm, types, mags, self.NTYPE,
+                                  pztm_kwargs=pztm_kwargs, zbounds=zbounds,
+                                  Npoints=Nz, Nm=Nm, rstate=rstate)
             if verbose:
                 sys.stderr.write('\rSampling redshifts: {0}/{1}'
-                                 .format(i+1, Nobj))
+                                 .format(Nobj, Nobj))
                 sys.stderr.flush()
         if verbose:
             sys.stderr.write('\n')
@@ -761,7 +1527,8 @@ class MockSurvey(object):
         self.NOBJ = Nobj
 
     def sample_phot(self, red_fn='madau+99', rnoise_fn=None, rstate=None,
-                    verbose=True):
+                    exact=False, zgrid=None, Nzgrid=2000, ncheck=100,
+                    tol=None, noise_model=None, verbose=True):
         """
         Generate noisy photometry from `(t, z, m)` samples. **Note that this
         ignores Poisson noise**. Results are added internally to `data`.
@@ -784,6 +1551,43 @@ class MockSurvey(object):
              random state used to initialize the `MockSurvey` object will be
              used.
 
+        exact : bool, optional
+            Whether to integrate the photometry of each object exactly at its
+            redshift. If `False` (default), the photometry of each template
+            is precomputed over a grid of redshifts (see
+            :meth:`make_phot_table`) and linearly interpolated to the
+            redshift of each object.
+
+        zgrid : iterable of shape (N,), optional
+            The redshift grid used to precompute photometry when
+            `exact=False`. If not provided, `Nzgrid` redshifts evenly spaced
+            in `ln(1 + z)` that span the sampled redshifts will be used.
+
+        Nzgrid : int, optional
+            The number of redshifts in the default `zgrid`. Default is `2000`.
+
+        ncheck : int, optional
+            The number of objects whose interpolated photometry is checked
+            against the exact integral when `exact=False`. The maximum
+            difference (relative to the flux in the reference filter) is
+            stored internally under `data['phot_interp_err']`.
+            Default is `100`.
+
+        tol : float, optional
+            If provided, a warning is raised if the interpolated photometry
+            of any of the `ncheck` objects differs from the exact result by
+            more than `tol` (relative to the flux in the reference filter).
+            Note that templates are resampled onto a finite grid in
+            ln(wavelength) (see `_template_grid`), so templates with narrow
+            features can lead to exact photometry that is not perfectly
+            smooth in redshift.
+
+        noise_model : :class:`NoiseModel`, optional
+            The model used to sample errors and jitter the photometry. If
+            not provided, a :class:`NoiseModel` using the survey depths will
+            be used. If the model includes a `depth_map`, the region each
+            object falls in is stored internally under `data['pix']`.
+
         verbose : bool, optional
             Whether to print progress to `~sys.stderr`. Default is `True`.
 
@@ -807,38 +1611,53 @@ class MockSurvey(object):
         except:
             pass
 
-        # Initialize useful quantities.
-        tlw = [np.log(t['wavelength']) for t in self.templates]  # ln(tmp wave)
-        flw = [np.log(f['wavelength']) for f in self.filters]  # ln(flt wave)
-        filt_nu = [f['frequency'] for f in self.filters]  # filt nu
-        filt_t = [f['transmission'] for f in self.filters]  # filt nu
-        norm = [np.trapz(ft / fn, fn)
-                for ft, fn in zip(filt_t, filt_nu)]  # filter normalization
-        tfnu = [t['fnu'] for t in self.templates]
-
         # Compute unnormalized photometry.
-
-        phot = np.zeros((self.NOBJ, self.NFILTER))  # photometry array
-        for i, (t, z) in enumerate(zip(templates, redshifts)):
-            # Compute reddening.
-            if red_fn is not None:
-                igm_teff = [red_fn(np.exp(f_lw), z) for f_lw in flw]
-            else:
-                igm_teff = [np.ones_like(f_lw) for f_lw in flw]
-
-            # Integrate the flux over the filter. Interpolation is performed
-            # using the arcsinh transform for improved numerical stability.
-            phot[i] = [np.trapz(np.sinh(np.interp(f_lw, tlw[t] + np.log(1 + z),
-                                                  np.arcsinh(tfnu[t]))) *
-                                f_t / f_nu * te, f_nu) / f_n
-                       for f_t, f_nu, f_lw, f_n, te in zip(filt_t, filt_nu,
-                                                           flw, norm,
-                                                           igm_teff)]
+        if exact:
+            phot = np.zeros((self.NOBJ, self.NFILTER))  # photometry array
+            for i, (t, z) in enumerate(zip(templates, redshifts)):
+                phot[i] = _model_phot([self.templates[t]], self.filters, [z],
+                                      red_fn=red_fn)[0, 0]
+                if verbose:
+                    sys.stderr.write('\rGenerating photometry: {0}/{1}'
+                                     .format(i+1, self.NOBJ))
+                    sys.stderr.flush()
+        else:
+            if zgrid is None:
+                zmax = max(np.max(redshifts[np.isfinite(redshifts)]), 0.)
+                zgrid = np.expm1(np.linspace(0., np.log1p(zmax), Nzgrid))
+            self.make_phot_table(zgrid, red_fn=red_fn, verbose=verbose)
+            if verbose:
+                sys.stderr.write('\nGenerating photometry: ')
+                sys.stderr.flush()
+            phot = self._interp_phot(templates, redshifts)
             if verbose:
-                sys.stderr.write('\rGenerating photometry: {0}/{1}'
-                                 .format(i+1, self.NOBJ))
+                sys.stderr.write('{0}/{1}'.format(self.NOBJ, self.NOBJ))
                 sys.stderr.flush()
 
+            # Check interpolated photometry against the exact integral.
+            if ncheck > 0:
+                idxs = np.unique(np.linspace(0, self.NOBJ - 1,
+                                             ncheck).astype('int'))
+                phot_exact = np.array([_model_phot([self.templates[t]],
+                                                   self.filters, [z],
+                                                   red_fn=red_fn)[0, 0]
+                                       for t, z in zip(templates[idxs],
+                                                       redshifts[idxs])])
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    err = np.abs(phot[idxs] - phot_exact)
+                    err /= np.abs(phot_exact[:, self.ref_filter])[:, None]
+                err = err[np.isfinite(err)]
+                max_err = np.max(err) if len(err) > 0 else 0.
+                if tol is not None and max_err > tol:
+                    warnings.warn("The interpolated photometry differs "
+                                  "from the exact photometry by up to {0} "
+                                  "(relative to the reference flux), which "
+                                  "exceeds `tol={1}`. Consider using a "
+                                  "denser `zgrid` or `exact=True`."
+                                  .format(max_err, tol))
+            else:
+                max_err = np.nan
+
         # Normalize photometry to reference magnitude.
         with warnings.catch_warnings():
             warnings.simplefilter('ignore')
@@ -855,8 +1674,10 @@ class MockSurvey(object):
         if verbose:
             sys.stderr.write('\nSampling errors: ')
             sys.stderr.flush()
-        fnoise = np.array([np.ones(self.NOBJ) * f['depth_flux1sig']
-                           for f in self.filters]).T
+        if noise_model is None:
+            noise_model = NoiseModel([f['depth_flux1sig']
+                                      for f in self.filters])
+        fnoise, pix = noise_model.sample_errors(self.NOBJ, rstate=rstate)
         if rnoise_fn is not None:
             fnoise = rnoise_fn(fnoise, rstate=rstate)  # add noise variability
         if verbose:
@@ -867,7 +1688,7 @@ class MockSurvey(object):
         if verbose:
             sys.stderr.write('\nSampling photometry: ')
             sys.stderr.flush()
-        phot_obs = rstate.normal(phot, fnoise)
+        phot_obs = noise_model.jitter(phot, fnoise, rstate=rstate)
         if verbose:
             sys.stderr.write('{0}/{1}\n'.format(self.NOBJ, self.NOBJ))
             sys.stderr.flush()
@@ -876,11 +1697,125 @@ class MockSurvey(object):
         self.data['phot_true'] = phot
         self.data['phot_obs'] = phot_obs
         self.data['phot_err'] = fnoise
+        if pix is not None:
+            self.data['pix'] = pix
+        if not exact:
+            self.data['phot_interp_err'] = max_err
+
+    def _make_phot_grid(self, redshifts, red_fn=None, pool=None,
+                        chunksize=100, verbose=True, label='photometry'):
+        """
+        Internal method used to compute photometry for the input set of
+        templates over the input `redshifts` in chunks of `chunksize`
+        redshifts, optionally in parallel using `pool`.
+
+        """
+
+        Nz = len(redshifts)
+        if pool is None:
+            M = map
+        else:
+            M = pool.map
+
+        # Resample the templates once. Each chunk is only passed the
+        # portion of the template grid probed over its redshifts (rather
+        # than the templates themselves) to limit what is sent to `pool`.
+        n0, tgrid = _template_grid(self.templates, self.filters, redshifts)
+        argset = []
+        for i in range(0, Nz, chunksize):
+            zchunk = redshifts[i:i+chunksize]
+            c0, c1 = _grid_bounds(self.filters, zchunk)
+            argset.append((self.filters, zchunk, red_fn,
+                           (c0, tgrid[c0-n0:c1-n0+1])))
+
+        # Compute photometry.
+        phot = np.zeros((Nz, self.NTEMPLATE, self.NFILTER))
+        for i, res in enumerate(M(_model_phot_chunk, argset)):
+            phot[i*chunksize:i*chunksize+len(res)] = res
+            if verbose:
+                sys.stderr.write('\rGenerating {0}: {1}/{2}'
+                                 .format(label, i*chunksize + len(res), Nz))
+                sys.stderr.flush()
+
+        return phot
+
+    def make_phot_table(self, zgrid, red_fn='madau+99', pool=None,
+                        chunksize=100, verbose=True):
+        """
+        Precompute photometry for the input set of templates over the input
+        `zgrid` redshift grid, which is used to generate mock photometry
+        via interpolation (see :meth:`sample_phot`). Results are stored
+        internally under `phot_table` as a dictionary containing the
+        `(Nz, Nt, Nf)` `~numpy.ndarray` (`'data'`), the redshift grid
+        (`'zgrid'`), and the reddening function (`'red_fn'`). The table is
+        only recomputed if these have changed.
+
+        Parameters
+        ----------
+        zgrid : iterable of shape (N,)
+            Input redshift grid. Must be sorted in ascending order.
+
+        red_fn : function, optional
+            A function that adds in reddening from the intergalactic medium
+            (IGM). Default is `'madau+99'`, which uses the parametric form
+            from Madau et al. (1999). If `None` is passed, no reddening will
+            be applied.
+
+        pool : user-provided pool, optional
+            Use this pool of workers to compute the photometry over chunks
+            of `chunksize` redshifts in parallel. Must provide a `map`
+            function. If not provided, chunks are computed serially.
+
+        chunksize : int, optional
+            The number of redshifts computed at once. Default is `100`.
+
+        verbose : bool, optional
+            Whether to print progress to `~sys.stderr`. Default is `True`.
+
+        """
+
+        # Extract reddening function.
+        try:
+            red_fn = _IGM[red_fn]
+        except:
+            pass
+
+        # Check whether we can re-use the current table.
+        zgrid = np.array(zgrid, dtype='float')
+        table = getattr(self, 'phot_table', None)
+        if (table is not None and table['red_fn'] is red_fn and
+           np.array_equal(table['zgrid'], zgrid)):
+            return
+
+        # Compute photometry.
+        phot = self._make_phot_grid(zgrid, red_fn=red_fn, pool=pool,
+                                    chunksize=chunksize, verbose=verbose,
+                                    label='photometry table')
+
+        self.phot_table = {'data': phot, 'zgrid': zgrid, 'red_fn': red_fn}
+
+    def _interp_phot(self, templates, redshifts):
+        """
+        Internal method used to linearly interpolate the photometry stored in
+        `phot_table` to the input `templates` and `redshifts`.
+
+        """
+
+        zgrid, phot = self.phot_table['zgrid'], self.phot_table['data']
+        idx = np.clip(np.searchsorted(zgrid, redshifts) - 1, 0,
+                      max(len(zgrid) - 2, 0))
+        if len(zgrid) > 1:
+            w = (redshifts - zgrid[idx]) / (zgrid[idx + 1] - zgrid[idx])
+            w = np.clip(w, 0., 1.)[:, None]
+            return ((1. - w) * phot[idx, templates] +
+                    w * phot[idx + 1, templates])
+        else:
+            return phot[idx, templates]
 
     def make_mock(self, Nobj, mbounds=None, zbounds=(0, 15),
                   Nm=1000, Nz=1000, pm_kwargs=None, ptm_kwargs=None,
                   pztm_kwargs=None, red_fn='madau+99', rnoise_fn=None,
-                  rstate=None, verbose=True):
+                  rstate=None, exact=False, noise_model=None, verbose=True):
         """
 
         Generate (noisy) photometry for `Nobj` objects sampled from the
@@ -936,6 +1871,15 @@ class MockSurvey(object):
              random state used to initialize the `MockSurvey` object will be
              used.
 
+        exact : bool, optional
+            Whether to integrate the photometry of each object exactly at its
+            redshift rather than interpolating over a precomputed grid (see
+            :meth:`sample_phot`). Default is `False`.
+
+        noise_model : :class:`NoiseModel`, optional
+            The model used to sample errors and jitter the photometry (see
+            :meth:`sample_phot`).
+
         verbose : bool, optional
             Whether to print progress to `~sys.stderr`. Default is `True`.
 
@@ -949,9 +1893,172 @@ class MockSurvey(object):
 
         # Sample photometry.
         self.sample_phot(red_fn=red_fn, rnoise_fn=rnoise_fn,
-                         rstate=rstate, verbose=verbose)
+                         rstate=rstate, exact=exact, noise_model=noise_model,
+                         verbose=verbose)
+
+    def make_mock_chunks(self, Nobj, chunksize=100000, seed=None,
+                         fname=None, chunks=None, mbounds=None,
+                         zbounds=(0, 15), Nm=1000, Nz=1000, pm_kwargs=None,
+                         ptm_kwargs=None, pztm_kwargs=None,
+                         red_fn='madau+99', rnoise_fn=None, exact=False,
+                         zgrid=None, Nzgrid=2000, noise_model=None,
+                         pool=None, verbose=True):
+        """
+        Generate (noisy) photometry for `Nobj` objects sampled from the
+        prior in chunks of `chunksize` objects (see :meth:`make_mock`).
+        Each chunk is generated using its own random state derived from
+        `seed` and the chunk index (via `~numpy.random.SeedSequence`), so
+        chunks can be generated independently (e.g., on different machines)
+        and in any order with identical results. Returns a generator.
+
+        Parameters
+        ----------
+        Nobj : int
+            The total number of objects to be simulated.
+
+        chunksize : int, optional
+            The number of objects in each chunk. Default is `100000`.
+
+        seed : int, optional
+            The seed from which the random state of each chunk is derived.
+            If not provided, a seed will be generated from fresh entropy.
+            The seed used is stored internally under `mock_seed`.
+
+        fname : str, optional
+            If provided, each chunk will be written to disk as an `.npz` file
+            with one array per column (see `data`) using
+            `fname.format(chunk_index)` (e.g., `'mock_{0:05d}.npz'`). The
+            filenames are returned in place of the catalogs.
+
+        chunks : iterable of int, optional
+            The indices of the chunks to generate. If not provided, all
+            `ceil(Nobj / chunksize)` chunks will be generated in order.
+
+        mbounds : tuple of length 2, optional
+            The minimum/maximum magnitude allowed. Default is `(10,
+            maglim + 2.5 * np.log10(5))` where `maglim` is the 5-sigma limiting
+            magnitude in the reference filter.
+
+        zbounds : tuple of length 2, optional
+            The minimum/maximum redshift allowed. Default is `(0, 15)`.
+
+        Nm : int, optional
+            The number of points used when interpolating the inverse cumulative
+            distribution function (CDF) to sample magnitudes.
+            Default is `1000`.
+
+        Nz : int, optional
+            The number of points used when interpolating the inverse cumulative
+            distribution function (CDF) to sample redshifts.
+            Default is `1000`.
+
+        pm_kwargs : dict, optional
+            Additional keyword arguments to be passed to :meth:`pmag`.
+
+        ptm_kwargs : dict, optional
+            Additional keyword arguments to be passed to :meth:`p_tm`.
+
+        pztm_kwargs : dict, optional
+            Additional keyword arguments to be passed to :meth:`p_ztm`.
+
+        red_fn : function, optional
+            A function that adds in reddening from the intergalactic medium
+            (IGM). Default is `'madau+99'`, which uses the parametric form
+            from Madau et al. (1999). If `None` is passed, no reddening will
+            be applied.
+
+        rnoise_fn : function, optional
+            A function that takes the average noise (computed from the
+            provided survey depths) and jitters them to mimic spatial
+            background variation.
+
+        exact : bool, optional
+            Whether to draw parameters and integrate photometry for each
+            object individually (see :meth:`sample_params` and
+            :meth:`sample_phot`). Default is `False`.
+
+        zgrid : iterable of shape (N,), optional
+            The redshift grid used to precompute photometry when
+            `exact=False`, which is shared by all chunks. If not provided,
+            `Nzgrid` redshifts evenly spaced in `ln(1 + z)` that span
+            `zbounds` will be used.
+
+        Nzgrid : int, optional
+            The number of redshifts in the default `zgrid`. Default is `2000`.
+
+        noise_model : :class:`NoiseModel`, optional
+            The model used to sample errors and jitter the photometry of
+            each chunk (see :meth:`sample_phot`).
+
+        pool : user-provided pool, optional
+            Use this pool of workers to generate chunks in parallel. Must
+            provide a `map` function. If not provided, chunks will be
+            generated serially.
+
+        verbose : bool, optional
+            Whether to print progress to `~sys.stderr`. Default is `True`.
+
+        Returns
+        -------
+        i : int
+            The index of the chunk.
+
+        data : dict or str
+            The mock catalog for the chunk (see `data`) or, if `fname` was
+            provided, the name of the file it was written to.
+
+        """
+
+        # Initialize values.
+        if seed is None:
+            seed = np.random.SeedSequence().entropy
+        self.mock_seed = seed
+        Nchunks = int(math.ceil(Nobj / chunksize))
+        if chunks is None:
+            chunks = range(Nchunks)
+        chunks = list(chunks)
+        if any(i < 0 or i >= Nchunks for i in chunks):
+            raise ValueError("Chunk indices must be between 0 and {0}."
+                             .format(Nchunks - 1))
+        if pool is None:
+            M = map
+        else:
+            M = pool.map
+
+        # Precompute photometry over a shared redshift grid.
+        if not exact:
+            if zgrid is None:
+                zgrid = np.expm1(np.linspace(0., np.log1p(zbounds[1]),
+                                             Nzgrid))
+            self.make_phot_table(zgrid, red_fn=red_fn, verbose=False)
+
+        # Pass a shallow copy of the survey to each chunk.
+        survey = copy.copy(self)
+        survey.rstate, survey.data = None, None
+        params_kwargs = {'mbounds': mbounds, 'zbounds': zbounds, 'Nm': Nm,
+                         'Nz': Nz, 'pm_kwargs': pm_kwargs,
+                         'ptm_kwargs': ptm_kwargs,
+                         'pztm_kwargs': pztm_kwargs, 'exact': exact}
+        phot_kwargs = {'red_fn': red_fn, 'rnoise_fn': rnoise_fn,
+                       'exact': exact, 'zgrid': zgrid, 'ncheck': 0,
+                       'noise_model': noise_model}
+        argset = [(survey, i, min(chunksize, Nobj - i * chunksize), seed,
+                   fname, params_kwargs, phot_kwargs) for i in chunks]
+
+        # Generate chunks.
+        for n, (args, res) in enumerate(zip(argset,
+                                            M(_make_mock_chunk, argset))):
+            if verbose:
+                sys.stderr.write('\rGenerating mock chunks: {0}/{1}'
+                                 .format(n+1, len(argset)))
+                sys.stderr.flush()
+            yield args[1], res
+        if verbose:
+            sys.stderr.write('\n')
+            sys.stderr.flush()
 
-    def make_model_grid(self, redshifts, red_fn='madau+99', verbose=True):
+    def make_model_grid(self, redshifts, red_fn='madau+99', pool=None,
+                        chunksize=100, verbose=True):
         """
         Generate photometry for input set of templates over the input
         `redshifts` grid. Results are stored internally under `models` as an
@@ -969,53 +2076,102 @@ class MockSurvey(object):
             from Madau et al. (1999). If `None` is passed, no reddening will
             be applied.
 
+        pool : user-provided pool, optional
+            Use this pool of workers to compute the photometry over chunks
+            of `chunksize` redshifts in parallel. Must provide a `map`
+            function. If not provided, chunks are computed serially.
+
+        chunksize : int, optional
+            The number of redshifts computed at once. Default is `100`.
+
         verbose : bool, optional
             Whether to print progress to `~sys.stderr`. Default is `True`.
 
         """
 
-        Nz = len(redshifts)
-
         # Extract reddening function.
         try:
             red_fn = _IGM[red_fn]
         except:
             pass
 
-        # Initialize useful quantities.
-        tlw = [np.log(t['wavelength']) for t in self.templates]  # ln(tmp wave)
-        flw = [np.log(f['wavelength']) for f in self.filters]  # ln(flt wave)
-        filt_nu = [f['frequency'] for f in self.filters]  # filt nu
-        filt_t = [f['transmission'] for f in self.filters]  # filt nu
-        norm = [np.trapz(ft / fn, fn)
-                for ft, fn in zip(filt_t, filt_nu)]  # filter normalization
-        tfnu = [t['fnu'] for t in self.templates]
-
         # Compute unnormalized photometry.
-        phot = np.zeros((Nz, self.NTEMPLATE, self.NFILTER))
-        for i, z in enumerate(redshifts):
-            for j in range(self.NTEMPLATE):
-                # Compute reddening.
-                if red_fn is not None:
-                    igm_teff = [red_fn(np.exp(f_lw), z) for f_lw in flw]
-                else:
-                    igm_teff = [np.ones_like(f_lw) for f_lw in flw]
-
-                # Integrate the flux over the filter. Interpolation is done
-                # using the arcsinh transform for improved numerical stability.
-                phot[i, j] = [np.trapz(f_t / f_nu * te *
-                                       np.sinh(np.interp(f_lw, tlw[j] +
-                                                         np.log(1 + z),
-                                                         np.arcsinh(tfnu[j]))),
-                                       f_nu) / f_n
-                              for f_t, f_nu, f_lw, f_n, te in zip(filt_t,
-                                                                  filt_nu,
-                                                                  flw, norm,
-                                                                  igm_teff)]
-            if verbose:
-                sys.stderr.write('\rGenerating model photometry grid: {0}/{1}'
-                                 .format(i+1, len(redshifts)))
-                sys.stderr.flush()
+        phot = self._make_phot_grid(np.asarray(redshifts, dtype='float'),
+                                    red_fn=red_fn, pool=pool,
+                                    chunksize=chunksize, verbose=verbose,
+                                    label='model photometry grid')
 
         # Save results.
         self.models = {'data': phot, 'zgrid': redshifts}
+
+    def make_model_interp(self, znodes=None, zbounds=(0., 6.), Nnodes=100,
+                          kind='pchip', red_fn='madau+99', pool=None,
+                          chunksize=100, verbose=True):
+        """
+        Generate photometry for the input set of templates over a coarse
+        set of redshift nodes and construct smooth interpolants in
+        `ln(1 + z)` that can be used to generate models at arbitrary
+        redshifts (see :class:`ModelGrid`). Results are stored internally
+        under `model_grid`.
+
+        Parameters
+        ----------
+        znodes : iterable of shape (Nnode,), optional
+            Redshift nodes. If not provided, `Nnodes` redshifts evenly spaced
+            in `ln(1 + z)` spanning `zbounds` will be used.
+
+        zbounds : tuple of length 2, optional
+            The minimum/maximum redshift of the default nodes.
+            Default is `(0, 6)`.
+
+        Nnodes : int, optional
+            The number of default nodes. Default is `100`.
+
+        kind : {`'pchip'`, `'cubic'`, `'linear'`}, optional
+            The interpolant used (see :class:`ModelGrid`).
+            Default is `'pchip'`.
+
+        red_fn : function, optional
+            A function that adds in reddening from the intergalactic medium
+            (IGM). Default is `'madau+99'`, which uses the parametric form
+            from Madau et al. (1999). If `None` is passed, no reddening will
+            be applied.
+
+        pool : user-provided pool, optional
+            Use this pool of workers to compute the photometry over chunks
+            of `chunksize` redshifts in parallel. Must provide a `map`
+            function. If not provided, chunks are computed serially.
+
+        chunksize : int, optional
+            The number of redshifts computed at once. Default is `100`.
+
+        verbose : bool, optional
+            Whether to print progress to `~sys.stderr`. Default is `True`.
+
+        Returns
+        -------
+        model_grid : :class:`ModelGrid`
+            The interpolated model grid.
+
+        """
+
+        # Extract reddening function.
+        try:
+            red_fn = _IGM[red_fn]
+        except:
+            pass
+
+        # Compute unnormalized photometry at the nodes.
+        if znodes is None:
+            znodes = np.expm1(np.linspace(np.log1p(zbounds[0]),
+                                          np.log1p(zbounds[1]), Nnodes))
+            znodes[0], znodes[-1] = zbounds  # avoid round-off at the ends
+        znodes = np.asarray(znodes, dtype='float')
+        phot = self._make_phot_grid(znodes, red_fn=red_fn, pool=pool,
+                                    chunksize=chunksize, verbose=verbose,
+                                    label='model photometry nodes')
+
+        # Save results.
+        self.model_grid = ModelGrid(znodes, phot, kind=kind)
+
+        return self.model_grid
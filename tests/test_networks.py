@@ -0,0 +1,61 @@
+import numpy as np
+from frankenz import networks
+
+
+def _make_models(Nmodel=300, Nfilt=4, seed=0):
+    rstate = np.random.RandomState(seed)
+    models = 1. + rstate.rand(Nmodel, Nfilt)
+
+    return models, 0.05 * models, np.ones_like(models, dtype='bool')
+
+
+def _assert_same(a, b):
+    # Recursively compare (nested) attributes and training metrics.
+    if isinstance(a, dict):
+        assert set(a) == set(b)
+        for k in a:
+            _assert_same(a[k], b[k])
+    elif isinstance(a, (list, tuple)):
+        assert len(a) == len(b)
+        for x, y in zip(a, b):
+            _assert_same(x, y)
+    elif isinstance(a, np.ndarray) or isinstance(b, np.ndarray):
+        assert np.array_equal(np.asarray(a), np.asarray(b))
+    else:
+        assert a == b
+
+
+def _check_round_trip(net, path, attrs):
+    net.save_network(str(path))
+    new = networks.load_network(str(path))
+
+    assert type(new) is type(net)
+    assert new.train_metrics is not None
+    _assert_same(net.train_metrics, new.train_metrics)
+    for attr in attrs:
+        _assert_same(getattr(net, attr), getattr(new, attr))
+
+    # Networks loaded without models can be re-populated from them.
+    net.save_network(str(path.join('nomodels')), save_models=False)
+    new = networks.load_network(str(path.join('nomodels')), net.models,
+                                net.models_err, net.models_mask)
+    _assert_same(net.nodes, new.nodes)
+    _assert_same(net.train_metrics, new.train_metrics)
+
+
+def test_som_round_trip(tmpdir):
+    som = networks.SelfOrganizingMap(*_make_models())
+    som.train_network(nside=4, niter=40, nbatch=20,
+                      rstate=np.random.RandomState(1), verbose=False)
+    som.populate_network(verbose=False)
+    _check_round_trip(som, tmpdir, ['nodes', 'nodes_pos', 'nodes_idxs',
+                                    'nodes_logwts', 'nodes_bmus', 'models'])
+
+
+def test_hierarchical_som_round_trip(tmpdir):
+    hsom = networks.HierarchicalSOM(*_make_models())
+    hsom.train_network(nside=2, nside_fine=2, niter=20, nbatch=20,
+                       rstate=np.random.RandomState(2), verbose=False)
+    hsom.populate_network(verbose=False)
+    _check_round_trip(hsom, tmpdir, ['nodes', 'nodes_idxs',
+                                     'nodes_logwts'])
@@ -0,0 +1,53 @@
+import numpy as np
+from frankenz import samplers
+
+
+def _make_pdfs(Nobs=400, Nbins=10, seed=0):
+    # Gaussian PDFs around noisy redshifts drawn from a skewed population,
+    # which leaves the high-redshift bins nearly empty.
+    rstate = np.random.RandomState(seed)
+    ztrue = np.clip(rstate.gamma(2., 1.5, Nobs), 0, Nbins - 1)
+    zobs = ztrue + 0.5 * rstate.randn(Nobs)
+    zgrid = np.arange(Nbins)
+    pdfs = np.exp(-0.5 * ((zgrid - zobs[:, None]) / 0.8)**2)
+
+    return pdfs / pdfs.sum(axis=1)[:, None]
+
+
+def test_blocked_matches_gibbs():
+    # The blocked population sampler (flat prior) and the hierarchical
+    # Gibbs sampler (flat Dirichlet hyper-prior) target the same n(z).
+    pdfs = _make_pdfs()
+    gibbs = samplers.hierarchical_sampler(pdfs)
+    gibbs.run_mcmc(3000, thin=2, rstate=np.random.RandomState(1),
+                   verbose=False)
+    x_gibbs = gibbs.results[0][200:]
+    blocked = samplers.population_sampler(pdfs)
+    blocked.run_mcmc(3000, thin=5, blocked=True,
+                     rstate=np.random.RandomState(2), verbose=False)
+    x_blocked = blocked.results[0]
+
+    # Samples drawn while tuning the proposal are discarded.
+    assert len(x_blocked) == 3000 - blocked.nwarmup
+    assert 0.1 < blocked.acceptance_fraction < 0.5
+
+    std = x_gibbs.std(axis=0)
+    assert np.all(np.abs(x_blocked.mean(axis=0) -
+                         x_gibbs.mean(axis=0)) < 0.5 * std)
+    assert np.all(np.abs(np.log(x_blocked.std(axis=0) / std)) < 0.3)
+
+
+def test_blocked_leaves_boundary():
+    # Starting from exact zeros (e.g., a MAP estimate), reflected moves
+    # should still be able to move probability into the empty bins.
+    pdfs = _make_pdfs()
+    pos = np.zeros(pdfs.shape[1])
+    pos[[1, 2, 4]] = 1. / 3.
+    sampler = samplers.population_sampler(pdfs)
+    sampler.run_mcmc(200, thin=5, blocked=True, pos_init=pos,
+                     rstate=np.random.RandomState(3), verbose=False)
+    samples = sampler.results[0]
+
+    assert sampler.acceptance_fraction > 0.1
+    assert np.all(samples[-1] > 0.)
+    assert np.allclose(samples.sum(axis=1), 1.)
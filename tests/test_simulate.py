@@ -0,0 +1,70 @@
+import multiprocessing
+import warnings
+import numpy as np
+import pytest
+from frankenz import simulate
+
+
+def _make_survey(seed=0):
+    survey = simulate.MockSurvey(survey='sdss', templates='cww+')
+    survey.rstate = np.random.RandomState(seed)
+    survey.load_prior('bpz')
+
+    return survey
+
+
+def _mock_chunks(survey, **kwargs):
+    chunks = survey.make_mock_chunks(250, chunksize=100, seed=42,
+                                     zbounds=(0, 4), Nzgrid=200,
+                                     verbose=False, **kwargs)
+
+    return dict(chunks)
+
+
+def test_mock_chunks_reproducible():
+    # Chunks only depend on the seed and their index, not on the order in
+    # which they are generated or on whether a pool is used.
+    survey = _make_survey()
+    serial = _mock_chunks(survey)
+    assert sorted(serial) == [0, 1, 2]
+    assert [len(serial[i]['redshifts']) for i in range(3)] == [100, 100, 50]
+
+    reordered = _mock_chunks(survey, chunks=[2, 0, 1])
+    pool = multiprocessing.Pool(2)
+    try:
+        pooled = _mock_chunks(survey, pool=pool)
+    finally:
+        pool.close()
+        pool.join()
+    for other in (reordered, pooled):
+        assert sorted(other) == sorted(serial)
+        for i in serial:
+            assert sorted(other[i]) == sorted(serial[i])
+            for k in serial[i]:
+                np.testing.assert_array_equal(other[i][k], serial[i][k])
+
+    # Different chunks are not copies of each other.
+    assert not np.array_equal(serial[0]['redshifts'],
+                              serial[1]['redshifts'])
+
+
+def test_interp_tolerance():
+    survey = _make_survey()
+    survey.make_mock(300, zbounds=(0, 4), verbose=False)
+
+    # The default redshift grid reproduces the exact photometry closely.
+    survey.sample_phot(ncheck=50, verbose=False)
+    fine = survey.data['phot_interp_err']
+    assert 0. < fine < 1e-3
+
+    # A coarse grid is flagged once it exceeds the tolerance.
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        survey.sample_phot(ncheck=50, tol=1e-3, verbose=False)
+    with pytest.warns(UserWarning):
+        survey.sample_phot(ncheck=50, Nzgrid=30, tol=1e-3, verbose=False)
+    assert survey.data['phot_interp_err'] > 10. * fine
+
+    # Checks can be skipped entirely.
+    survey.sample_phot(ncheck=0, verbose=False)
+    assert np.isnan(survey.data['phot_interp_err'])